@@ -0,0 +1,133 @@
+"""Compaction 실행 시간/메모리 벤치마크 (오프라인)
+
+메모리 S3에 문서 수별 코퍼스(주제당 --group-size개 문서)를 만들고 실제 CompactService.run()을 실행합니다.
+S3/Bedrock/Agent는 지연 시간을 주입한 fake(benchmarks.fakes)로 대체하며, 실행 예산/동시성 설정은 AppSettings를 따릅니다.
+Agent는 `--agent record`로 실제 응답을 기록한 뒤 `--agent replay`로 같은 코퍼스에서 네트워크 없이 재생할 수 있습니다.
+실행 시간, 단계별 소요 시간, Agent 호출/토큰 수, tracemalloc 기준 최대 메모리를 측정합니다.
+
+    uv run python -m benchmarks.compact --documents 100 1000 10000 --agent-latency 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import tracemalloc
+
+from benchmarks.fakes import (
+    add_agent_arguments,
+    benchmark_agent_service,
+    fake_bedrock_kb_service,
+    fake_s3_service,
+)
+from benchmarks.report import save_results
+from src.conf.settings import settings
+from src.services.compact import CompactService
+from src.services.sync_tracker import SyncTracker
+from src.services.usage import track_usage
+
+# COMPACT_MAX_TOKENS가 무제한(0)일 때 사용할 실행 예산
+# 예산 없이 1만 개 문서를 한 번에 분석하면 판정 캐시가 문서 쌍 수(n^2)만큼 커져 측정이 불가능함
+DEFAULT_MAX_TOKENS = 200_000
+
+
+def _seed(s3_service, documents: int, group_size: int, size: int) -> None:
+    """base prefix에 문서와 Bedrock 형식 메타데이터 생성 (지연 없이)"""
+    for index in range(documents):
+        topic = f"topic{index // group_size:05d}"
+        filename = f"{topic}-{index % group_size}.md"
+        key = f"{settings.s3_base_prefix}/{topic}/{index:08d}/{filename}"
+        header = f"# {topic} 문서 {index}\n\n"
+        body = (header + f"{topic} 관련 세션 기록 {index}.\n" * (size // 32 + 1))[:size]
+        metadata = {"metadataAttributes": {"summary": f"{topic} 문서 {index}", "categories": topic, "tags": topic}}
+        s3_service.client.seed(key, body)
+        s3_service.client.seed(f"{key}.metadata.json", json.dumps(metadata, ensure_ascii=False))
+
+
+async def _run(args: argparse.Namespace, documents: int) -> dict:
+    s3_service = fake_s3_service(args.s3_latency)
+    bedrock = fake_bedrock_kb_service(args.bedrock_latency)
+    agent = benchmark_agent_service(args)
+    sync_tracker = SyncTracker(bedrock, document_sync_threshold=settings.bedrock_document_sync_threshold)
+    service = CompactService(
+        s3_service=s3_service,
+        bedrock_kb_service=bedrock,
+        agent_service=agent,
+        sync_tracker=sync_tracker,
+        fetch_concurrency=settings.compact_fetch_concurrency,
+        memory_budget_bytes=settings.compact_memory_budget_bytes,
+        excerpt_chars=settings.compact_excerpt_chars,
+        max_tokens=args.max_tokens,
+        max_seconds=settings.compact_max_seconds,
+        max_groups=settings.compact_max_groups,
+        tier_reexamine_runs=settings.compact_tier_reexamine_runs,
+        tier_candidate_limit=settings.compact_tier_candidate_limit,
+    )
+    _seed(s3_service, documents, args.group_size, args.size)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with track_usage() as usage:
+            result = await service.run()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    finally:
+        tracemalloc.stop()
+        await sync_tracker.stop()
+
+    stats = result["stats"]
+    return {
+        "documents": documents,
+        "seconds": round(elapsed, 3),
+        "documents_per_second": round(documents / elapsed, 1),
+        "peak_memory_mb": round(peak / 1024 / 1024, 1) if peak is not None else None,
+        "analyzed_documents": stats["analyzed_documents"],
+        "merged": result["merged"],
+        "deferred_documents": result["deferred_documents"],
+        "agent_calls": usage.calls,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "s3_requests": s3_service.client.calls,
+        "stage_seconds": stats["stage_seconds"],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--group-size", type=int, default=4, help="주제(병합 그룹)당 문서 수")
+    parser.add_argument("--size", type=int, default=2048, help="문서 크기 (bytes)")
+    add_agent_arguments(parser, latency=0)
+    parser.add_argument("--s3-latency", type=float, default=0, help="S3 요청당 지연 (초)")
+    parser.add_argument("--bedrock-latency", type=float, default=0, help="Bedrock 요청당 지연 (초)")
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=settings.compact_max_tokens or DEFAULT_MAX_TOKENS,
+        help="실행당 최대 프롬프트 토큰 (기본: COMPACT_MAX_TOKENS, 무제한이면 200000, 0이면 무제한)",
+    )
+    parser.add_argument(
+        "--no-trace-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="tracemalloc 측정 끄기 (측정 중에는 실행 시간이 늘어남)",
+    )
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/compact-{commit}.json)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    rows = []
+    for documents in args.documents:
+        row = await _run(args, documents)
+        rows.append(row)
+        print(json.dumps(row, ensure_ascii=False))
+
+    params = {key: value for key, value in vars(args).items() if key not in ("documents", "output")}
+    print(f"Saved: {save_results('compact', params, rows, args.output)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,306 @@
+"""벤치마크용 오프라인 fake (S3 / Bedrock / Claude Agent)
+
+S3Service, BedrockKBService는 실제 코드를 그대로 쓰고 boto3 client만 메모리 fake로 바꿉니다.
+AgentService는 query()만 바꿔 결정적인 응답과 토큰 사용량(ResultMessage)을 돌려주므로
+동시성 제한, 메트릭, 사용량 집계, 응답 파싱은 실제 경로를 탑니다.
+
+지연 시간은 호출마다 주입합니다. boto3 호출은 동기(blocking)이므로 fake client도 time.sleep으로 기다리고,
+Agent 호출은 asyncio.sleep으로 기다립니다.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from src.conf.settings import settings
+from src.external_service.agent import DEFAULT_SYSTEM_PROMPT, AgentService
+from src.external_service.agent_cassette import AgentCassette
+from src.external_service.bedrock import BedrockKBService
+from src.external_service.s3 import S3Service
+from src.utils.tokens import estimate_tokens
+
+BUCKET = "benchmark-bucket"
+
+# 비용 계산용 토큰 단가 (USD / 1M tokens)
+INPUT_COST_PER_MTOK = 3.0
+OUTPUT_COST_PER_MTOK = 15.0
+
+DOCUMENT_KEY_PATTERN = re.compile(r"=== 문서 \d+: (.+?) ===")
+FILENAME_PATTERN = re.compile(r"파일명: (\S+)")
+
+
+def _client_error(code: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+def topic_of(key: str) -> str:
+    """벤치마크 문서 키의 주제 (파일명 `{topic}-{n}.md`의 topic)"""
+    return key.rsplit("/", 1)[-1].rsplit("-", 1)[0]
+
+
+class FakeS3Client:
+    """S3Service가 사용하는 boto3 S3 API의 메모리 구현"""
+
+    def __init__(self, latency_seconds: float = 0, page_size: int = 1000):
+        self.latency_seconds = latency_seconds
+        self.page_size = page_size
+        self.calls = 0
+        self._objects: dict[str, tuple[bytes, str, datetime]] = {}
+        self._lock = threading.Lock()
+
+    def _wait(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def seed(self, key: str, body: bytes | str) -> None:
+        """지연 없이 객체 저장 (벤치마크 데이터 준비용)"""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        with self._lock:
+            self._objects[key] = (body, hashlib.md5(body).hexdigest(), datetime.now(timezone.utc))
+
+    def keys(self, prefix: str = "") -> list[str]:
+        with self._lock:
+            return [key for key in self._objects if key.startswith(prefix)]
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, IfMatch=None, IfNoneMatch=None, **kwargs) -> dict:  # noqa: N803
+        self._wait()
+        with self._lock:
+            current = self._objects.get(Key)
+            if IfNoneMatch == "*" and current is not None:
+                raise _client_error("PreconditionFailed", "PutObject")
+            if IfMatch and (current is None or f'"{current[1]}"' != IfMatch):
+                raise _client_error("PreconditionFailed", "PutObject")
+        self.seed(Key, Body)
+        return {"ETag": f'"{self._objects[Key][1]}"'}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:  # noqa: N803
+        self._wait()
+        with self._lock:
+            current = self._objects.get(Key)
+        if current is None:
+            raise _client_error("NoSuchKey", "GetObject")
+        return {"Body": io.BytesIO(current[0]), "ETag": f'"{current[1]}"'}
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:  # noqa: N803
+        self._wait()
+        deleted = []
+        with self._lock:
+            for obj in Delete["Objects"]:
+                self._objects.pop(obj["Key"], None)
+                deleted.append({"Key": obj["Key"]})
+        return {"Deleted": deleted}
+
+    def get_paginator(self, operation: str) -> "FakeS3Client":
+        return self
+
+    def paginate(self, Bucket: str, Prefix: str = ""):  # noqa: N803
+        with self._lock:
+            items = sorted((key, value) for key, value in self._objects.items() if key.startswith(Prefix))
+        for start in range(0, max(len(items), 1), self.page_size):
+            self._wait()
+            yield {
+                "Contents": [
+                    {"Key": key, "Size": len(body), "LastModified": modified, "ETag": f'"{etag}"'}
+                    for key, (body, etag, modified) in items[start : start + self.page_size]
+                ]
+            }
+
+
+class FakeBedrockClient:
+    """BedrockKBService가 사용하는 bedrock-agent API의 메모리 구현 (동기화 작업은 즉시 완료)"""
+
+    def __init__(self, latency_seconds: float = 0):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def _wait(self) -> None:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def start_ingestion_job(self, **kwargs) -> dict:
+        self._wait()
+        return {"ingestionJob": {"ingestionJobId": uuid.uuid4().hex, "status": "STARTING"}}
+
+    def get_ingestion_job(self, ingestionJobId: str, **kwargs) -> dict:  # noqa: N803
+        self._wait()
+        return {"ingestionJob": {"ingestionJobId": ingestionJobId, "status": "COMPLETE", "statistics": {}}}
+
+    def list_ingestion_jobs(self, **kwargs) -> dict:
+        self._wait()
+        return {"ingestionJobSummaries": []}
+
+    def ingest_knowledge_base_documents(self, documents: list[dict], **kwargs) -> dict:
+        self._wait()
+        return {
+            "documentDetails": [
+                {"identifier": {"s3": doc["content"]["s3"]["s3Location"]}, "status": "STARTING"} for doc in documents
+            ]
+        }
+
+    def delete_knowledge_base_documents(self, documentIdentifiers: list[dict], **kwargs) -> dict:  # noqa: N803
+        self._wait()
+        return {
+            "documentDetails": [{"identifier": {"s3": doc["s3"]}, "status": "DELETING"} for doc in documentIdentifiers]
+        }
+
+
+def fake_s3_service(latency_seconds: float = 0) -> S3Service:
+    """메모리 S3 client를 사용하는 S3Service"""
+    service = S3Service(bucket=BUCKET, region=settings.aws_region)
+    service.client = FakeS3Client(latency_seconds)
+    return service
+
+
+def fake_bedrock_kb_service(latency_seconds: float = 0) -> BedrockKBService:
+    """메모리 bedrock-agent client를 사용하는 BedrockKBService"""
+    service = BedrockKBService(
+        knowledge_base_id="benchmark-kb", data_source_id="benchmark-ds", bucket=BUCKET, region=settings.aws_region
+    )
+    service.client = FakeBedrockClient(latency_seconds)
+    return service
+
+
+class FakeAgentService(AgentService):
+    """프롬프트 종류별로 결정적인 응답을 돌려주는 AgentService
+
+    - 파일 분석: 파일명의 주제를 카테고리/태그로 사용
+    - 유사도 분석: 같은 주제(`{topic}-{n}.md`)의 문서끼리 그룹
+    - 병합: 주제 디렉토리에 output_tokens 분량의 요약 문서
+
+    Args:
+        latency_seconds: 호출당 고정 지연
+        output_tokens: 호출당 출력 토큰 수 (사용량/비용 및 응답 길이에 반영)
+        output_tokens_per_second: 0보다 크면 출력 토큰 생성 시간만큼 추가 지연
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0,
+        output_tokens: int = 200,
+        output_tokens_per_second: float = 0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.latency_seconds = latency_seconds
+        self.output_tokens = output_tokens
+        self.output_tokens_per_second = output_tokens_per_second
+
+    def _summary(self, topic: str) -> str:
+        sentence = f"{topic} 문서 요약. "
+        return sentence * max(1, self.output_tokens * 4 // len(sentence.encode("utf-8")))
+
+    def _respond(self, prompt: str) -> str:
+        if prompt.startswith("다음 파일을 분석하고"):
+            match = FILENAME_PATTERN.search(prompt)
+            topic = topic_of(match.group(1)) if match else "misc"
+            return json.dumps({"summary": self._summary(topic), "categories": [topic], "tags": [topic]})
+
+        keys = DOCUMENT_KEY_PATTERN.findall(prompt)
+        if "유사 문서 그룹핑" in prompt:
+            groups: dict[str, list[str]] = {}
+            for key in keys:
+                groups.setdefault(topic_of(key), []).append(key)
+            return json.dumps({"delete": [], "groups": list(groups.values())})
+
+        topic = topic_of(keys[0]) if keys else "misc"
+        return json.dumps(
+            {
+                "directory": topic,
+                "filename": f"{topic}-merged.md",
+                "content": f"# {topic}\n\n{self._summary(topic)}",
+                "metadata": {"summary": f"{topic} 통합 문서", "categories": [topic], "tags": [topic]},
+            }
+        )
+
+    async def query(self, prompt: str, **kwargs):
+        delay = self.latency_seconds
+        if self.output_tokens_per_second > 0:
+            delay += self.output_tokens / self.output_tokens_per_second
+        started = time.perf_counter()
+        if delay:
+            await asyncio.sleep(delay)
+
+        input_tokens = estimate_tokens(prompt)
+        yield AssistantMessage(content=[TextBlock(text=self._respond(prompt))], model="benchmark")
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=int((time.perf_counter() - started) * 1000),
+            duration_api_ms=int(delay * 1000),
+            is_error=False,
+            num_turns=1,
+            session_id="benchmark",
+            total_cost_usd=(input_tokens * INPUT_COST_PER_MTOK + self.output_tokens * OUTPUT_COST_PER_MTOK) / 1e6,
+            usage={"input_tokens": input_tokens, "output_tokens": self.output_tokens},
+        )
+
+
+def fake_agent_service(latency_seconds: float = 0, output_tokens: int = 200) -> FakeAgentService:
+    """컨테이너와 같은 동시성/병합 설정의 FakeAgentService"""
+    return FakeAgentService(
+        latency_seconds=latency_seconds,
+        output_tokens=output_tokens,
+        merge_max_tokens=settings.agent_merge_max_tokens,
+        merge_fan_in=settings.agent_merge_fan_in,
+        merge_concurrency=settings.agent_merge_concurrency,
+        max_concurrency=settings.agent_max_concurrency,
+    )
+
+
+def add_agent_arguments(parser: argparse.ArgumentParser, latency: float) -> None:
+    """Agent 백엔드 선택 옵션 (fake 또는 cassette 기록/재생)"""
+    parser.add_argument(
+        "--agent",
+        choices=["fake", "record", "replay"],
+        default="fake",
+        help="fake: 결정적 fake, record: 실제 Agent 호출을 --cassette에 기록, replay: --cassette로만 응답",
+    )
+    parser.add_argument("--cassette", default=settings.agent_cassette_path, help="Agent 응답 기록 파일")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay 지연 배율 (0이면 기다리지 않음)")
+    parser.add_argument("--agent-latency", type=float, default=latency, help="fake Agent 호출당 지연 (초)")
+    parser.add_argument("--output-tokens", type=int, default=200, help="fake Agent 호출당 출력 토큰 수")
+
+
+def benchmark_agent_service(args: argparse.Namespace) -> AgentService:
+    """--agent 옵션에 따른 AgentService
+
+    record/replay는 컨테이너와 같은 설정의 실제 AgentService를 사용하므로,
+    앱에서 AGENT_CASSETTE_MODE=record로 기록한 파일도 그대로 재생할 수 있습니다.
+    """
+    if args.agent == "fake":
+        return fake_agent_service(args.agent_latency, args.output_tokens)
+    return AgentService(
+        system_prompt=DEFAULT_SYSTEM_PROMPT,
+        cwd=settings.agent_cwd,
+        use_bedrock=settings.claude_code_use_bedrock,
+        model=settings.anthropic_model,
+        merge_max_tokens=settings.agent_merge_max_tokens,
+        merge_fan_in=settings.agent_merge_fan_in,
+        merge_concurrency=settings.agent_merge_concurrency,
+        max_concurrency=settings.agent_max_concurrency,
+        cassette=AgentCassette(args.cassette, mode=args.agent, replay_speed=args.replay_speed),
+    )
+
+
+class NullBroker:
+    """발행을 버리는 Kafka 브로커 (업로드 이벤트 발행 비용 제외)"""
+
+    async def publish(self, *args, **kwargs) -> None:
+        return None
+
+
+async def null_publish_batch(*args, **kwargs) -> list:
+    return []
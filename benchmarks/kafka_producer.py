@@ -0,0 +1,65 @@
+"""Kafka producer 설정별 발행 처리량 벤치마크
+
+로컬 Kafka(docker-compose의 kafka 서비스 또는 `make kafka-up`)에 실제로 발행하여
+기본 설정과 AppSettings의 producer 설정(linger, 배치 크기, 압축, acks, idempotence)을 비교합니다.
+
+    uv run python -m benchmarks.kafka_producer --messages 20000 --size 1024
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from faststream.kafka import KafkaBroker
+
+from src.conf.kafka import _get_producer_kwargs
+from src.conf.settings import settings
+from src.schema.v1.upload_event import DocumentUploadedEvent
+
+BASELINE = {"acks": 1, "enable_idempotence": False, "linger_ms": 0, "max_batch_size": 16384, "compression_type": None}
+
+
+async def _run(name: str, producer_kwargs: dict, topic: str, messages: int, size: int, concurrency: int) -> dict:
+    broker = KafkaBroker(settings.kafka_bootstrap_servers, **producer_kwargs)
+    await broker.start()
+    key_padding = "x" * max(0, size - 64)
+    events = [DocumentUploadedEvent(key=f"bench/{i}/{key_padding}", size=size) for i in range(messages)]
+    try:
+        # 워밍업 (연결/메타데이터 조회 제외)
+        await broker.publish(events[0], topic=topic)
+
+        started = time.perf_counter()
+        for offset in range(0, messages, concurrency):
+            chunk = events[offset : offset + concurrency]
+            await asyncio.gather(*(broker.publish(event, topic=topic) for event in chunk))
+        elapsed = time.perf_counter() - started
+    finally:
+        await broker.stop()
+
+    return {
+        "config": name,
+        "producer": producer_kwargs,
+        "messages": messages,
+        "message_bytes": size,
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(messages / elapsed, 1),
+        "mb_per_second": round(messages * size / elapsed / 1024 / 1024, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", default="benchmark.producer")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=1024, help="메시지당 대략적인 크기 (bytes)")
+    parser.add_argument("--concurrency", type=int, default=500, help="동시에 발행 대기하는 메시지 수")
+    args = parser.parse_args()
+
+    for name, producer_kwargs in [("baseline", BASELINE), ("configured", _get_producer_kwargs())]:
+        result = await _run(name, producer_kwargs, args.topic, args.messages, args.size, args.concurrency)
+        print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
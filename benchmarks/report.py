@@ -0,0 +1,98 @@
+"""벤치마크 결과 저장 / 커밋 간 비교
+
+결과는 `benchmarks/results/{name}-{commit}.json`에 저장됩니다. 두 결과 파일의 같은 행(같은 파라미터)끼리
+수치 항목의 변화율을 출력합니다.
+
+    uv run python -m benchmarks.report benchmarks/results/compact-abc1234.json benchmarks/results/compact-def5678.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _git_commit() -> str:
+    """현재 커밋 (작업 트리에 변경이 있으면 -dirty)"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return f"{commit}-dirty" if dirty.stdout.strip() else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(name: str, params: dict, rows: list[dict], output: str | None = None) -> Path:
+    """벤치마크 결과를 JSON으로 저장
+
+    Args:
+        name: 벤치마크 이름 (파일명 접두사)
+        params: 실행 파라미터 (지연 시간, 토큰 수 등)
+        rows: 측정 결과 행
+        output: 저장 경로 (없으면 RESULTS_DIR/{name}-{commit}.json)
+    """
+    commit = _git_commit()
+    path = Path(output) if output else RESULTS_DIR / f"{name}-{commit}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "benchmark": name,
+                "commit": commit,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "params": params,
+                "results": rows,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+    return path
+
+
+def _row_id(row: dict, key_fields: list[str]) -> tuple:
+    return tuple(row.get(field) for field in key_fields)
+
+
+def compare(baseline: dict, current: dict, key_fields: list[str]) -> list[dict]:
+    """같은 행의 수치 항목별 (baseline, current, 변화율 %) 계산"""
+    baseline_rows = {_row_id(row, key_fields): row for row in baseline["results"]}
+    diffs = []
+    for row in current["results"]:
+        base = baseline_rows.get(_row_id(row, key_fields))
+        if base is None:
+            continue
+        metrics = {}
+        for field, value in row.items():
+            base_value = base.get(field)
+            if field in key_fields or not isinstance(value, int | float) or not isinstance(base_value, int | float):
+                continue
+            change = round((value - base_value) / base_value * 100, 1) if base_value else None
+            metrics[field] = {"baseline": base_value, "current": value, "change_pct": change}
+        diffs.append({**{field: row[field] for field in key_fields if field in row}, "metrics": metrics})
+    return diffs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--key", nargs="+", default=["concurrency", "documents"], help="행을 맞출 파라미터 항목")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    print(json.dumps({"baseline": baseline["commit"], "current": current["commit"]}))
+    for diff in compare(baseline, current, args.key):
+        print(json.dumps(diff, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
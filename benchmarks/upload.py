@@ -0,0 +1,114 @@
+"""업로드 API 처리량 벤치마크 (오프라인)
+
+실제 FastAPI 앱(`POST /api/v1/upload`)에 httpx ASGITransport로 요청을 보내고, S3/Bedrock/Agent는
+지연 시간을 주입한 fake(benchmarks.fakes)로 대체합니다. 동시 요청 수별 초당 처리량과 p50/p99 지연을 측정합니다.
+Agent는 `--agent record`로 실제 응답을 기록한 뒤 `--agent replay`로 네트워크 없이 재생할 수 있습니다.
+
+    uv run python -m benchmarks.upload --requests 500 --concurrency 1 8 32 --agent-latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from unittest.mock import patch
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.fakes import (
+    NullBroker,
+    add_agent_arguments,
+    benchmark_agent_service,
+    fake_bedrock_kb_service,
+    fake_s3_service,
+    null_publish_batch,
+)
+from benchmarks.report import save_results
+from src.conf.settings import settings
+from src.services.sync_tracker import SyncTracker
+
+
+def _percentile(samples: list[float], percentile: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0
+    return statistics.quantiles(samples, n=100, method="inclusive")[percentile - 1]
+
+
+async def _run(client: AsyncClient, concurrency: int, requests: int, body: bytes) -> dict:
+    latencies = []
+    failures = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+        for index in counter:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/upload", files={"file": (f"bench-{index % 100:04d}-{index}.md", body, "text/markdown")}
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200 or not response.json().get("success"):
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="동시 요청 수별 전체 요청 수")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--size", type=int, default=4096, help="업로드 파일 크기 (bytes)")
+    add_agent_arguments(parser, latency=0.05)
+    parser.add_argument("--s3-latency", type=float, default=0.005, help="S3 요청당 지연 (초)")
+    parser.add_argument("--bedrock-latency", type=float, default=0.005, help="Bedrock 요청당 지연 (초)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/upload-{commit}.json)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from src.main import app
+
+    bedrock = fake_bedrock_kb_service(args.bedrock_latency)
+    sync_tracker = SyncTracker(bedrock, document_sync_threshold=settings.bedrock_document_sync_threshold)
+    app.container.agent_service.override(benchmark_agent_service(args))
+    app.container.s3_service.override(fake_s3_service(args.s3_latency))
+    app.container.bedrock_kb_service.override(bedrock)
+    app.container.sync_tracker.override(sync_tracker)
+
+    body = (b"benchmark upload line\n" * (args.size // 22 + 1))[: args.size]
+    rows = []
+    try:
+        with (
+            patch("src.api.v1.upload.broker", NullBroker()),
+            patch("src.api.v1.upload.publish_batch", null_publish_batch),
+        ):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+                # 워밍업 (import/초기화 비용 제외)
+                await _run(client, 1, 5, body)
+                for concurrency in args.concurrency:
+                    row = await _run(client, concurrency, max(args.requests, concurrency), body)
+                    rows.append(row)
+                    print(json.dumps(row, ensure_ascii=False))
+    finally:
+        await sync_tracker.stop()
+        app.container.reset_override()
+
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    print(f"Saved: {save_results('upload', params, rows, args.output)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,15 +1,38 @@
-from fastapi import APIRouter
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends
 
+from src.conf.container import Container
 from src.conf.kafka import broker
 from src.conf.settings import settings
 from src.schema.v1.compact_event import CompactEvent
+from src.services.compact import CompactService
 
 router = APIRouter()
 
 
 @router.post("/compact")
-async def publish_compact(dry_run: bool = False):
-    """Compact 이벤트 발행"""
-    event = CompactEvent(trigger="api", dry_run=dry_run)
+async def publish_compact(dry_run: bool = False, profile_run: bool = False):
+    """Compact 이벤트 발행
+
+    - profile_run: 실행을 프로파일링하여 저장 (프로파일링 활성 시, 위치는 결과 이벤트의 profile_location)
+    """
+    event = CompactEvent(trigger="api", dry_run=dry_run, profile=profile_run)
     await broker.publish(event, topic=settings.kafka_topic_compact)
     return {"success": True, "event": event.model_dump(mode="json")}
+
+
+@router.post("/compact/apply")
+async def publish_compact_apply(plan_id: str):
+    """dry run으로 생성된 compact plan 적용 이벤트 발행"""
+    event = CompactEvent(trigger="api", plan_id=plan_id)
+    await broker.publish(event, topic=settings.kafka_topic_compact)
+    return {"success": True, "event": event.model_dump(mode="json")}
+
+
+@router.get("/compact/estimate")
+@inject
+async def estimate_compact(
+    compact_service: CompactService = Depends(Provide[Container.compact_service]),
+):
+    """Compact 사전 비용 추정 (Agent 호출 없이 토큰/소요 시간 계산)"""
+    return {"success": True, "estimate": await compact_service.estimate()}
@@ -0,0 +1,36 @@
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends
+
+from src.conf.container import Container
+from src.services.sync_tracker import SyncTracker
+
+router = APIRouter()
+
+
+@router.get("/sync")
+@inject
+async def list_sync_jobs(
+    sync_tracker: SyncTracker = Depends(Provide[Container.sync_tracker]),
+):
+    """추적 중인 Bedrock KB 동기화 작업 목록 (최신순, 캐시된 상태)"""
+    return {"success": True, "jobs": sync_tracker.jobs()}
+
+
+@router.get("/sync/{job_id}")
+@inject
+async def get_sync_job(
+    job_id: str,
+    wait_seconds: float = 0,
+    sync_tracker: SyncTracker = Depends(Provide[Container.sync_tracker]),
+):
+    """동기화 작업 상태 조회
+
+    - wait_seconds: 0보다 크면 작업이 끝나거나 해당 시간이 지날 때까지 대기 (최대 60초)
+    """
+    if wait_seconds > 0:
+        job = await sync_tracker.wait(job_id, timeout=min(wait_seconds, 60))
+    else:
+        job = await sync_tracker.get(job_id)
+    if job is None:
+        return {"success": False, "error": f"동기화 작업을 찾을 수 없습니다: {job_id}"}
+    return {"success": True, "job": job}
@@ -1,31 +1,33 @@
+import asyncio
+import logging
 import uuid
 
+from botocore.exceptions import ClientError
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, File, UploadFile
 
 from src.conf.container import Container
+from src.conf.kafka import broker, publish_batch
 from src.conf.settings import settings
+from src.conf.tracing import tracer
 from src.external_service.agent import AgentService
-from src.external_service.bedrock import BedrockKBService
 from src.external_service.s3 import S3Service
+from src.schema.v1.upload_event import DocumentUploadedEvent
+from src.services.sync_tracker import SyncTracker
+from src.services.usage import track_usage
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md", ".csv"}
 
 
-@router.post("/upload")
-@inject
-async def upload_file(
-    file: UploadFile = File(...),
-    agent_service: AgentService = Depends(Provide[Container.agent_service]),
-    s3_service: S3Service = Depends(Provide[Container.s3_service]),
-    bedrock_kb_service: BedrockKBService = Depends(Provide[Container.bedrock_kb_service]),
-):
-    """
-    파일 업로드 엔드포인트
+async def _store_file(file: UploadFile, agent_service: AgentService, s3_service: S3Service) -> tuple[dict, int]:
+    """파일 검증, 메타데이터 생성, S3 업로드
 
-    - file: 업로드할 파일 (PDF, DOCX, TXT, MD, CSV)
+    Returns:
+        (S3 업로드 결과, 파일 크기)
     """
     # 파일 확장자 검증
     file_ext = "." + file.filename.split(".")[-1].lower() if "." in file.filename else ""
@@ -33,37 +35,116 @@ async def upload_file(
         return {
             "success": False,
             "error": f"지원하지 않는 파일 형식입니다. 지원 형식: {', '.join(ALLOWED_EXTENSIONS)}",
-        }
+        }, 0
 
     # 디렉토리 자동 생성: {base_prefix}/{filename}/{uuid}/
     file_base_name = file.filename.rsplit(".", 1)[0] if "." in file.filename else file.filename
     directory = f"{settings.s3_base_prefix}/{file_base_name}/{uuid.uuid4()}"
 
-    # 파일 읽기
-    file_content = await file.read()
+    with tracer.start_as_current_span("upload.store_file", attributes={"upload.filename": file.filename}) as span:
+        # 파일 읽기
+        file_content = await file.read()
+        span.set_attribute("upload.size", len(file_content))
 
-    # Agent 호출하여 메타데이터 생성
-    metadata = await agent_service.analyze_file(
-        file_content=file_content.decode("utf-8", errors="ignore"),
-        filename=file.filename,
-    )
+        # Agent 호출하여 메타데이터 생성
+        metadata = await agent_service.analyze_file(
+            file_content=file_content.decode("utf-8", errors="ignore"),
+            filename=file.filename,
+        )
 
-    # S3 업로드
-    upload_result = await s3_service.upload_file_with_metadata(
-        file_content=file_content,
-        directory=directory,
-        filename=file.filename,
-        metadata=metadata,
-        content_type=file.content_type,
-    )
+        # S3 업로드 (일시적 오류도 파일별 실패로 응답)
+        try:
+            upload_result = await s3_service.upload_file_with_metadata(
+                file_content=file_content,
+                directory=directory,
+                filename=file.filename,
+                metadata=metadata,
+                content_type=file.content_type,
+            )
+        except ClientError as e:
+            logger.warning(f"Failed to upload {file.filename}: {e}")
+            upload_result = {"success": False, "error": str(e)}
+        return upload_result, len(file_content)
+
+
+async def _sync_uploaded(sync_tracker: SyncTracker, keys: list[str]) -> dict:
+    """업로드한 문서만 KB에 동기화 (일시적 오류도 업로드 결과와 함께 실패로 응답)"""
+    try:
+        return await sync_tracker.sync_documents(keys, [])
+    except ClientError as e:
+        logger.warning(f"Failed to sync uploaded documents: {e}")
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/upload")
+@inject
+async def upload_file(
+    file: UploadFile = File(...),
+    agent_service: AgentService = Depends(Provide[Container.agent_service]),
+    s3_service: S3Service = Depends(Provide[Container.s3_service]),
+    sync_tracker: SyncTracker = Depends(Provide[Container.sync_tracker]),
+):
+    """
+    파일 업로드 엔드포인트
 
+    - file: 업로드할 파일 (PDF, DOCX, TXT, MD, CSV)
+    """
+    with track_usage() as usage:
+        upload_result, size = await _store_file(file, agent_service, s3_service)
     if not upload_result["success"]:
         return upload_result
 
-    # Bedrock Knowledge Base 동기화
-    sync_result = await bedrock_kb_service.start_sync()
+    # 업로드 이벤트 발행 (compact 스케줄러 누적량 집계) - 실패해도 업로드 결과에는 영향 없음
+    try:
+        event = DocumentUploadedEvent(key=upload_result["file"]["key"], size=size)
+        await broker.publish(event, topic=settings.kafka_topic_uploaded)
+    except Exception as e:
+        logger.warning(f"Failed to publish upload event: {e}")
+
+    # Bedrock Knowledge Base 동기화 (업로드한 문서만)
+    sync_result = await _sync_uploaded(sync_tracker, [upload_result["file"]["key"]])
 
     return {
         **upload_result,
         "sync": sync_result,
+        "usage": usage.model_dump(),
+    }
+
+
+@router.post("/upload/batch")
+@inject
+async def upload_files(
+    files: list[UploadFile] = File(...),
+    agent_service: AgentService = Depends(Provide[Container.agent_service]),
+    s3_service: S3Service = Depends(Provide[Container.s3_service]),
+    sync_tracker: SyncTracker = Depends(Provide[Container.sync_tracker]),
+):
+    """
+    여러 파일 업로드 엔드포인트 (업로드 이벤트 일괄 발행, KB 동기화 1회)
+
+    - files: 업로드할 파일 목록 (PDF, DOCX, TXT, MD, CSV)
+    """
+    with track_usage() as usage:
+        stored = await asyncio.gather(*(_store_file(file, agent_service, s3_service) for file in files))
+    results = [result for result, _ in stored]
+    uploaded = [(result, size) for result, size in stored if result["success"]]
+
+    # 업로드 이벤트 일괄 발행 - 실패해도 업로드 결과에는 영향 없음
+    try:
+        events = [DocumentUploadedEvent(key=result["file"]["key"], size=size) for result, size in uploaded]
+        await publish_batch(events, topic=settings.kafka_topic_uploaded)
+    except Exception as e:
+        logger.warning(f"Failed to publish upload events: {e}")
+
+    # Bedrock Knowledge Base 동기화 (업로드된 파일이 있을 때 한 번만)
+    keys = [result["file"]["key"] for result, _ in uploaded]
+    sync_result = await _sync_uploaded(sync_tracker, keys) if uploaded else None
+
+    return {
+        "success": len(uploaded) == len(results),
+        "uploaded": len(uploaded),
+        "failed": len(results) - len(uploaded),
+        "results": results,
+        "sync": sync_result,
+        "usage": usage.model_dump(),
     }
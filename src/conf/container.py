@@ -1,10 +1,20 @@
 from dependency_injector import containers, providers
 
 from src.conf.settings import settings
-from src.external_service.agent import AgentService
+from src.external_service.agent import DEFAULT_SYSTEM_PROMPT, AgentService
+from src.external_service.agent_cassette import AgentCassette
 from src.external_service.bedrock import BedrockKBService
 from src.external_service.s3 import S3Service
 from src.services.compact import CompactService
+from src.services.compact_lock import CompactRunLock
+from src.services.lease import S3Lease
+from src.services.loop_monitor import LoopMonitor
+from src.services.merge_collector import MergeResultCollector
+from src.services.profiler import Profiler
+from src.services.readiness import Readiness, dependency_probes
+from src.services.scheduler import CompactScheduler
+from src.services.sync_tracker import SyncTracker
+from src.utils.byte_budget import ByteBudget
 
 
 class Container(containers.DeclarativeContainer):
@@ -12,18 +22,33 @@ class Container(containers.DeclarativeContainer):
 
     wiring_config = containers.WiringConfiguration(
         modules=[
+            "src.api.v1.compact",
+            "src.api.v1.sync",
             "src.api.v1.upload",
         ]
     )
 
     # External Services
+    agent_cassette = providers.Singleton(
+        AgentCassette,
+        path=settings.agent_cassette_path,
+        mode=settings.agent_cassette_mode,
+        replay_speed=settings.agent_replay_speed,
+    )
+
     agent_service = providers.Singleton(
         AgentService,
-        system_prompt="You are a document analysis assistant. Analyze files and extract metadata.",
+        system_prompt=DEFAULT_SYSTEM_PROMPT,
         max_turns=10,
         cwd=settings.agent_cwd,
         use_bedrock=settings.claude_code_use_bedrock,
         model=settings.anthropic_model,
+        merge_max_tokens=settings.agent_merge_max_tokens,
+        merge_fan_in=settings.agent_merge_fan_in,
+        merge_concurrency=settings.agent_merge_concurrency,
+        max_concurrency=settings.agent_max_concurrency,
+        cassette=agent_cassette,
+        cli_path=settings.agent_cli_path,
     )
 
     s3_service = providers.Singleton(
@@ -38,17 +63,103 @@ class Container(containers.DeclarativeContainer):
         BedrockKBService,
         knowledge_base_id=settings.bedrock_kb_id,
         data_source_id=settings.bedrock_data_source_id,
+        bucket=settings.s3_bucket,
         region=settings.aws_region,
         aws_access_key_id=settings.aws_access_key_id,
         aws_secret_access_key=settings.aws_secret_access_key,
     )
 
     # Services
+    sync_tracker = providers.Singleton(
+        SyncTracker,
+        bedrock_kb_service=bedrock_kb_service,
+        poll_interval_seconds=settings.bedrock_sync_poll_interval_seconds,
+        poll_max_interval_seconds=settings.bedrock_sync_poll_max_interval_seconds,
+        poll_max_errors=settings.bedrock_sync_poll_max_errors,
+        max_jobs=settings.bedrock_sync_history,
+        document_sync_threshold=settings.bedrock_document_sync_threshold,
+    )
+
+    merge_result_collector = providers.Singleton(MergeResultCollector)
+
+    # 원문 보유량 제한 (compact 실행과 병합 작업 worker가 프로세스 단위로 공유)
+    memory_budget = providers.Singleton(ByteBudget, limit=settings.compact_memory_budget_bytes)
+
     compact_service = providers.Singleton(
         CompactService,
         s3_service=s3_service,
         bedrock_kb_service=bedrock_kb_service,
         agent_service=agent_service,
+        sync_tracker=sync_tracker,
+        fetch_concurrency=settings.compact_fetch_concurrency,
+        memory_budget=memory_budget,
+        excerpt_chars=settings.compact_excerpt_chars,
+        max_tokens=settings.compact_max_tokens,
+        max_seconds=settings.compact_max_seconds,
+        max_groups=settings.compact_max_groups,
+        tokens_per_second=settings.compact_tokens_per_second,
+        call_overhead_seconds=settings.compact_call_overhead_seconds,
+        tier_reexamine_runs=settings.compact_tier_reexamine_runs,
+        tier_candidate_limit=settings.compact_tier_candidate_limit,
+        merge_collector=merge_result_collector,
+        merge_fanout=settings.compact_merge_fanout,
+        merge_task_timeout_seconds=settings.compact_merge_task_timeout_seconds,
+        verdict_max_pairs=settings.compact_verdict_max_pairs,
+    )
+
+    compact_lock = providers.Singleton(
+        CompactRunLock,
+        s3_service=s3_service,
+        key=f"{settings.s3_state_prefix}/compact.lease",
+        pending_key=f"{settings.s3_state_prefix}/compact.pending",
+        owner=settings.instance_id,
+        ttl_seconds=settings.compact_lock_ttl_seconds,
+    )
+
+    scheduler_lease = providers.Singleton(
+        S3Lease,
+        s3_service=s3_service,
+        key=f"{settings.s3_state_prefix}/scheduler.lease",
+        owner=settings.instance_id,
+        ttl_seconds=settings.compact_schedule_lease_ttl_seconds,
+    )
+
+    compact_scheduler = providers.Singleton(
+        CompactScheduler,
+        lease=scheduler_lease,
+        tiers=settings.compact_schedule_tiers,
+        max_interval_seconds=settings.compact_schedule_max_interval_seconds,
+        check_interval_seconds=settings.compact_schedule_check_interval_seconds,
+    )
+
+    readiness = providers.Singleton(
+        Readiness,
+        probes=providers.Callable(
+            dependency_probes,
+            s3_service=s3_service,
+            bedrock_kb_service=bedrock_kb_service,
+            agent_service=agent_service,
+            names=settings.readiness_probes,
+        ),
+        interval_seconds=settings.readiness_probe_interval_seconds,
+        timeout_seconds=settings.readiness_probe_timeout_seconds,
+    )
+
+    loop_monitor = providers.Singleton(
+        LoopMonitor,
+        interval_seconds=settings.loop_monitor_interval_seconds,
+        stall_threshold_seconds=settings.loop_monitor_stall_threshold_seconds,
+    )
+
+    profiler = providers.Singleton(
+        Profiler,
+        enabled=settings.debug or settings.profiling_enabled,
+        token=settings.profiling_token,
+        output=settings.profiling_output,
+        directory=settings.profiling_directory,
+        s3_service=s3_service,
+        s3_prefix=settings.profiling_s3_prefix,
+        interval_seconds=settings.profiling_interval_seconds,
     )
 
 
@@ -1,38 +1,144 @@
 """Kafka 브로커 설정"""
 
+import asyncio
 import logging
 import ssl
+import time
 
+from aiokafka.abc import AbstractTokenProvider
+from faststream import BaseMiddleware
 from faststream.kafka import KafkaBroker
+from faststream.kafka.opentelemetry import KafkaTelemetryMiddleware
 from faststream.security import SASLOAuthBearer
+from pydantic import BaseModel
 
+from src.conf.metrics import KAFKA_CONSUMER_LAG_SECONDS, KAFKA_HANDLER_SECONDS
 from src.conf.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
+class MSKTokenProvider(AbstractTokenProvider):
+    """MSK IAM 인증 토큰 제공자 (캐시 + 백그라운드 갱신)
+
+    토큰 서명은 동기 호출이므로 스레드에서 실행하고, 만료 전까지 캐시된 토큰을 반환합니다.
+    만료 refresh_ahead_seconds 전부터는 캐시된 토큰을 그대로 반환하면서 백그라운드에서 새 토큰을 받아둡니다.
+    """
+
+    def __init__(self, region: str, refresh_ahead_seconds: float = 300, expiry_margin_seconds: float = 30):
+        self.region = region
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    def _generate(self) -> tuple[str, float]:
+        """토큰과 만료 시각(epoch seconds) 생성 (동기)"""
+        from aws_msk_iam_sasl_signer import MSKAuthTokenProvider
+
+        token, expiry_ms = MSKAuthTokenProvider.generate_auth_token(self.region)
+        return token, expiry_ms / 1000
+
+    async def _refresh(self, force: bool = False) -> str:
+        async with self._lock:
+            # 대기하는 동안 다른 요청이 이미 갱신했으면 그대로 사용
+            if not force and self._token and time.time() < self._expires_at - self.refresh_ahead_seconds:
+                return self._token
+            self._token, self._expires_at = await asyncio.to_thread(self._generate)
+            return self._token
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self._refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Failed to refresh MSK auth token: {e}")
+
+    async def token(self) -> str:
+        now = time.time()
+        if self._token and now < self._expires_at - self.expiry_margin_seconds:
+            if now >= self._expires_at - self.refresh_ahead_seconds and (
+                self._refresh_task is None or self._refresh_task.done()
+            ):
+                self._refresh_task = asyncio.create_task(self._refresh_in_background())
+            return self._token
+        return await self._refresh()
+
+
+_token_provider: MSKTokenProvider | None = None
+
+
+def get_token_provider() -> MSKTokenProvider:
+    """broker와 admin client가 공유하는 MSK 토큰 제공자"""
+    global _token_provider
+    if _token_provider is None:
+        _token_provider = MSKTokenProvider(
+            settings.aws_region,
+            refresh_ahead_seconds=settings.kafka_iam_token_refresh_ahead_seconds,
+        )
+    return _token_provider
+
+
 def _get_connection_kwargs() -> dict:
     """aiokafka 연결 공통 kwargs"""
     if not settings.kafka_use_iam:
         return {"bootstrap_servers": settings.kafka_bootstrap_servers}
 
-    from aiokafka.abc import AbstractTokenProvider
-    from aws_msk_iam_sasl_signer import MSKAuthTokenProvider
-
-    class MSKTokenProvider(AbstractTokenProvider):
-        async def token(self):
-            token, _ = MSKAuthTokenProvider.generate_auth_token(settings.aws_region)
-            return token
-
     return {
         "bootstrap_servers": settings.kafka_bootstrap_servers,
         "security_protocol": "SASL_SSL",
         "sasl_mechanism": "OAUTHBEARER",
-        "sasl_oauth_token_provider": MSKTokenProvider(),
+        "sasl_oauth_token_provider": get_token_provider(),
         "ssl_context": ssl.create_default_context(),
     }
 
 
+def _get_producer_kwargs() -> dict:
+    """producer 배치/압축/전달 보장 설정"""
+    from aiokafka.codec import has_lz4, has_snappy, has_zstd
+
+    compression_type = settings.kafka_producer_compression_type
+    available = {"gzip": lambda: True, "snappy": has_snappy, "lz4": has_lz4, "zstd": has_zstd}
+    if compression_type and not available[compression_type]():
+        logger.warning(f"Kafka compression {compression_type} unavailable (install cramjam), sending uncompressed")
+        compression_type = None
+
+    return {
+        "acks": int(settings.kafka_producer_acks) if settings.kafka_producer_acks != "all" else "all",
+        "enable_idempotence": settings.kafka_producer_enable_idempotence,
+        "linger_ms": settings.kafka_producer_linger_ms,
+        "max_batch_size": settings.kafka_producer_max_batch_size,
+        "compression_type": compression_type,
+    }
+
+
+class KafkaMetricsMiddleware(BaseMiddleware):
+    """핸들러 처리 시간과 consumer lag(메시지 timestamp부터 처리 시작까지) 기록"""
+
+    async def consume_scope(self, call_next, msg):
+        record = msg.raw_message
+        topic = getattr(record, "topic", "unknown")
+        timestamp_ms = getattr(record, "timestamp", None)
+        if timestamp_ms:
+            KAFKA_CONSUMER_LAG_SECONDS.labels(topic).observe(max(0.0, time.time() - timestamp_ms / 1000))
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(msg)
+            outcome = "ok"
+            return result
+        finally:
+            KAFKA_HANDLER_SECONDS.labels(topic, outcome).observe(time.perf_counter() - started)
+
+
+def _middlewares() -> list:
+    # telemetry middleware가 발행 시 trace context를 헤더에 넣고 수신 시 이어받음
+    # (TracerProvider는 setup_tracing에서 나중에 등록되어도 적용됨)
+    return [KafkaTelemetryMiddleware(), KafkaMetricsMiddleware]
+
+
 def _create_broker() -> KafkaBroker:
     """Kafka 브로커 생성"""
     kwargs = _get_connection_kwargs()
@@ -41,24 +147,75 @@ def _create_broker() -> KafkaBroker:
             kwargs["bootstrap_servers"],
             security=SASLOAuthBearer(ssl_context=kwargs["ssl_context"]),
             sasl_oauth_token_provider=kwargs["sasl_oauth_token_provider"],
+            middlewares=_middlewares(),
+            **_get_producer_kwargs(),
         )
-    return KafkaBroker(kwargs["bootstrap_servers"])
+    return KafkaBroker(kwargs["bootstrap_servers"], middlewares=_middlewares(), **_get_producer_kwargs())
+
+
+# ensure_topics로 확인한 토픽별 파티션 수 (다시 호출되면 admin client 연결 없이 건너뜀)
+_ensured_partitions: dict[str, int] = {}
 
 
 async def ensure_topics(topics: list[str]) -> None:
-    """토픽이 존재하지 않으면 생성"""
-    from aiokafka.admin import AIOKafkaAdminClient, NewTopic
+    """토픽이 존재하지 않으면 설정된 파티션/복제 수로 생성, 기존 토픽은 파티션 수가 부족하면 늘림
+
+    파티션은 줄일 수 없고 복제 수는 기존 토픽에 적용되지 않습니다.
+    이미 설정된 파티션 수 이상으로 확인한 토픽은 다시 확인하지 않습니다.
+    """
+    from aiokafka.admin import AIOKafkaAdminClient, NewPartitions, NewTopic
+
+    topics = [topic for topic in topics if _ensured_partitions.get(topic, 0) < settings.kafka_topic_spec(topic)[0]]
+    if not topics:
+        return
 
     admin = AIOKafkaAdminClient(**_get_connection_kwargs())
     try:
         await admin.start()
-        existing = await admin.list_topics()
-        new_topics = [NewTopic(name=t, num_partitions=1, replication_factor=1) for t in topics if t not in existing]
+        existing = set(await admin.list_topics())
+
+        new_topics = []
+        for topic in topics:
+            if topic not in existing:
+                num_partitions, replication_factor = settings.kafka_topic_spec(topic)
+                new_topics.append(
+                    NewTopic(name=topic, num_partitions=num_partitions, replication_factor=replication_factor)
+                )
         if new_topics:
             await admin.create_topics(new_topics)
-            logger.info(f"Created topics: {[t.name for t in new_topics]}")
+            logger.info(f"Created topics: {[(t.name, t.num_partitions) for t in new_topics]}")
+        _ensured_partitions.update({t.name: t.num_partitions for t in new_topics})
+
+        existing_topics = [topic for topic in topics if topic in existing]
+        if existing_topics:
+            increases = {}
+            for description in await admin.describe_topics(existing_topics):
+                current = len(description["partitions"])
+                num_partitions, _ = settings.kafka_topic_spec(description["topic"])
+                if num_partitions > current:
+                    increases[description["topic"]] = NewPartitions(total_count=num_partitions)
+                else:
+                    _ensured_partitions[description["topic"]] = current
+            if increases:
+                await admin.create_partitions(increases)
+                logger.info(f"Increased partitions: { ({t: p.total_count for t, p in increases.items()}) }")
+                _ensured_partitions.update({t: p.total_count for t, p in increases.items()})
     finally:
         await admin.close()
 
 
 broker = _create_broker()
+
+
+async def publish_batch(messages: list[BaseModel], topic: str, keys: list[str] | None = None) -> None:
+    """여러 메시지를 동시에 발행하여 producer가 linger 동안 파티션별 배치로 묶어 전송하도록 함
+
+    Args:
+        keys: 메시지별 파티션 key (None이면 key 없이 발행)
+    """
+    if not messages:
+        return
+    encoded_keys = [key.encode("utf-8") for key in keys] if keys else [None] * len(messages)
+    await asyncio.gather(
+        *(broker.publish(message, topic=topic, key=key) for message, key in zip(messages, encoded_keys, strict=True))
+    )
@@ -0,0 +1,119 @@
+"""Prometheus 메트릭 정의
+
+모든 메트릭은 프로세스 기본 레지스트리에 등록되며 `/metrics`로 노출됩니다.
+hot path에서는 label 조회와 observe만 수행하도록 단순한 label 조합만 사용합니다.
+"""
+
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# 외부 호출 지연 (ms 단위 S3 호출부터 수 분 걸리는 Agent 호출까지)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# 이벤트 루프 지연 (정상이면 ms 이하, 동기 I/O로 막히면 수백 ms 이상)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Agent
+AGENT_CALL_SECONDS = Histogram(
+    "kb_agent_call_seconds", "Claude Agent 호출 소요 시간", ["operation"], buckets=LATENCY_BUCKETS
+)
+AGENT_QUEUE_SECONDS = Histogram(
+    "kb_agent_queue_seconds", "Agent 동시 호출 제한 대기 시간", ["operation"], buckets=LATENCY_BUCKETS
+)
+AGENT_CALL_ERRORS = Counter("kb_agent_call_errors_total", "Claude Agent 호출 실패 수", ["operation"])
+AGENT_TOKENS = Counter("kb_agent_tokens_total", "Claude Agent 사용 토큰 수", ["operation", "type"])
+AGENT_COST_USD = Counter("kb_agent_cost_usd_total", "Claude Agent 호출 비용 (USD)", ["operation"])
+
+# S3
+S3_REQUEST_SECONDS = Histogram("kb_s3_request_seconds", "S3 요청 소요 시간", ["operation"], buckets=LATENCY_BUCKETS)
+S3_REQUEST_ERRORS = Counter("kb_s3_request_errors_total", "S3 요청 실패 수", ["operation"])
+S3_BYTES = Counter("kb_s3_bytes_total", "S3로 읽고(read) 쓴(write) 바이트 수", ["direction"])
+
+# Bedrock KB
+BEDROCK_REQUEST_SECONDS = Histogram(
+    "kb_bedrock_request_seconds", "Bedrock KB API 요청 소요 시간", ["operation"], buckets=LATENCY_BUCKETS
+)
+BEDROCK_REQUEST_ERRORS = Counter("kb_bedrock_request_errors_total", "Bedrock KB API 요청 실패 수", ["operation"])
+
+# Kafka
+KAFKA_HANDLER_SECONDS = Histogram(
+    "kb_kafka_handler_seconds", "Kafka 이벤트 핸들러 처리 시간", ["topic", "outcome"], buckets=LATENCY_BUCKETS
+)
+KAFKA_CONSUMER_LAG_SECONDS = Histogram(
+    "kb_kafka_consumer_lag_seconds", "메시지 발행부터 처리 시작까지 지연", ["topic"], buckets=LATENCY_BUCKETS
+)
+
+# Compact
+COMPACT_RUN_SECONDS = Histogram(
+    "kb_compact_run_seconds", "compact 실행 소요 시간", ["status"], buckets=LATENCY_BUCKETS + (1800, 3600)
+)
+COMPACT_STAGE_SECONDS = Histogram(
+    "kb_compact_stage_seconds", "compact 단계별 소요 시간", ["stage"], buckets=LATENCY_BUCKETS + (1800, 3600)
+)
+COMPACT_DOCUMENTS = Histogram("kb_compact_documents", "compact 실행당 로드한 문서 수", buckets=SIZE_BUCKETS)
+COMPACT_MERGED = Counter("kb_compact_merged_total", "compact로 병합한 그룹 수")
+COMPACT_DELETED = Counter("kb_compact_deleted_total", "compact로 삭제한 객체 수")
+
+# Readiness
+DEPENDENCY_PROBE_SECONDS = Histogram(
+    "kb_dependency_probe_seconds", "readiness 의존성 확인 소요 시간", ["dependency", "outcome"], buckets=LATENCY_BUCKETS
+)
+DEPENDENCY_UP = Gauge("kb_dependency_up", "마지막 readiness 확인에서 의존성 사용 가능 여부 (1/0)", ["dependency"])
+
+# Event loop
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "kb_event_loop_lag_seconds", "이벤트 루프 지연 (예정 시각보다 늦게 깨어난 시간)", buckets=LAG_BUCKETS
+)
+EVENT_LOOP_STALLS = Counter("kb_event_loop_stalls_total", "임계값 이상 이벤트 루프가 멈춘 횟수")
+
+
+def _body_size(body) -> int:
+    if isinstance(body, bytes | bytearray | str):
+        return len(body)
+    if hasattr(body, "getbuffer"):
+        return body.getbuffer().nbytes
+    return 0
+
+
+def instrument_boto3_client(
+    client,
+    latency: Histogram,
+    errors: Counter | None = None,
+    transferred: Counter | None = None,
+) -> None:
+    """boto3 클라이언트의 모든 API 호출(재시도 포함)을 operation 이름별로 측정
+
+    botocore 이벤트 hook을 사용하므로 서비스 코드의 각 호출 지점을 감쌀 필요가 없습니다.
+
+    Args:
+        transferred: 주어지면 PutObject 요청/GetObject 응답 바이트 수 기록 (S3)
+    """
+    service = client.meta.service_model.service_id.hyphenize()
+
+    def before_call(model, params, context, **kwargs):
+        context["metrics_started"] = time.perf_counter()
+        if transferred is not None and model.name == "PutObject":
+            transferred.labels("write").inc(_body_size(params.get("body")))
+
+    def after_call(model, http_response, parsed, context, **kwargs):
+        started = context.pop("metrics_started", None)
+        if started is None:
+            return
+        latency.labels(model.name).observe(time.perf_counter() - started)
+        if "Error" in parsed:
+            if errors is not None:
+                errors.labels(model.name).inc()
+        elif transferred is not None and model.name == "GetObject":
+            transferred.labels("read").inc(parsed.get("ContentLength") or 0)
+
+    def after_call_error(model, context, **kwargs):
+        started = context.pop("metrics_started", None)
+        if started is not None:
+            latency.labels(model.name).observe(time.perf_counter() - started)
+        if errors is not None:
+            errors.labels(model.name).inc()
+
+    client.meta.events.register(f"before-call.{service}", before_call)
+    client.meta.events.register(f"after-call.{service}", after_call)
+    client.meta.events.register(f"after-call-error.{service}", after_call_error)
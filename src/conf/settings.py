@@ -1,3 +1,7 @@
+import socket
+from typing import Literal
+
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,20 +16,71 @@ class AppSettings(BaseSettings):
 
     # 앱 설정
     debug: bool = False
+    instance_id: str = Field(default_factory=socket.gethostname)  # replica 식별자 (k8s pod 이름)
+    # /ready에서 확인할 의존성
+    readiness_probes: list[Literal["s3", "bedrock", "kafka", "agent"]] = ["s3", "bedrock", "kafka", "agent"]
+    readiness_probe_interval_seconds: float = 15  # 백그라운드 확인 주기 (/ready는 마지막 결과를 반환)
+    readiness_probe_timeout_seconds: float = 5  # 의존성별 확인 제한 시간
+    loop_monitor_enabled: bool = True  # 이벤트 루프 lag 측정 및 멈춤 스택 기록
+    loop_monitor_interval_seconds: float = 0.1  # lag 측정 간격
+    loop_monitor_stall_threshold_seconds: float = 0.25  # 루프가 이 시간 이상 멈추면 스택 기록
 
     # Agent 설정
     agent_cwd: str | None = None
+    agent_cli_path: str | None = None  # Claude Code CLI 경로 (없으면 SDK 번들/PATH에서 탐색)
     claude_code_use_bedrock: bool = False
     anthropic_model: str | None = None
+    agent_merge_max_tokens: int = 60000  # 병합 호출당 문서 토큰 상한 (초과 그룹은 tree-reduce 병합, 0이면 비활성)
+    agent_merge_fan_in: int = 4  # tree-reduce 병합 시 호출당 최대 문서 수
+    agent_merge_concurrency: int = 4  # tree-reduce 병합 시 동시 Agent 호출 수
+    agent_max_concurrency: int = 8  # 프로세스 전체 동시 Agent 호출 수 (0이면 무제한, 대기 시간은 메트릭으로 노출)
+    agent_cassette_mode: Literal["off", "record", "replay"] = "off"  # record: 응답 기록, replay: 기록으로만 응답
+    agent_cassette_path: str = "agent_cassette.jsonl"  # 응답 기록 파일 (JSON lines)
+    agent_replay_speed: float = 1.0  # replay 지연 배율 (0이면 기다리지 않음)
 
     # S3 설정
     s3_bucket: str = ""
     s3_base_prefix: str = "knowledge-base"
     s3_compact_prefix: str = "compacted-knowledge-base"
+    s3_plan_prefix: str = "compact-plans"  # dry run으로 생성된 compact plan 저장 위치
+    s3_state_prefix: str = "compact-state"  # lease 등 compact 내부 상태 저장 위치
+
+    # Compact 설정
+    compact_fetch_concurrency: int = 8  # S3 문서 동시 조회 수
+    compact_memory_budget_bytes: int = 64 * 1024 * 1024  # 프로세스가 동시에 보유할 문서 원문 크기 상한
+    compact_excerpt_chars: int = 4000  # 유사도 분석 프롬프트에 포함할 문서당 발췌 길이
+    compact_max_tokens: int = 0  # 실행당 최대 프롬프트 토큰 (0: 무제한)
+    compact_max_seconds: float = 0  # 실행당 최대 소요 시간 (0: 무제한)
+    compact_max_groups: int = 0  # 실행당 최대 병합 그룹 수 (0: 무제한)
+    compact_tokens_per_second: float = 1000  # 소요 시간 추정용 토큰 처리 속도
+    compact_call_overhead_seconds: float = 5.0  # 소요 시간 추정용 Agent 호출당 고정 비용
+    compact_tier_reexamine_runs: int = 8  # level L 문서끼리는 (값 ** L)번째 실행마다 재검토
+    compact_tier_candidate_limit: int = 50  # 새 문서와 비교할 level 1 후보 최대 수
+    compact_verdict_max_pairs: int = 200_000  # 판정 캐시에 유지할 최대 문서 쌍 수 (0: 무제한)
+    compact_merge_fanout: bool = False  # True면 그룹별 병합 작업을 Kafka로 발행하여 모든 replica가 처리
+    compact_merge_task_timeout_seconds: float = 1800  # 병합 작업 결과 대기 시간
+    compact_lock_ttl_seconds: float = 300  # compact 실행 잠금 만료 시간 (실행 중 ttl/3마다 갱신)
+
+    # Compact 스케줄러 설정
+    compact_schedule_enabled: bool = True
+    # (최소 문서 수, 최소 바이트, 마지막 실행 후 최소 대기 초) - 쌓인 양이 많을수록 빨리 실행
+    compact_schedule_tiers: list[tuple[int, int, float]] = [
+        (20, 1024 * 1024, 6 * 3600),
+        (100, 10 * 1024 * 1024, 3600),
+        (500, 100 * 1024 * 1024, 300),
+    ]
+    compact_schedule_max_interval_seconds: float = 24 * 3600  # 새 문서가 있으면 이 간격마다 실행
+    compact_schedule_check_interval_seconds: float = 60
+    compact_schedule_lease_ttl_seconds: float = 180  # leader lease 만료 시간
 
     # Bedrock Knowledge Base 설정
     bedrock_kb_id: str = ""
     bedrock_data_source_id: str = ""
+    bedrock_sync_poll_interval_seconds: float = 5  # 동기화 작업 상태 첫 조회 간격 (이후 2배씩 증가)
+    bedrock_sync_poll_max_interval_seconds: float = 60
+    bedrock_sync_poll_max_errors: int = 10  # 상태 조회 연속 실패 시 작업을 FAILED로 처리
+    bedrock_sync_history: int = 50  # 보관할 완료 작업 수
+    bedrock_document_sync_threshold: int = 20  # 변경 문서 수가 이하면 문서 단위 ingest/delete (0이면 항상 전체 동기화)
 
     # AWS 설정 (로컬: 환경변수로 키 입력, 원격: IRSA)
     aws_region: str = "ap-northeast-2"
@@ -35,15 +90,89 @@ class AppSettings(BaseSettings):
     # Kafka/MSK 설정
     kafka_bootstrap_servers: str = "localhost:9092"
     kafka_use_iam: bool = False  # True for MSK Serverless with IAM auth
+    kafka_iam_token_refresh_ahead_seconds: float = 300  # IAM 토큰 만료 전 백그라운드 갱신 시작 시점
+
+    # Producer 설정 (lz4/zstd 압축은 cramjam 패키지 필요)
+    kafka_producer_acks: Literal["0", "1", "all"] = "all"
+    kafka_producer_enable_idempotence: bool = True  # acks=all 필요, 재전송 시 중복 방지
+    kafka_producer_linger_ms: int = 5  # 배치로 모으기 위해 전송을 지연하는 최대 시간
+    kafka_producer_max_batch_size: int = 64 * 1024  # 파티션별 배치 최대 크기 (bytes)
+    kafka_producer_compression_type: Literal["gzip", "snappy", "lz4", "zstd"] | None = None
+
+    kafka_ensure_topics: bool = True  # 시작 시 토픽 생성/파티션 확인 (토픽을 IaC 등으로 관리하면 false)
+    kafka_default_partitions: int = 1
+    kafka_default_replication_factor: int = 1
+    kafka_topic_partitions: dict[str, int] = {}  # 토픽별 파티션 수 (예: {"knowledge-base.compact.merge": 12})
+    kafka_topic_replication_factors: dict[str, int] = {}  # 토픽별 복제 수
+
+    # Consumer 설정 (처리 완료 후 offset commit)
+    kafka_max_poll_interval_ms: int = 3600000  # 오래 걸리는 핸들러 처리 중 rebalance 방지
+    kafka_compact_max_workers: int = 1  # compact 이벤트 동시 처리 수 (파티션 단위)
+    kafka_merge_max_workers: int = 4  # 병합 작업 동시 처리 수 (파티션 단위)
+    # 재시도 토픽별 지연 (단계 수 = 최대 재시도 횟수, kafka_max_poll_interval_ms보다 짧아야 함)
+    kafka_retry_delays_seconds: list[float] = [30, 120, 480]
 
     # Topic 설정
     kafka_topic_compact: str = "knowledge-base.compact"
+    kafka_topic_uploaded: str = "knowledge-base.uploaded"
+    kafka_topic_compact_merge: str = "knowledge-base.compact.merge"
+    kafka_topic_compact_merge_results: str = "knowledge-base.compact.merge-results"
+    kafka_topic_compact_results: str = "knowledge-base.compact.results"  # 진행/결과 이벤트 (대시보드, 후속 indexer용)
     kafka_consumer_group: str = "quanda-kb-pipeline"
 
+    # Tracing 설정 (OpenTelemetry, none이면 비활성)
+    otel_traces_exporter: Literal["none", "otlp", "file", "console"] = "none"
+    otel_exporter_otlp_endpoint: str = "http://localhost:4318/v1/traces"  # OTLP/HTTP collector
+    otel_traces_file: str = "traces.jsonl"  # file exporter 출력 (span당 JSON 한 줄)
+    otel_service_name: str = "quanda-kb-pipeline"
+    otel_sample_ratio: float = 1.0  # 새 trace 샘플링 비율 (부모 span이 있으면 부모 결정을 따름)
+
+    # 프로파일링 설정 (X-Profile 헤더/?profile= 쿼리 또는 CompactEvent.profile로 요청, debug면 항상 활성)
+    profiling_enabled: bool = False
+    profiling_token: str = ""  # 설정 시 요청 값이 토큰과 일치해야 프로파일 (없으면 1/true)
+    profiling_output: Literal["local", "s3"] = "local"
+    profiling_directory: str = "profiles"  # local 저장 디렉토리
+    profiling_s3_prefix: str = "profiles"  # s3 저장 prefix
+    profiling_interval_seconds: float = 0.001  # pyinstrument 샘플링 간격
+
+    @model_validator(mode="after")
+    def _validate_producer(self) -> "AppSettings":
+        if self.kafka_producer_enable_idempotence and self.kafka_producer_acks != "all":
+            raise ValueError("KAFKA_PRODUCER_ENABLE_IDEMPOTENCE requires KAFKA_PRODUCER_ACKS=all")
+        return self
+
+    def kafka_topic_spec(self, topic: str) -> tuple[int, int]:
+        """토픽의 (파티션 수, 복제 수)"""
+        return (
+            self.kafka_topic_partitions.get(topic, self.kafka_default_partitions),
+            self.kafka_topic_replication_factors.get(topic, self.kafka_default_replication_factor),
+        )
+
+    def kafka_retry_topic(self, topic: str, attempt: int) -> str:
+        """attempt번째 재시도 토픽"""
+        return f"{topic}.retry.{attempt}"
+
+    def kafka_dlq_topic(self, topic: str) -> str:
+        """dead letter 토픽"""
+        return f"{topic}.dlq"
+
+    def kafka_retry_topics(self, topic: str) -> list[str]:
+        """토픽의 재시도/dead letter 토픽 목록"""
+        retries = [self.kafka_retry_topic(topic, n) for n in range(1, len(self.kafka_retry_delays_seconds) + 1)]
+        return [*retries, self.kafka_dlq_topic(topic)]
+
     @property
     def kafka_topics(self) -> list[str]:
         """등록된 모든 Kafka 토픽 목록"""
-        return [self.kafka_topic_compact]
+        return [
+            self.kafka_topic_compact,
+            self.kafka_topic_uploaded,
+            self.kafka_topic_compact_merge,
+            self.kafka_topic_compact_merge_results,
+            self.kafka_topic_compact_results,
+            *self.kafka_retry_topics(self.kafka_topic_compact),
+            *self.kafka_retry_topics(self.kafka_topic_compact_merge),
+        ]
 
 
 settings = AppSettings()
@@ -0,0 +1,99 @@
+"""OpenTelemetry tracing 설정
+
+OTEL_TRACES_EXPORTER가 none이면 TracerProvider를 등록하지 않으므로 모든 span은 no-op입니다.
+Kafka 메시지에는 faststream telemetry middleware가 trace context를 헤더로 전파합니다.
+"""
+
+import logging
+
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+from src.conf.settings import settings
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("quanda-kb-pipeline")
+
+
+def _span_exporter():
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if settings.otel_traces_exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp-proto-http is not installed, tracing disabled")
+            return None
+        return OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint)
+
+    if settings.otel_traces_exporter == "file":
+        # span 하나당 JSON 한 줄 (파일은 프로세스 종료까지 exporter가 사용)
+        out = open(settings.otel_traces_file, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+
+    return ConsoleSpanExporter()
+
+
+def setup_tracing() -> None:
+    """설정된 exporter로 TracerProvider 등록 (none이면 아무것도 하지 않음)"""
+    if settings.otel_traces_exporter == "none":
+        return
+
+    from opentelemetry.sdk.resources import SERVICE_INSTANCE_ID, SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+
+    exporter = _span_exporter()
+    if exporter is None:
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({SERVICE_NAME: settings.otel_service_name, SERVICE_INSTANCE_ID: settings.instance_id}),
+        sampler=ParentBasedTraceIdRatio(settings.otel_sample_ratio),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled: exporter={settings.otel_traces_exporter}")
+
+
+def shutdown_tracing() -> None:
+    """남은 span flush"""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+def trace_boto3_client(client) -> None:
+    """boto3 클라이언트의 모든 API 호출을 span으로 기록 (botocore 이벤트 hook)"""
+    service = client.meta.service_model.service_id.hyphenize()
+
+    def before_call(model, params, context, **kwargs):
+        span = tracer.start_span(
+            f"{service}.{model.name}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"rpc.system": "aws-api", "rpc.service": service, "rpc.method": model.name},
+        )
+        context["trace_span"] = span
+
+    def after_call(model, http_response, parsed, context, **kwargs):
+        span = context.pop("trace_span", None)
+        if span is None:
+            return
+        span.set_attribute("http.response.status_code", http_response.status_code)
+        if "Error" in parsed:
+            span.set_status(Status(StatusCode.ERROR, parsed["Error"].get("Code")))
+        span.end()
+
+    def after_call_error(model, exception, context, **kwargs):
+        span = context.pop("trace_span", None)
+        if span is None:
+            return
+        span.record_exception(exception)
+        span.set_status(Status(StatusCode.ERROR, type(exception).__name__))
+        span.end()
+
+    client.meta.events.register(f"before-call.{service}", before_call)
+    client.meta.events.register(f"after-call.{service}", after_call)
+    client.meta.events.register(f"after-call-error.{service}", after_call_error)
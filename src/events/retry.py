@@ -0,0 +1,121 @@
+"""이벤트 핸들러 재시도/dead letter 유틸리티
+
+일시적 오류(throttling, 연결/timeout)로 실패한 이벤트는 `{topic}.retry.{n}` 토픽으로 보내 지연 후 다시 처리하고,
+재시도를 모두 소진했거나 일시적이지 않은 오류면 `{topic}.dlq`로 보냅니다.
+재시도 토픽 consumer가 처리 가능 시각까지 기다리므로 원래 토픽의 다음 이벤트 처리를 막지 않습니다.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+from faststream import AckPolicy
+from pydantic import BaseModel
+
+from src.conf.kafka import broker
+from src.conf.settings import settings
+from src.utils.datetime import utc_now
+from src.utils.errors import is_transient
+
+logger = logging.getLogger(__name__)
+
+RETRY_ATTEMPT_HEADER = "x-retry-attempt"
+RETRY_NOT_BEFORE_HEADER = "x-retry-not-before"
+ORIGINAL_TOPIC_HEADER = "x-original-topic"
+ERROR_HEADER = "x-error"
+
+
+def retry_attempt(headers: dict | None) -> int:
+    """메시지의 재시도 번호 (원래 토픽 메시지는 0)"""
+    if not isinstance(headers, dict):
+        return 0
+    try:
+        return int(headers.get(RETRY_ATTEMPT_HEADER, 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+async def wait_for_retry(headers: dict | None) -> int:
+    """재시도 메시지면 처리 가능 시각까지 대기
+
+    Returns:
+        재시도 번호
+    """
+    attempt = retry_attempt(headers)
+    if attempt:
+        try:
+            delay = float(headers.get(RETRY_NOT_BEFORE_HEADER, 0)) - utc_now().timestamp()
+        except (TypeError, ValueError):
+            delay = 0
+        if delay > 0:
+            logger.info(f"Delaying retry attempt {attempt} for {delay:.0f}s")
+            await asyncio.sleep(delay)
+    return attempt
+
+
+async def retry_or_dead_letter(
+    message: BaseModel,
+    topic: str,
+    attempt: int,
+    error: Exception,
+    key: str | None = None,
+) -> str:
+    """실패한 이벤트를 다음 재시도 토픽 또는 dead letter 토픽으로 발행
+
+    Args:
+        topic: 원래 토픽
+        attempt: 실패한 시도의 재시도 번호 (원래 토픽이면 0)
+
+    Returns:
+        "retry" | "dead_letter"
+    """
+    delays = settings.kafka_retry_delays_seconds
+    headers = {ORIGINAL_TOPIC_HEADER: topic, ERROR_HEADER: f"{type(error).__name__}: {error}"[:1000]}
+    encoded_key = key.encode("utf-8") if key else None
+
+    if is_transient(error) and attempt < len(delays):
+        next_attempt = attempt + 1
+        not_before = utc_now().timestamp() + delays[attempt]
+        await broker.publish(
+            message,
+            topic=settings.kafka_retry_topic(topic, next_attempt),
+            key=encoded_key,
+            headers={**headers, RETRY_ATTEMPT_HEADER: str(next_attempt), RETRY_NOT_BEFORE_HEADER: str(not_before)},
+        )
+        logger.warning(f"Scheduled retry {next_attempt}/{len(delays)} for {topic} in {delays[attempt]}s: {error}")
+        return "retry"
+
+    await broker.publish(
+        message,
+        topic=settings.kafka_dlq_topic(topic),
+        key=encoded_key,
+        headers={**headers, RETRY_ATTEMPT_HEADER: str(attempt)},
+    )
+    logger.error(f"Sent {topic} event to dead letter topic after {attempt} retries: {error}")
+    return "dead_letter"
+
+
+def subscriber_with_retry(topic: str, group_id: str, max_workers: int = 1) -> Callable:
+    """원래 토픽과 모든 재시도 토픽을 같은 핸들러로 구독 (처리 완료 후 offset commit)
+
+    재시도 토픽은 메시지마다 지연 대기하므로 worker 하나로 순서대로 처리합니다.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        handler = broker.subscriber(
+            topic,
+            group_id=group_id,
+            ack_policy=AckPolicy.ACK,
+            max_workers=max_workers,
+            max_poll_interval_ms=settings.kafka_max_poll_interval_ms,
+        )(func)
+        for attempt in range(1, len(settings.kafka_retry_delays_seconds) + 1):
+            handler = broker.subscriber(
+                settings.kafka_retry_topic(topic, attempt),
+                group_id=group_id,
+                ack_policy=AckPolicy.ACK,
+                max_poll_interval_ms=settings.kafka_max_poll_interval_ms,
+            )(handler)
+        return handler
+
+    return decorator
@@ -1 +1 @@
-from src.events.v1 import compact  # noqa: F401
+from src.events.v1 import compact, merge, scheduler  # noqa: F401
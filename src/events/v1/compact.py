@@ -1,25 +1,171 @@
 """Compact 이벤트 핸들러"""
 
 import logging
+import time
+
+from faststream import Context
 
 from src.conf.container import Container
 from src.conf.kafka import broker
+from src.conf.metrics import (
+    COMPACT_DELETED,
+    COMPACT_DOCUMENTS,
+    COMPACT_MERGED,
+    COMPACT_RUN_SECONDS,
+    COMPACT_STAGE_SECONDS,
+)
 from src.conf.settings import settings
-from src.schema.v1.compact_event import CompactEvent, CompactResult
+from src.conf.tracing import tracer
+from src.events.retry import retry_or_dead_letter, subscriber_with_retry, wait_for_retry
+from src.schema.v1.compact_event import CompactEvent, CompactProgress, CompactResult, CompactStats
+from src.services.compact_lock import CompactLockLostError
+from src.services.run_stats import RunStats
+from src.services.usage import track_usage
 
 logger = logging.getLogger(__name__)
 
 
-@broker.subscriber(settings.kafka_topic_compact, group_id=settings.kafka_consumer_group)
-async def handle_compact(event: CompactEvent) -> CompactResult:
-    """Compact 이벤트 처리"""
-    logger.info(f"Received compact event: trigger={event.trigger}, dry_run={event.dry_run}")
+async def _execute(event: CompactEvent, run_stats: RunStats) -> dict:
+    compact_service = Container.compact_service()
+    attributes = {
+        "compact.run_id": run_stats.run_id,
+        "compact.trigger": event.trigger,
+        "compact.dry_run": event.dry_run,
+    }
+    if event.plan_id:
+        with tracer.start_as_current_span("compact.apply", attributes={**attributes, "compact.plan_id": event.plan_id}):
+            return await compact_service.apply(event.plan_id)
+    with tracer.start_as_current_span("compact.run", attributes=attributes):
+        return await compact_service.run(dry_run=event.dry_run, progress=run_stats)
+
+
+async def _publish_to_results(message: CompactProgress | CompactResult, run_id: str, event_type: str) -> None:
+    """결과 토픽에 발행 (실패해도 compact 처리에는 영향 없음)"""
+    try:
+        await broker.publish(
+            message,
+            topic=settings.kafka_topic_compact_results,
+            key=run_id.encode("utf-8"),
+            headers={"x-event-type": event_type},
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish compact {event_type}: {e}")
+
+
+# 처리 완료 후 offset commit - 처리 중 종료되면 다른 consumer가 다시 처리
+@subscriber_with_retry(
+    settings.kafka_topic_compact,
+    group_id=settings.kafka_consumer_group,
+    max_workers=settings.kafka_compact_max_workers,
+)
+async def handle_compact(
+    event: CompactEvent,
+    headers: dict | None = Context("message.headers", default=None),
+) -> CompactResult:
+    """Compact 이벤트 처리
+
+    문서를 변경하는 실행(dry run 제외)은 잠금을 잡고 하나씩만 수행합니다.
+    실행 중 들어온 트리거는 후속 실행 한 번으로 합쳐지고, plan 적용은 거부됩니다.
+    실패하면 일시적 오류는 재시도 토픽으로, 그 외에는 dead letter 토픽으로 보냅니다.
+    """
+    attempt = await wait_for_retry(headers)
+    logger.info(
+        f"Received compact event: trigger={event.trigger}, dry_run={event.dry_run}, plan_id={event.plan_id}, "
+        f"attempt={attempt}"
+    )
+
+    async def report_progress(run_id: str, stage: str, stats: CompactStats) -> None:
+        progress = CompactProgress(
+            run_id=run_id, stage=stage, trigger=event.trigger, dry_run=event.dry_run, stats=stats
+        )
+        await _publish_to_results(progress, run_id, "progress")
+
+    run_stats = RunStats(on_progress=report_progress)
+    started = time.perf_counter()
+    with track_usage() as usage:
+        if event.profile:
+            async with Container.profiler().profile(f"compact-{run_stats.run_id}") as profile_run:
+                result = await _process(event, attempt, run_stats)
+            result.profile_location = profile_run.location
+        else:
+            result = await _process(event, attempt, run_stats)
+    result.run_id = result.run_id or run_stats.run_id
+    result.usage = usage if usage.calls else None
+    _record_metrics(result, time.perf_counter() - started)
+    await _publish_to_results(result, result.run_id, "result")
+    return result
+
+
+def _record_metrics(result: CompactResult, elapsed_seconds: float) -> None:
+    COMPACT_RUN_SECONDS.labels(result.status).observe(elapsed_seconds)
+    COMPACT_MERGED.inc(result.merged)
+    COMPACT_DELETED.inc(result.deleted)
+    if result.stats is not None:
+        COMPACT_DOCUMENTS.observe(result.stats.documents_loaded)
+        for stage, seconds in result.stats.stage_seconds.items():
+            COMPACT_STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+async def _retry_or_fail(event: CompactEvent, attempt: int, error: Exception) -> CompactResult:
+    """실패한 이벤트를 재시도/dead letter 토픽으로 보내고 결과 반환"""
+    outcome = await retry_or_dead_letter(event, settings.kafka_topic_compact, attempt, error)
+    return CompactResult(
+        status="retrying" if outcome == "retry" else "failed",
+        merged=0,
+        deleted=0,
+        deleted_keys=[],
+        plan_id=event.plan_id,
+        error=str(error),
+    )
+
+
+async def _process(event: CompactEvent, attempt: int, run_stats: RunStats) -> CompactResult:
+    """잠금/후속 실행/재시도를 처리하며 compact 실행
+
+    dry run도 verdict/plan 파일을 쓰므로 잠금을 잡고 실행합니다 (실행 중이면 후속 실행으로 합치지 않고 거부).
+    """
+    compact_lock = Container.compact_lock()
+    try:
+        lease = await compact_lock.acquire()
+    except Exception as e:
+        # S3 오류는 다른 실행이 잠금을 보유한 것과 구분하여 재시도
+        logger.exception(f"Failed to acquire compact lock: {e}")
+        return await _retry_or_fail(event, attempt, e)
+    if lease is None:
+        if event.plan_id or event.dry_run:
+            logger.info(f"Compact in progress, rejecting dry_run={event.dry_run}, plan_id={event.plan_id}")
+            return CompactResult(
+                status="rejected",
+                merged=0,
+                deleted=0,
+                plan_id=event.plan_id,
+                error="Another compact run is in progress",
+            )
+        logger.info("Compact in progress, coalescing into follow-up run")
+        await compact_lock.request_follow_up()
+        return CompactResult(status="coalesced", merged=0, deleted=0)
 
+    lost = False
     try:
-        compact_service = Container.compact_service()
-        result = await compact_service.run(dry_run=event.dry_run)
+        async with compact_lock.hold(lease):
+            result = await _execute(event, run_stats)
         logger.info(f"Compact completed: {result}")
         return CompactResult(**result)
+    except CompactLockLostError as e:
+        # 잠금을 가져간 실행이 끝난 뒤 다시 실행되도록 후속 실행 표시 (dry run/plan 적용은 요청자가 다시 요청)
+        lost = True
+        logger.error(f"Compact aborted: {e}")
+        if not event.dry_run and not event.plan_id:
+            await compact_lock.request_follow_up()
+        return CompactResult(status="failed", merged=0, deleted=0, plan_id=event.plan_id, error=str(e))
     except Exception as e:
         logger.exception(f"Compact failed: {e}")
-        return CompactResult(status="failed", merged=0, deleted=0, deleted_keys=[])
+        return await _retry_or_fail(event, attempt, e)
+    finally:
+        # 잠금 반환 후 확인해야 반환 직전에 들어온 트리거도 놓치지 않음 (잠금을 잃었으면 현재 보유자가 확인)
+        if not lost and await compact_lock.take_follow_up():
+            logger.info("Publishing coalesced follow-up compact run")
+            try:
+                await broker.publish(CompactEvent(trigger="coalesced"), topic=settings.kafka_topic_compact)
+            except Exception as e:
+                logger.error(f"Failed to publish follow-up compact run: {e}")
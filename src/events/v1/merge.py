@@ -0,0 +1,59 @@
+"""병합 작업 이벤트 핸들러
+
+작업 토픽은 공용 consumer group으로 replica들이 나누어 처리하고,
+결과 토픽은 모든 replica가 수신하여 coordinator가 run_id로 자신의 결과만 수집합니다.
+결과는 coordinator가 실행 중에만 기다리므로 offset을 커밋하지 않는 group 없는 consumer로 구독합니다
+(replica마다 consumer group을 만들면 pod가 바뀔 때마다 남는 group이 생김).
+"""
+
+import logging
+
+from faststream import Context
+
+from src.conf.container import Container
+from src.conf.kafka import broker
+from src.conf.settings import settings
+from src.events.retry import retry_or_dead_letter, subscriber_with_retry, wait_for_retry
+from src.schema.v1.merge_task import MergeTask, MergeTaskResult
+
+logger = logging.getLogger(__name__)
+
+
+@subscriber_with_retry(
+    settings.kafka_topic_compact_merge,
+    group_id=settings.kafka_consumer_group,
+    max_workers=settings.kafka_merge_max_workers,
+)
+async def handle_merge_task(
+    task: MergeTask,
+    headers: dict | None = Context("message.headers", default=None),
+) -> None:
+    """그룹 병합 작업 처리 후 결과 발행
+
+    재시도가 예약되면 결과를 발행하지 않아 coordinator가 계속 기다립니다.
+    """
+    attempt = await wait_for_retry(headers)
+    logger.info(
+        f"Received merge task: run_id={task.run_id}, group_id={task.group_id}, sources={len(task.sources)}, "
+        f"attempt={attempt}"
+    )
+
+    try:
+        result = await Container.compact_service().merge_task(task)
+    except Exception as e:
+        logger.exception(f"Merge task failed: {e}")
+        if (
+            await retry_or_dead_letter(task, settings.kafka_topic_compact_merge, attempt, e, key=task.group_id)
+            == "retry"
+        ):
+            return
+        result = MergeTaskResult(run_id=task.run_id, group_id=task.group_id, status="failed", error=str(e))
+
+    await broker.publish(result, topic=settings.kafka_topic_compact_merge_results)
+
+
+@broker.subscriber(settings.kafka_topic_compact_merge_results, auto_offset_reset="latest")
+async def collect_merge_result(result: MergeTaskResult) -> None:
+    """이 replica가 coordinator인 실행의 결과 수집"""
+    if Container.merge_result_collector().deliver(result):
+        logger.debug(f"Collected merge result: group_id={result.group_id}, status={result.status}")
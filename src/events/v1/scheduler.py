@@ -0,0 +1,31 @@
+"""Compact 스케줄러 이벤트 핸들러
+
+스케줄러 누적량은 replica마다 메모리에 집계하므로 모든 replica가 업로드/compact 이벤트를 전부 수신합니다.
+leader가 누적량을 lease 객체에 저장하여 leader가 바뀌어도 이어받으므로, offset을 커밋하지 않는
+group 없는 consumer로 구독합니다 (replica마다 consumer group을 만들면 pod가 바뀔 때마다 남는 group이 생김).
+"""
+
+import logging
+
+from src.conf.container import Container
+from src.conf.kafka import broker
+from src.conf.settings import settings
+from src.schema.v1.compact_event import CompactEvent
+from src.schema.v1.upload_event import DocumentUploadedEvent
+
+logger = logging.getLogger(__name__)
+
+
+@broker.subscriber(settings.kafka_topic_uploaded, auto_offset_reset="latest")
+async def track_upload(event: DocumentUploadedEvent) -> None:
+    """업로드된 문서를 스케줄러 누적량에 반영"""
+    Container.compact_scheduler().record_upload(event.size)
+
+
+@broker.subscriber(settings.kafka_topic_compact, auto_offset_reset="latest")
+async def track_compact(event: CompactEvent) -> None:
+    """compact 전체 실행 시 스케줄러 누적량 초기화 (dry run, plan 적용 제외)"""
+    if event.dry_run or event.plan_id:
+        return
+    logger.debug(f"Compact triggered ({event.trigger}), resetting scheduler counters")
+    Container.compact_scheduler().record_run()
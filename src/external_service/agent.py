@@ -1,3 +1,9 @@
+import asyncio
+import os
+import shutil
+import time
+from contextlib import nullcontext
+from textwrap import dedent
 from typing import AsyncIterator
 
 from claude_agent_sdk import (
@@ -8,6 +14,133 @@ from claude_agent_sdk import (
     query,
 )
 
+from src.conf.metrics import (
+    AGENT_CALL_ERRORS,
+    AGENT_CALL_SECONDS,
+    AGENT_COST_USD,
+    AGENT_QUEUE_SECONDS,
+    AGENT_TOKENS,
+)
+from src.conf.tracing import tracer
+from src.external_service.agent_cassette import AgentCassette
+from src.schema.v1.usage import UsageTotals
+from src.services.usage import record_usage
+from src.utils.tokens import estimate_tokens
+
+# 유사도 판정 프롬프트/응답 형식이 바뀌면 증가 (판정 캐시 무효화)
+SIMILARITY_PROMPT_VERSION = "1"
+
+DEFAULT_SYSTEM_PROMPT = "You are a document analysis assistant. Analyze files and extract metadata."
+
+
+def build_similarity_prompt(documents: list[dict]) -> str:
+    """유사 문서 그룹핑 프롬프트 생성
+
+    Args:
+        documents: [{key, content, metadata}, ...]
+    """
+    # 문서 내용 포함하여 생성
+    doc_entries = []
+    for i, doc in enumerate(documents, 1):
+        content = doc.get("content", "")
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", errors="replace")
+
+        doc_entries.append(f"=== 문서 {i}: {doc['key']} ===\n{content}")
+
+    docs_text = "\n\n".join(doc_entries)
+
+    return dedent(f"""
+        다음 문서들을 분석하여 두 가지 작업을 수행하세요:
+
+        ## 1단계: 가치 없는 문서 제거
+        아래에 해당하는 문서는 "DELETE" 그룹에 넣으세요:
+        - 단순 인사/안부 세션 (hi, hello, 안녕 등 실질적 내용 없음)
+        - 오류/실패만 기록된 세션 (유의미한 결과 없음)
+        - 테스트/디버그 목적의 일회성 세션
+        - 빈 내용이거나 의미 있는 정보가 전혀 없는 문서
+
+        ## 2단계: 유사 문서 그룹핑
+        나머지 문서 중 **정말로 중복되거나 동일한 내용**인 문서만 그룹으로 묶으세요.
+
+        병합 기준 (모두 충족해야 함):
+        - 동일한 특정 주제를 다룸 (일반적인 주제 공유는 불충분)
+        - 동일한 문서 유형 (가이드는 가이드끼리, 리포트는 리포트끼리)
+        - 내용이 실제로 중복되거나 하나로 합쳐야 의미가 있는 경우
+
+        병합하면 안 되는 경우:
+        - 단순히 같은 도메인/분야를 다루는 경우 (예: 둘 다 "데이터" 관련)
+        - 문서 유형이 다른 경우 (가이드 vs 리포트 vs 기술문서)
+        - 각각 독립적인 정보를 담고 있는 경우
+
+        확실하지 않으면 병합하지 마세요. 대부분의 문서는 단독 그룹이어야 합니다.
+
+        문서들:
+        {docs_text}
+
+        JSON 형식으로 반환해주세요 (다른 텍스트 없이):
+        {{
+            "delete": ["삭제할key1", "삭제할key2"],
+            "groups": [["key1", "key2"], ["key3"], ...]
+        }}
+
+        주의:
+        - delete에 포함된 키는 groups에 넣지 마세요.
+        - 나머지 모든 문서 키는 반드시 groups의 하나의 그룹에만 포함되어야 합니다.
+    """).strip()
+
+
+def build_merge_prompt(documents: list[dict]) -> str:
+    """문서 병합 프롬프트 생성
+
+    Args:
+        documents: [{key, content, metadata}, ...]
+    """
+    # 문서 내용 조합
+    docs_content = []
+    for i, doc in enumerate(documents, 1):
+        content = doc.get("content", "")
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", errors="replace")
+        docs_content.append(f"=== 문서 {i}: {doc['key']} ===\n{content}")
+
+    docs_text = "\n\n---\n\n".join(docs_content)
+
+    return dedent(f"""
+        다음 문서들을 분석하여 하나의 **요약된 통합 문서**로 만들어주세요.
+
+        작성 방식:
+        - 단순히 문서들을 이어붙이지 말고, 핵심 내용을 추출하여 요약
+        - 중복 정보는 한 번만 포함
+        - 논리적 구조로 재구성 (제목, 섹션 등)
+        - 원본보다 간결하지만 중요 정보는 모두 포함
+        - 마크다운 형식으로 작성
+
+        원본 문서들:
+        {docs_text}
+
+        JSON으로 반환해주세요 (다른 텍스트 없이):
+        {{
+            "directory": "주제-도메인명",
+            "filename": "구체적-내용.md",
+            "content": "요약된 통합 문서 (마크다운)",
+            "metadata": {{
+                "summary": "통합 문서 요약 (2-3문장)",
+                "categories": ["카테고리1", "카테고리2"],
+                "tags": ["태그1", "태그2", "태그3"]
+            }}
+        }}
+
+        directory/filename 작성 규칙:
+        - 반드시 영문 kebab-case 사용 (소문자, 하이픈으로 연결)
+        - directory: 문서의 주제/도메인을 나타내는 2-4단어
+          예시: samsung-stock-analysis, fnguide-roe-query, kospi-etf-ranking, us-stock-price, compustat-data-guide
+        - filename: 구체적인 문서 내용을 설명하는 이름.md
+          예시: daily-price-summary.md, roe-consensus-report.md, top10-etf-list.md
+        - 절대 "uncategorized", "session-report" 같은 일반적인 이름 사용 금지
+        - 문서 내용에서 핵심 키워드를 추출하여 명명
+    """).strip()
+
 
 class AgentService:
     """Claude Agent 서비스 추상화 레이어"""
@@ -19,12 +152,30 @@ class AgentService:
         cwd: str | None = None,
         use_bedrock: bool = False,
         model: str | None = None,
+        merge_max_tokens: int = 0,
+        merge_fan_in: int = 4,
+        merge_concurrency: int = 4,
+        max_concurrency: int = 0,
+        cassette: AgentCassette | None = None,
+        cli_path: str | None = None,
     ):
         self.system_prompt = system_prompt
         self.max_turns = max_turns
         self.cwd = cwd
         self.use_bedrock = use_bedrock
         self.model = model
+        # 병합 호출당 문서 토큰 상한 (0이면 그룹 전체를 한 번에 병합)
+        self.merge_max_tokens = merge_max_tokens
+        self.merge_fan_in = max(2, merge_fan_in)
+        self._merge_semaphore = asyncio.Semaphore(max(1, merge_concurrency))
+        # 전체 Agent 동시 호출 수 제한 (0이면 무제한) - 대기 시간은 메트릭으로 기록
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        # 응답 기록/재생 (replay 모드면 실제 Agent를 호출하지 않음)
+        self.cassette = cassette
+        # Claude Code CLI 경로 (없으면 SDK가 탐색)
+        self.cli_path = cli_path or None
+        # 실행을 확인한 CLI 경로 (readiness probe)
+        self._verified_cli: str | None = None
 
     def _build_options(self, **kwargs) -> ClaudeAgentOptions:
         """ClaudeAgentOptions 빌드"""
@@ -39,32 +190,108 @@ class AgentService:
             max_turns=kwargs.get("max_turns", self.max_turns),
             cwd=kwargs.get("cwd", self.cwd),
             env=env,
+            cli_path=self.cli_path,
         )
 
+    async def check_cli(self) -> None:
+        """Claude Code CLI 실행 확인 (readiness probe, 실패 시 RuntimeError)
+
+        처음 한 번 `--version`으로 실행을 확인하고 이후에는 실행 파일 존재만 확인합니다.
+        replay 모드는 CLI를 호출하지 않으므로 확인하지 않습니다.
+        """
+        if self.cassette is not None and self.cassette.replaying:
+            return
+
+        cli = self.cli_path or shutil.which("claude")
+        if cli is None:
+            raise RuntimeError("Claude Code CLI not found (set AGENT_CLI_PATH or add claude to PATH)")
+        if cli == self._verified_cli and os.access(cli, os.X_OK):
+            return
+
+        process = await asyncio.create_subprocess_exec(
+            cli, "--version", stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        if process.returncode != 0:
+            raise RuntimeError(f"Claude Code CLI exited with {process.returncode}: {stderr.decode(errors='replace')}")
+        self._verified_cli = cli
+
     async def query(
         self,
         prompt: str,
         **kwargs,
     ) -> AsyncIterator[AssistantMessage | ResultMessage]:
-        """Claude Agent에 쿼리 전송"""
+        """Claude Agent에 쿼리 전송 (cassette가 있으면 기록 또는 재생)"""
         options = self._build_options(**kwargs)
-        async for message in query(prompt=prompt, options=options):
+        if self.cassette is not None and self.cassette.replaying:
+            messages = self.cassette.replay(prompt, options.system_prompt)
+        else:
+            messages = query(prompt=prompt, options=options)
+            if self.cassette is not None and self.cassette.recording:
+                messages = self.cassette.record(prompt, messages, options.system_prompt)
+        async for message in messages:
             yield message
 
-    async def query_text(self, prompt: str, **kwargs) -> str:
-        """Claude Agent에 쿼리 전송 후 텍스트만 반환"""
-        result_text = ""
-        async for message in self.query(prompt, **kwargs):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        result_text += block.text
+    async def query_text(self, prompt: str, operation: str = "query", **kwargs) -> str:
+        """Claude Agent에 쿼리 전송 후 텍스트만 반환
+
+        Args:
+            operation: 메트릭 label (호출한 기능 이름)
+        """
+        queued = time.perf_counter()
+        async with self._semaphore or nullcontext():
+            started = time.perf_counter()
+            AGENT_QUEUE_SECONDS.labels(operation).observe(started - queued)
+            result_text = ""
+            with tracer.start_as_current_span(
+                f"agent.{operation}",
+                attributes={"agent.operation": operation, "agent.queue_seconds": started - queued},
+            ) as span:
+                try:
+                    async for message in self.query(prompt, **kwargs):
+                        if isinstance(message, AssistantMessage):
+                            for block in message.content:
+                                if isinstance(block, TextBlock):
+                                    result_text += block.text
+                        elif isinstance(message, ResultMessage):
+                            self._record_result(operation, message, span)
+                except Exception:
+                    AGENT_CALL_ERRORS.labels(operation).inc()
+                    raise
+                finally:
+                    AGENT_CALL_SECONDS.labels(operation).observe(time.perf_counter() - started)
+                span.set_attribute("agent.prompt_chars", len(prompt))
+                span.set_attribute("agent.response_chars", len(result_text))
         return result_text
 
+    @staticmethod
+    def _record_result(operation: str, message: ResultMessage, span) -> None:
+        """ResultMessage의 토큰/소요 시간/비용을 메트릭, span, 현재 사용량 집계에 기록"""
+        usage = message.usage or {}
+        call = UsageTotals(
+            calls=1,
+            input_tokens=usage.get("input_tokens") or 0,
+            output_tokens=usage.get("output_tokens") or 0,
+            cache_creation_input_tokens=usage.get("cache_creation_input_tokens") or 0,
+            cache_read_input_tokens=usage.get("cache_read_input_tokens") or 0,
+            duration_ms=message.duration_ms or 0,
+            cost_usd=message.total_cost_usd or 0,
+        )
+        for token_type in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            AGENT_TOKENS.labels(operation, token_type).inc(getattr(call, token_type))
+        AGENT_COST_USD.labels(operation).inc(call.cost_usd)
+        span.set_attribute("agent.input_tokens", call.input_tokens)
+        span.set_attribute("agent.output_tokens", call.output_tokens)
+        span.set_attribute("agent.cost_usd", call.cost_usd)
+        record_usage(operation, call)
+
     async def analyze_file(self, file_content: str, filename: str) -> dict:
         """파일 분석 후 메타데이터 반환"""
         import json
-        from textwrap import dedent
 
         prompt = dedent(f"""
             다음 파일을 분석하고 메타데이터를 JSON 형식으로 반환해주세요.
@@ -82,7 +309,7 @@ class AgentService:
             }}
         """).strip()
 
-        response = await self.query_text(prompt, max_turns=1)
+        response = await self.query_text(prompt, operation="analyze_file", max_turns=1)
 
         try:
             if "```json" in response:
@@ -148,61 +375,11 @@ class AgentService:
             documents: [{key, content, metadata}, ...]
 
         Returns:
-            그룹별 key 리스트 [["key1", "key2"], ["key3"], ...]
+            {delete: [key, ...], groups: [["key1", "key2"], ["key3"], ...], parsed: 응답 파싱 성공 여부}
         """
-        from textwrap import dedent
-
-        # 문서 내용 포함하여 생성
-        doc_entries = []
-        for i, doc in enumerate(documents, 1):
-            content = doc.get("content", "")
-            if isinstance(content, bytes):
-                content = content.decode("utf-8", errors="replace")
-
-            doc_entries.append(f"=== 문서 {i}: {doc['key']} ===\n{content}")
-
-        docs_text = "\n\n".join(doc_entries)
-
-        prompt = dedent(f"""
-            다음 문서들을 분석하여 두 가지 작업을 수행하세요:
-
-            ## 1단계: 가치 없는 문서 제거
-            아래에 해당하는 문서는 "DELETE" 그룹에 넣으세요:
-            - 단순 인사/안부 세션 (hi, hello, 안녕 등 실질적 내용 없음)
-            - 오류/실패만 기록된 세션 (유의미한 결과 없음)
-            - 테스트/디버그 목적의 일회성 세션
-            - 빈 내용이거나 의미 있는 정보가 전혀 없는 문서
-
-            ## 2단계: 유사 문서 그룹핑
-            나머지 문서 중 **정말로 중복되거나 동일한 내용**인 문서만 그룹으로 묶으세요.
+        prompt = build_similarity_prompt(documents)
 
-            병합 기준 (모두 충족해야 함):
-            - 동일한 특정 주제를 다룸 (일반적인 주제 공유는 불충분)
-            - 동일한 문서 유형 (가이드는 가이드끼리, 리포트는 리포트끼리)
-            - 내용이 실제로 중복되거나 하나로 합쳐야 의미가 있는 경우
-
-            병합하면 안 되는 경우:
-            - 단순히 같은 도메인/분야를 다루는 경우 (예: 둘 다 "데이터" 관련)
-            - 문서 유형이 다른 경우 (가이드 vs 리포트 vs 기술문서)
-            - 각각 독립적인 정보를 담고 있는 경우
-
-            확실하지 않으면 병합하지 마세요. 대부분의 문서는 단독 그룹이어야 합니다.
-
-            문서들:
-            {docs_text}
-
-            JSON 형식으로 반환해주세요 (다른 텍스트 없이):
-            {{
-                "delete": ["삭제할key1", "삭제할key2"],
-                "groups": [["key1", "key2"], ["key3"], ...]
-            }}
-
-            주의:
-            - delete에 포함된 키는 groups에 넣지 마세요.
-            - 나머지 모든 문서 키는 반드시 groups의 하나의 그룹에만 포함되어야 합니다.
-        """).strip()
-
-        response = await self.query_text(prompt, max_turns=1)
+        response = await self.query_text(prompt, operation="find_similar_documents", max_turns=1)
 
         try:
             result = self._extract_json(response)
@@ -210,12 +387,61 @@ class AgentService:
                 delete_keys = result.get("delete", [])
                 groups = result.get("groups", [])
                 if isinstance(groups, list) and all(isinstance(g, list) for g in groups):
-                    return {"delete": delete_keys, "groups": groups}
+                    return {"delete": delete_keys, "groups": groups, "parsed": True}
         except Exception:
             pass
 
-        # 파싱 실패 시 각 문서를 개별 그룹으로
-        return {"delete": [], "groups": [[doc["key"]] for doc in documents]}
+        # 파싱 실패 시 각 문서를 개별 그룹으로 (parsed=False: 판정으로 기록하지 않음)
+        return {"delete": [], "groups": [[doc["key"]] for doc in documents], "parsed": False}
+
+    @staticmethod
+    def _document_tokens(doc: dict) -> int:
+        content = doc.get("content", "")
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", errors="replace")
+        return estimate_tokens(content)
+
+    def _merge_batches(self, documents: list[dict]) -> list[list[dict]]:
+        """문서를 merge_fan_in개 이하, merge_max_tokens 이하의 배치로 순서대로 나눔
+
+        토큰 상한 때문에 한 단계에서 문서 수가 줄지 않으면 상한을 무시하고 merge_fan_in개씩 묶어
+        트리 깊이가 항상 줄어들도록 합니다.
+        """
+        batches = []
+        batch: list[dict] = []
+        batch_tokens = 0
+        for doc in documents:
+            tokens = self._document_tokens(doc)
+            if batch and (len(batch) >= self.merge_fan_in or batch_tokens + tokens > self.merge_max_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(doc)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+
+        if len(batches) == len(documents) > 1:
+            batches = [documents[i : i + self.merge_fan_in] for i in range(0, len(documents), self.merge_fan_in)]
+        return batches
+
+    async def _merge_batch(self, batch: list[dict]) -> dict:
+        """중간 병합 (문서가 하나면 그대로 다음 단계로 전달)"""
+        if len(batch) == 1:
+            return batch[0]
+        async with self._merge_semaphore:
+            result = await self._merge_once(batch)
+        # 다음 단계 프롬프트와 기본 파일명에는 배치 첫 문서의 key를 사용
+        return {"key": batch[0]["key"], "content": result["content"], "metadata": result.get("metadata", {})}
+
+    async def _tree_merge(self, documents: list[dict]) -> dict:
+        """배치 단위로 동시에 병합한 뒤 중간 결과를 다시 병합 (깊이 log_{fan_in} N)"""
+        level = documents
+        while True:
+            batches = self._merge_batches(level)
+            if len(batches) == 1:
+                async with self._merge_semaphore:
+                    return await self._merge_once(batches[0])
+            level = await asyncio.gather(*(self._merge_batch(batch) for batch in batches))
 
     async def merge_documents(
         self,
@@ -223,64 +449,31 @@ class AgentService:
     ) -> dict:
         """여러 문서를 하나로 병합
 
+        merge_max_tokens가 설정되어 있고 그룹 전체가 상한을 넘으면 tree-reduce 방식으로 병합합니다.
+
         Args:
             documents: [{key, content, metadata}, ...]
 
         Returns:
             {content, metadata, filename}
         """
-        from textwrap import dedent
-
-        # 문서 내용 조합
-        docs_content = []
-        for i, doc in enumerate(documents, 1):
-            content = doc.get("content", "")
-            if isinstance(content, bytes):
-                content = content.decode("utf-8", errors="replace")
-            docs_content.append(f"=== 문서 {i}: {doc['key']} ===\n{content}")
-
-        docs_text = "\n\n---\n\n".join(docs_content)
-
+        if (
+            self.merge_max_tokens
+            and len(documents) > 1
+            and sum(self._document_tokens(doc) for doc in documents) > self.merge_max_tokens
+        ):
+            return await self._tree_merge(documents)
+        return await self._merge_once(documents)
+
+    async def _merge_once(self, documents: list[dict]) -> dict:
+        """단일 Agent 호출로 문서 병합 (파싱 실패 시 단순 연결)"""
         # 첫 번째 문서의 파일명을 기본으로 사용
         first_key = documents[0]["key"]
         base_filename = first_key.split("/")[-1]
 
-        prompt = dedent(f"""
-            다음 문서들을 분석하여 하나의 **요약된 통합 문서**로 만들어주세요.
-
-            작성 방식:
-            - 단순히 문서들을 이어붙이지 말고, 핵심 내용을 추출하여 요약
-            - 중복 정보는 한 번만 포함
-            - 논리적 구조로 재구성 (제목, 섹션 등)
-            - 원본보다 간결하지만 중요 정보는 모두 포함
-            - 마크다운 형식으로 작성
-
-            원본 문서들:
-            {docs_text}
-
-            JSON으로 반환해주세요 (다른 텍스트 없이):
-            {{
-                "directory": "주제-도메인명",
-                "filename": "구체적-내용.md",
-                "content": "요약된 통합 문서 (마크다운)",
-                "metadata": {{
-                    "summary": "통합 문서 요약 (2-3문장)",
-                    "categories": ["카테고리1", "카테고리2"],
-                    "tags": ["태그1", "태그2", "태그3"]
-                }}
-            }}
-
-            directory/filename 작성 규칙:
-            - 반드시 영문 kebab-case 사용 (소문자, 하이픈으로 연결)
-            - directory: 문서의 주제/도메인을 나타내는 2-4단어
-              예시: samsung-stock-analysis, fnguide-roe-query, kospi-etf-ranking, us-stock-price, compustat-data-guide
-            - filename: 구체적인 문서 내용을 설명하는 이름.md
-              예시: daily-price-summary.md, roe-consensus-report.md, top10-etf-list.md
-            - 절대 "uncategorized", "session-report" 같은 일반적인 이름 사용 금지
-            - 문서 내용에서 핵심 키워드를 추출하여 명명
-        """).strip()
+        prompt = build_merge_prompt(documents)
 
-        response = await self.query_text(prompt, max_turns=1)
+        response = await self.query_text(prompt, operation="merge_documents", max_turns=1)
 
         try:
             result = self._extract_json(response)
@@ -0,0 +1,167 @@
+"""Agent 호출 기록/재생 (cassette)
+
+record 모드에서는 실제 Agent 호출의 프롬프트별 응답 메시지와 도착 시각을 JSON lines 파일에 기록하고,
+replay 모드에서는 네트워크 없이 기록된 응답을 원래 지연 시간 분포대로 재생합니다.
+같은 프롬프트가 여러 번 기록되어 있으면 기록 순서대로 돌아가며 재생합니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Literal
+
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+CassetteMode = Literal["off", "record", "replay"]
+
+# 기록 파일에서 프롬프트를 알아볼 수 있도록 남기는 앞부분 길이
+PROMPT_PREVIEW_CHARS = 200
+
+RESULT_FIELDS = (
+    "subtype",
+    "duration_ms",
+    "duration_api_ms",
+    "is_error",
+    "num_turns",
+    "session_id",
+    "total_cost_usd",
+    "usage",
+    "result",
+)
+
+
+class CassetteMissError(LookupError):
+    """replay 모드에서 기록되지 않은 프롬프트로 호출"""
+
+
+def prompt_key(prompt: str, system_prompt: str | None = None) -> str:
+    """프롬프트(+시스템 프롬프트) 기준 기록 키"""
+    return hashlib.sha256(f"{system_prompt or ''}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class AgentCassette:
+    """Agent 응답 기록 파일
+
+    Args:
+        path: JSON lines 기록 파일 경로
+        mode: off(사용 안 함) | record(실제 호출 기록) | replay(기록으로만 응답)
+        replay_speed: replay 지연 배율 (1이면 기록된 시간 그대로, 0이면 기다리지 않음)
+    """
+
+    def __init__(self, path: str, mode: CassetteMode = "off", replay_speed: float = 1.0):
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_speed = replay_speed
+        self._entries: dict[str, list[dict]] = defaultdict(list)
+        self._cursor: dict[str, int] = defaultdict(int)
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            logger.warning(f"Agent cassette not found: {self.path}")
+            return
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        logger.info(f"Loaded {len(self)} agent responses from {self.path}")
+
+    def _append(self, entry: dict) -> None:
+        self._entries[entry["key"]].append(entry)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _serialize(message: AssistantMessage | ResultMessage, offset_ms: float) -> dict | None:
+        if isinstance(message, AssistantMessage):
+            return {
+                "type": "assistant",
+                "offset_ms": offset_ms,
+                "model": message.model,
+                "text": [block.text for block in message.content if isinstance(block, TextBlock)],
+            }
+        if isinstance(message, ResultMessage):
+            return {
+                "type": "result",
+                "offset_ms": offset_ms,
+                **{field: getattr(message, field) for field in RESULT_FIELDS},
+            }
+        return None
+
+    @staticmethod
+    def _deserialize(data: dict) -> AssistantMessage | ResultMessage:
+        if data["type"] == "assistant":
+            return AssistantMessage(content=[TextBlock(text=text) for text in data["text"]], model=data["model"])
+        return ResultMessage(**{field: data.get(field) for field in RESULT_FIELDS})
+
+    async def record(
+        self,
+        prompt: str,
+        messages: AsyncIterator[AssistantMessage | ResultMessage],
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[AssistantMessage | ResultMessage]:
+        """실제 응답 스트림을 그대로 전달하면서 메시지와 도착 시각 기록 (스트림이 끝나야 저장)"""
+        started = time.perf_counter()
+        recorded = []
+        async for message in messages:
+            serialized = self._serialize(message, round((time.perf_counter() - started) * 1000, 1))
+            if serialized is not None:
+                recorded.append(serialized)
+            yield message
+
+        self._append(
+            {
+                "key": prompt_key(prompt, system_prompt),
+                "recorded_at": utc_now().isoformat(),
+                "prompt_preview": prompt[:PROMPT_PREVIEW_CHARS],
+                "messages": recorded,
+            }
+        )
+
+    async def replay(
+        self, prompt: str, system_prompt: str | None = None
+    ) -> AsyncIterator[AssistantMessage | ResultMessage]:
+        """기록된 응답을 기록 당시 도착 시각(replay_speed 배율)에 맞춰 재생
+
+        Raises:
+            CassetteMissError: 기록되지 않은 프롬프트
+        """
+        key = prompt_key(prompt, system_prompt)
+        entries = self._entries.get(key)
+        if not entries:
+            raise CassetteMissError(
+                f"No recorded agent response for prompt {key[:12]} ({prompt[:80]!r}), re-record the cassette"
+            )
+        entry = entries[self._cursor[key] % len(entries)]
+        self._cursor[key] += 1
+
+        elapsed_ms = 0.0
+        for data in entry["messages"]:
+            delay = (data["offset_ms"] - elapsed_ms) / 1000 * self.replay_speed
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elapsed_ms = data["offset_ms"]
+            yield self._deserialize(data)
@@ -1,27 +1,59 @@
+import threading
+
 import boto3
 from botocore.exceptions import ClientError
 
+from src.conf.metrics import BEDROCK_REQUEST_ERRORS, BEDROCK_REQUEST_SECONDS, instrument_boto3_client
+from src.conf.tracing import trace_boto3_client
+from src.utils.errors import is_transient
+
+# 문서 단위 ingest/delete API의 요청당 최대 문서 수 (API 모델 제한, 넘으면 ValidationException)
+MAX_DOCUMENTS_PER_REQUEST = 10
+
 
 class BedrockKBService:
-    """Bedrock Knowledge Base 동기화 서비스"""
+    """Bedrock Knowledge Base 동기화 서비스
+
+    실패는 {success: False, error_code, ...}로 반환하지만, 일시적 오류(throttling/5xx)는 호출 측이 재시도할 수 있도록
+    ClientError를 그대로 올립니다.
+    """
 
     def __init__(
         self,
         knowledge_base_id: str,
         data_source_id: str,
+        bucket: str = "",
         region: str = "ap-northeast-2",
         aws_access_key_id: str | None = None,
         aws_secret_access_key: str | None = None,
     ):
         self.knowledge_base_id = knowledge_base_id
         self.data_source_id = data_source_id
+        self.bucket = bucket
         # 빈 문자열은 None으로 처리 (기본 credentials chain 사용)
-        self.client = boto3.client(
-            "bedrock-agent",
-            region_name=region,
-            aws_access_key_id=aws_access_key_id or None,
-            aws_secret_access_key=aws_secret_access_key or None,
-        )
+        self._client_kwargs = {
+            "region_name": region,
+            "aws_access_key_id": aws_access_key_id or None,
+            "aws_secret_access_key": aws_secret_access_key or None,
+        }
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """boto3 bedrock-agent 클라이언트 (첫 사용 시 생성)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    client = boto3.client("bedrock-agent", **self._client_kwargs)
+                    instrument_boto3_client(client, BEDROCK_REQUEST_SECONDS, BEDROCK_REQUEST_ERRORS)
+                    trace_boto3_client(client)
+                    self._client = client
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
 
     async def start_sync(self) -> dict:
         """Knowledge Base 데이터 소스 동기화 시작"""
@@ -36,9 +68,12 @@ class BedrockKBService:
                 "status": response["ingestionJob"]["status"],
             }
         except ClientError as e:
+            if is_transient(e):
+                raise
             return {
                 "success": False,
                 "error": str(e),
+                "error_code": e.response.get("Error", {}).get("Code"),
             }
 
     async def get_sync_status(self, ingestion_job_id: str) -> dict:
@@ -54,9 +89,114 @@ class BedrockKBService:
                 "ingestion_job_id": ingestion_job_id,
                 "status": response["ingestionJob"]["status"],
                 "statistics": response["ingestionJob"].get("statistics", {}),
+                "failure_reasons": response["ingestionJob"].get("failureReasons", []),
+            }
+        except ClientError as e:
+            if is_transient(e):
+                raise
+            return {
+                "success": False,
+                "error": str(e),
+                "error_code": e.response.get("Error", {}).get("Code"),
+            }
+
+    async def list_active_sync_jobs(self) -> dict:
+        """진행 중(STARTING/IN_PROGRESS)인 동기화 작업 조회"""
+        try:
+            response = self.client.list_ingestion_jobs(
+                knowledgeBaseId=self.knowledge_base_id,
+                dataSourceId=self.data_source_id,
+                filters=[{"attribute": "STATUS", "operator": "EQ", "values": ["STARTING", "IN_PROGRESS"]}],
+                sortBy={"attribute": "STARTED_AT", "order": "DESCENDING"},
+            )
+            return {
+                "success": True,
+                "jobs": [
+                    {"ingestion_job_id": job["ingestionJobId"], "status": job["status"]}
+                    for job in response.get("ingestionJobSummaries", [])
+                ],
             }
         except ClientError as e:
+            if is_transient(e):
+                raise
+            return {
+                "success": False,
+                "error": str(e),
+                "error_code": e.response.get("Error", {}).get("Code"),
+            }
+
+    def check_access(self) -> None:
+        """Knowledge Base 데이터 소스 조회 확인 (readiness probe, 실패 시 ClientError)"""
+        self.client.list_ingestion_jobs(
+            knowledgeBaseId=self.knowledge_base_id, dataSourceId=self.data_source_id, maxResults=1
+        )
+
+    def _uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    @staticmethod
+    def _document_details(response: dict) -> list[dict]:
+        return [
+            {
+                "uri": detail.get("identifier", {}).get("s3", {}).get("uri"),
+                "status": detail.get("status"),
+                "status_reason": detail.get("statusReason"),
+            }
+            for detail in response.get("documentDetails", [])
+        ]
+
+    async def ingest_documents(self, keys: list[str]) -> dict:
+        """S3 문서를 데이터 소스 전체 동기화 없이 직접 ingest (메타데이터 파일 포함)"""
+        documents = []
+        try:
+            for start in range(0, len(keys), MAX_DOCUMENTS_PER_REQUEST):
+                response = self.client.ingest_knowledge_base_documents(
+                    knowledgeBaseId=self.knowledge_base_id,
+                    dataSourceId=self.data_source_id,
+                    documents=[
+                        {
+                            "content": {"dataSourceType": "S3", "s3": {"s3Location": {"uri": self._uri(key)}}},
+                            "metadata": {
+                                "type": "S3_LOCATION",
+                                "s3Location": {"uri": self._uri(f"{key}.metadata.json")},
+                            },
+                        }
+                        for key in keys[start : start + MAX_DOCUMENTS_PER_REQUEST]
+                    ],
+                )
+                documents.extend(self._document_details(response))
+            return {"success": True, "documents": documents}
+        except ClientError as e:
+            if is_transient(e):
+                raise
+            return {
+                "success": False,
+                "error": str(e),
+                "error_code": e.response.get("Error", {}).get("Code"),
+                "documents": documents,
+            }
+
+    async def delete_documents(self, keys: list[str]) -> dict:
+        """S3 문서를 데이터 소스 전체 동기화 없이 KB에서 직접 삭제"""
+        documents = []
+        try:
+            for start in range(0, len(keys), MAX_DOCUMENTS_PER_REQUEST):
+                response = self.client.delete_knowledge_base_documents(
+                    knowledgeBaseId=self.knowledge_base_id,
+                    dataSourceId=self.data_source_id,
+                    documentIdentifiers=[
+                        {"dataSourceType": "S3", "s3": {"uri": self._uri(key)}}
+                        for key in keys[start : start + MAX_DOCUMENTS_PER_REQUEST]
+                    ],
+                )
+                documents.extend(self._document_details(response))
+            return {"success": True, "documents": documents}
+        except ClientError as e:
+            if is_transient(e):
+                raise
             return {
                 "success": False,
                 "error": str(e),
+                "error_code": e.response.get("Error", {}).get("Code"),
+                "documents": documents,
             }
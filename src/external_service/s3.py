@@ -1,12 +1,22 @@
+import asyncio
 import json
+import threading
 from datetime import datetime, timezone
 
 import boto3
 from botocore.exceptions import ClientError
 
+from src.conf.metrics import S3_BYTES, S3_REQUEST_ERRORS, S3_REQUEST_SECONDS, instrument_boto3_client
+from src.conf.tracing import trace_boto3_client
+from src.utils.errors import is_transient
+
 
 class S3Service:
-    """S3 업로드 서비스"""
+    """S3 업로드 서비스
+
+    실패는 {success: False, ...}로 반환하지만, 일시적 오류(throttling/5xx)는 호출 측이 재시도할 수 있도록
+    ClientError를 그대로 올립니다.
+    """
 
     def __init__(
         self,
@@ -18,12 +28,30 @@ class S3Service:
         self.bucket = bucket
         self.region = region
         # 빈 문자열은 None으로 처리 (기본 credentials chain 사용)
-        self.client = boto3.client(
-            "s3",
-            region_name=region,
-            aws_access_key_id=aws_access_key_id or None,
-            aws_secret_access_key=aws_secret_access_key or None,
-        )
+        self._client_kwargs = {
+            "region_name": region,
+            "aws_access_key_id": aws_access_key_id or None,
+            "aws_secret_access_key": aws_secret_access_key or None,
+        }
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """boto3 S3 클라이언트 (서비스 모델 로딩 비용이 커서 첫 사용 시 생성)"""
+        if self._client is None:
+            # 스레드에서 동시에 처음 접근해도 하나만 생성
+            with self._client_lock:
+                if self._client is None:
+                    client = boto3.client("s3", **self._client_kwargs)
+                    instrument_boto3_client(client, S3_REQUEST_SECONDS, S3_REQUEST_ERRORS, S3_BYTES)
+                    trace_boto3_client(client)
+                    self._client = client
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
 
     async def upload_file(
         self,
@@ -40,7 +68,8 @@ class S3Service:
             extra_args["ContentType"] = content_type
 
         try:
-            self.client.put_object(
+            await asyncio.to_thread(
+                self.client.put_object,
                 Bucket=self.bucket,
                 Key=key,
                 Body=file_content,
@@ -53,6 +82,8 @@ class S3Service:
                 "url": f"s3://{self.bucket}/{key}",
             }
         except ClientError as e:
+            if is_transient(e):
+                raise
             return {
                 "success": False,
                 "error": str(e),
@@ -104,7 +135,8 @@ class S3Service:
         bedrock_metadata = self._to_bedrock_metadata(metadata, source_type)
 
         try:
-            self.client.put_object(
+            await asyncio.to_thread(
+                self.client.put_object,
                 Bucket=self.bucket,
                 Key=key,
                 Body=json.dumps(bedrock_metadata, ensure_ascii=False, indent=2),
@@ -117,6 +149,8 @@ class S3Service:
                 "url": f"s3://{self.bucket}/{key}",
             }
         except ClientError as e:
+            if is_transient(e):
+                raise
             return {
                 "success": False,
                 "error": str(e),
@@ -163,23 +197,24 @@ class S3Service:
             prefix: S3 키 프리픽스
 
         Returns:
-            문서 정보 리스트 [{key, size, last_modified}, ...]
+            문서 정보 리스트 [{key, size, last_modified, etag}, ...]
+
+        Raises:
+            ClientError: S3 조회 실패 시 (실패를 빈 목록으로 반환하면 코퍼스가 빈 것처럼 보임)
         """
         documents = []
         paginator = self.client.get_paginator("list_objects_v2")
 
-        try:
-            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
-                for obj in page.get("Contents", []):
-                    documents.append(
-                        {
-                            "key": obj["Key"],
-                            "size": obj["Size"],
-                            "last_modified": obj["LastModified"].isoformat(),
-                        }
-                    )
-        except ClientError:
-            return []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                documents.append(
+                    {
+                        "key": obj["Key"],
+                        "size": obj["Size"],
+                        "last_modified": obj["LastModified"].isoformat(),
+                        "etag": obj.get("ETag", "").strip('"'),
+                    }
+                )
 
         return documents
 
@@ -198,6 +233,53 @@ class S3Service:
         response = self.client.get_object(Bucket=self.bucket, Key=key)
         return response["Body"].read()
 
+    def get_document_with_etag(self, key: str) -> tuple[bytes, str]:
+        """S3에서 문서 내용과 ETag 조회
+
+        Raises:
+            ClientError: S3 조회 실패 시
+        """
+        response = self.client.get_object(Bucket=self.bucket, Key=key)
+        return response["Body"].read(), response["ETag"].strip('"')
+
+    def put_object_conditional(
+        self,
+        key: str,
+        body: bytes,
+        if_match: str | None = None,
+        if_none_match: str | None = None,
+        content_type: str | None = None,
+    ) -> dict:
+        """조건부 쓰기 (If-Match / If-None-Match)
+
+        Args:
+            if_match: 현재 ETag가 일치할 때만 덮어쓰기
+            if_none_match: "*"이면 객체가 없을 때만 생성
+
+        Returns:
+            {success, key, etag} 또는 {success: False, precondition_failed, error}
+        """
+        extra_args = {}
+        if if_match:
+            extra_args["IfMatch"] = f'"{if_match}"'
+        if if_none_match:
+            extra_args["IfNoneMatch"] = if_none_match
+        if content_type:
+            extra_args["ContentType"] = content_type
+
+        try:
+            response = self.client.put_object(Bucket=self.bucket, Key=key, Body=body, **extra_args)
+            return {"success": True, "key": key, "etag": response["ETag"].strip('"')}
+        except ClientError as e:
+            if is_transient(e):
+                raise
+            code = e.response.get("Error", {}).get("Code", "")
+            return {
+                "success": False,
+                "precondition_failed": code in ("PreconditionFailed", "ConditionalRequestConflict"),
+                "error": str(e),
+            }
+
     def delete_objects(self, keys: list[str]) -> dict:
         """S3에서 여러 객체 삭제
 
@@ -221,8 +303,14 @@ class S3Service:
                 "errors": response.get("Errors", []),
             }
         except ClientError as e:
+            if is_transient(e):
+                raise
             return {
                 "success": False,
                 "deleted": [],
                 "errors": [str(e)],
             }
+
+    def check_access(self) -> None:
+        """버킷 접근 확인 (readiness probe, 실패 시 ClientError)"""
+        self.client.head_bucket(Bucket=self.bucket)
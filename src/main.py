@@ -1,13 +1,16 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 import src.events  # noqa: F401 - 핸들러 등록
 from src.api import api_router
 from src.conf.container import create_container
 from src.conf.kafka import broker, ensure_topics
 from src.conf.settings import settings
+from src.conf.tracing import setup_tracing, shutdown_tracing
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +20,32 @@ container = create_container()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """FastAPI 라이프사이클 관리"""
-    await ensure_topics(settings.kafka_topics)
-    await broker.start()
+    setup_tracing()
+    loop_monitor = container.loop_monitor()
+    if settings.loop_monitor_enabled:
+        await loop_monitor.start()
+
+    scheduler = container.compact_scheduler()
+    readiness = container.readiness()
+
+    async def startup():
+        # 토픽 확인/broker 연결은 백그라운드로 실행 (완료 전까지 /ready 503)
+        if settings.kafka_ensure_topics:
+            await ensure_topics(settings.kafka_topics)
+        await broker.start()
+        if settings.compact_schedule_enabled:
+            await scheduler.start()
+
+    await readiness.start(startup)
+
     yield
+
+    await readiness.stop()
+    await scheduler.stop()
+    await container.sync_tracker().stop()
     await broker.stop()
+    await loop_monitor.stop()
+    shutdown_tracing()
 
 
 app = FastAPI(
@@ -34,6 +59,43 @@ app.container = container
 app.include_router(api_router)
 
 
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """X-Profile 헤더 또는 ?profile= 쿼리로 요청된 요청을 프로파일링 (위치는 X-Profile-Location 헤더)"""
+    profiler = container.profiler()
+    if not profiler.requested(request.headers.get("x-profile") or request.query_params.get("profile")):
+        return await call_next(request)
+
+    async with profiler.profile(f"{request.method}-{request.url.path}") as run:
+        response = await call_next(request)
+    if run.location:
+        response.headers["X-Profile-Location"] = run.location
+    return response
+
+
 @app.get("/health")
 async def health_check():
+    """liveness - 시작 작업이 실패했으면 503 (재시작 대상)"""
+    readiness = container.readiness()
+    if readiness.error:
+        return JSONResponse({"status": "unhealthy", "error": readiness.error, "version": app.version}, status_code=503)
     return {"status": "healthy", "version": app.version}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """readiness - 시작 작업 전이거나 마지막 의존성 확인에서 하나라도 실패했으면 503 (캐시된 결과 반환)"""
+    status = container.readiness().status()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 메트릭"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/debug/event-loop", include_in_schema=False)
+async def event_loop_stalls():
+    """최근 이벤트 루프 멈춤 기록 (멈춘 동안의 루프 스레드 스택)"""
+    return {"stalls": container.loop_monitor().stalls()}
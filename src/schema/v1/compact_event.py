@@ -4,21 +4,62 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from src.schema.v1.usage import AgentUsage
 from src.utils.datetime import utc_now
 
 
 class CompactEvent(BaseModel):
     """문서 정리 이벤트"""
 
-    trigger: str = Field(default="scheduled", description="scheduled|manual|api")
-    dry_run: bool = Field(default=False, description="True면 분석만 수행, 업로드/삭제 건너뜀")
+    trigger: str = Field(default="scheduled", description="scheduled|manual|api|coalesced")
+    dry_run: bool = Field(default=False, description="True면 분석만 수행하고 plan 저장, 업로드/삭제 건너뜀")
+    plan_id: str | None = Field(default=None, description="지정 시 분석 없이 저장된 plan 적용")
+    profile: bool = Field(default=False, description="True면 실행을 프로파일링하여 저장 (프로파일링 활성 시)")
+    timestamp: datetime = Field(default_factory=utc_now)
+
+
+class CompactStats(BaseModel):
+    """Compact 실행 진행 상황"""
+
+    documents_loaded: int = 0
+    bytes_read: int = 0
+    candidates: int = 0
+    analyzed_documents: int = 0
+    groups_found: int = 0
+    merges_planned: int = 0
+    merges_done: int = 0
+    deleted: int = 0
+    tokens_used: int = Field(default=0, description="추정 토큰 수")
+    stage_seconds: dict[str, float] = {}
+    elapsed_seconds: float = 0
+
+
+class CompactProgress(BaseModel):
+    """Compact 단계 진행 이벤트"""
+
+    run_id: str
+    stage: str = Field(description="load|select|analyze|delete|merge|sync|plan")
+    trigger: str | None = None
+    dry_run: bool = False
+    stats: CompactStats
     timestamp: datetime = Field(default_factory=utc_now)
 
 
 class CompactResult(BaseModel):
     """Compact 결과"""
 
+    run_id: str | None = None
     status: str
     merged: int
     deleted: int
     deleted_keys: list[str] = []
+    deferred_groups: int = 0
+    deferred_documents: int = 0
+    oversized_documents: list[str] = Field(default=[], description="토큰 예산보다 커서 분석에서 제외된 문서")
+    oversized_groups: int = 0
+    estimated_tokens: int = 0
+    plan_id: str | None = None
+    stats: CompactStats | None = None
+    usage: AgentUsage | None = Field(default=None, description="실행 중 Agent 호출 토큰/비용 (병합 작업 worker 포함)")
+    profile_location: str | None = Field(default=None, description="프로파일 저장 위치 (profile 요청 시)")
+    error: str | None = None
@@ -0,0 +1,46 @@
+"""Compact plan 스키마
+
+dry run 결과(삭제 대상, 병합 그룹, 병합 결과 참조)를 저장하여
+이후 Agent 재분석 없이 그대로 적용할 수 있도록 합니다.
+"""
+
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from src.utils.datetime import utc_now
+
+# plan 포맷이 바뀌면 증가 (이전 버전 plan은 적용 거부)
+PLAN_VERSION = 1
+
+
+class PlanDocument(BaseModel):
+    """plan 생성 시점의 원본 문서"""
+
+    key: str
+    etag: str = ""
+
+
+class PlanGroup(BaseModel):
+    """병합 그룹"""
+
+    sources: list[PlanDocument]
+    directory: str
+    filename: str
+    metadata: dict = {}
+    content_key: str = Field(description="병합 결과 내용이 저장된 S3 키")
+
+
+class CompactPlan(BaseModel):
+    """Compact 실행 계획"""
+
+    plan_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    version: int = PLAN_VERSION
+    created_at: datetime = Field(default_factory=utc_now)
+    deletes: list[PlanDocument] = []
+    groups: list[PlanGroup] = []
+
+    def source_documents(self) -> list[PlanDocument]:
+        """plan이 참조하는 모든 원본 문서"""
+        return [*self.deletes, *(doc for group in self.groups for doc in group.sources)]
@@ -0,0 +1,43 @@
+"""병합 작업 스키마
+
+compact 실행(coordinator)이 병합 그룹마다 작업을 발행하면 아무 replica의 worker가 처리하고,
+결과를 coordinator에게 돌려보냅니다.
+"""
+
+from pydantic import BaseModel, Field
+
+from src.schema.v1.compact_plan import PlanGroup
+from src.schema.v1.usage import AgentUsage
+
+
+class MergeSource(BaseModel):
+    """분석 시점의 병합 대상 문서"""
+
+    key: str
+    etag: str = ""
+    size: int = 0
+    hash: str = Field(description="분석 시점 내용 해시 (바뀌었으면 병합 건너뜀)")
+
+
+class MergeTask(BaseModel):
+    """그룹 하나의 병합 작업"""
+
+    run_id: str
+    group_id: str
+    sources: list[MergeSource]
+    output_level: int = Field(default=1, description="병합 결과의 compaction_level")
+    plan_id: str | None = Field(default=None, description="dry run이면 병합 결과를 저장할 plan")
+    plan_index: int = 0
+
+
+class MergeTaskResult(BaseModel):
+    """병합 작업 결과"""
+
+    run_id: str
+    group_id: str
+    status: str = Field(description="merged|skipped|failed")
+    deleted_keys: list[str] = []
+    written_keys: list[str] = []
+    plan_group: PlanGroup | None = None
+    usage: AgentUsage | None = None
+    error: str | None = None
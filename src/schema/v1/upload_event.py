@@ -0,0 +1,15 @@
+"""업로드 이벤트 스키마"""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from src.utils.datetime import utc_now
+
+
+class DocumentUploadedEvent(BaseModel):
+    """문서 업로드 완료 이벤트"""
+
+    key: str
+    size: int = Field(description="업로드된 문서 크기 (bytes)")
+    timestamp: datetime = Field(default_factory=utc_now)
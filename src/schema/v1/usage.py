@@ -0,0 +1,36 @@
+"""Agent 사용량 스키마"""
+
+from pydantic import BaseModel
+
+
+class UsageTotals(BaseModel):
+    """Agent 호출 사용량 합계 (ResultMessage 기준)"""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    duration_ms: int = 0
+    cost_usd: float = 0
+
+    def add(self, other: "UsageTotals") -> None:
+        for field in UsageTotals.model_fields:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+
+class AgentUsage(UsageTotals):
+    """요청/실행 단위 Agent 사용량 (operation별 합계 포함)"""
+
+    operations: dict[str, UsageTotals] = {}
+
+    def record(self, operation: str, call: UsageTotals) -> None:
+        """호출 하나의 사용량 추가"""
+        self.add(call)
+        self.operations.setdefault(operation, UsageTotals()).add(call)
+
+    def merge(self, other: "AgentUsage") -> None:
+        """다른 프로세스(병합 작업 worker 등)에서 집계한 사용량 합산"""
+        self.add(other)
+        for operation, totals in other.operations.items():
+            self.operations.setdefault(operation, UsageTotals()).add(totals)
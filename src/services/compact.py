@@ -1,12 +1,35 @@
 """Compact 서비스 - 문서 정리 및 최적화"""
 
+import asyncio
+import hashlib
 import json
 import logging
+import time
+import uuid
+from collections import defaultdict
+from itertools import combinations
 
+from src.conf.kafka import publish_batch
 from src.conf.settings import settings
-from src.external_service.agent import AgentService
+from src.conf.tracing import tracer
+from src.external_service.agent import (
+    SIMILARITY_PROMPT_VERSION,
+    AgentService,
+    build_merge_prompt,
+    build_similarity_prompt,
+)
 from src.external_service.bedrock import BedrockKBService
 from src.external_service.s3 import S3Service
+from src.schema.v1.compact_plan import PLAN_VERSION, CompactPlan, PlanDocument, PlanGroup
+from src.schema.v1.merge_task import MergeSource, MergeTask, MergeTaskResult
+from src.services.merge_collector import MergeResultCollector
+from src.services.run_stats import RunStats
+from src.services.sync_tracker import SyncTracker
+from src.services.usage import merge_usage, track_usage
+from src.services.verdict import DELETE, VerdictStore
+from src.utils.byte_budget import ByteBudget
+from src.utils.errors import is_transient
+from src.utils.tokens import estimate_tokens, estimate_tokens_from_size
 
 logger = logging.getLogger(__name__)
 
@@ -19,166 +42,1102 @@ class CompactService:
         s3_service: S3Service,
         bedrock_kb_service: BedrockKBService,
         agent_service: AgentService,
+        sync_tracker: SyncTracker | None = None,
+        fetch_concurrency: int = 8,
+        memory_budget_bytes: int = 64 * 1024 * 1024,
+        memory_budget: ByteBudget | None = None,
+        excerpt_chars: int = 4000,
+        max_tokens: int = 0,
+        max_seconds: float = 0,
+        max_groups: int = 0,
+        tokens_per_second: float = 1000,
+        call_overhead_seconds: float = 5.0,
+        tier_reexamine_runs: int = 8,
+        tier_candidate_limit: int = 50,
+        merge_collector: MergeResultCollector | None = None,
+        merge_fanout: bool = False,
+        merge_task_timeout_seconds: float = 1800,
+        verdict_max_pairs: int = 0,
     ):
         self._s3 = s3_service
         self._bedrock = bedrock_kb_service
         self._agent = agent_service
+        # 동기화 작업 추적 (없으면 Bedrock 직접 호출)
+        self._sync_tracker = sync_tracker
+        self._fetch_concurrency = fetch_concurrency
+        # 프로세스 전체 원문 보유량 제한 (실행과 병합 작업 worker가 공유, 없으면 memory_budget_bytes로 생성)
+        self._memory_budget = memory_budget or ByteBudget(memory_budget_bytes)
+        self._excerpt_chars = excerpt_chars
+        # 실행 예산 (0이면 무제한)
+        self._max_tokens = max_tokens
+        self._max_seconds = max_seconds
+        self._max_groups = max_groups
+        # 소요 시간 추정 계수
+        self._tokens_per_second = tokens_per_second
+        self._call_overhead_seconds = call_overhead_seconds
+        # tier 정책
+        self._tier_reexamine_runs = tier_reexamine_runs
+        self._tier_candidate_limit = tier_candidate_limit
+        # 병합 작업 분산 (그룹별 Kafka 작업 발행)
+        self._merge_collector = merge_collector
+        self._merge_fanout = merge_fanout and merge_collector is not None
+        self._merge_task_timeout_seconds = merge_task_timeout_seconds
+        # 판정 캐시에 유지할 최대 문서 쌍 수 (0이면 무제한)
+        self._verdict_max_pairs = verdict_max_pairs
 
-    def _load_documents(self, prefix: str) -> list[dict]:
-        """S3에서 문서 및 메타데이터 로드
+    def _load_document(self, obj: dict) -> dict | None:
+        """S3에서 문서 및 메타데이터 로드 (동기, 스레드에서 실행)
 
         Returns:
-            [{key, content, metadata}, ...]
+            {key, etag, size, last_modified, content, metadata}, 실패 시 None
         """
-        all_objects = self._s3.list_documents(prefix)
+        key = obj["key"]
+        try:
+            content = self._s3.get_document(key)
+        except Exception as e:
+            # 일시적 오류로 문서를 빠뜨리면 안 되므로 실행을 실패시켜 재시도
+            if is_transient(e):
+                raise
+            logger.warning(f"Failed to load document {key}: {e}")
+            return None
 
-        # 메타데이터 파일을 제외한 문서만 필터링
-        doc_keys = [obj["key"] for obj in all_objects if not obj["key"].endswith(".metadata.json")]
+        return {
+            "key": key,
+            "etag": obj.get("etag", ""),
+            "size": obj.get("size", len(content)),
+            "last_modified": obj.get("last_modified", ""),
+            "content": content,
+            "metadata": self._read_metadata(key),
+        }
 
-        documents = []
-        for key in doc_keys:
-            try:
-                content = self._s3.get_document(key)
-                metadata_key = f"{key}.metadata.json"
-
-                # 메타데이터 파일 조회
-                try:
-                    metadata_content = self._s3.get_document(metadata_key)
-                    metadata_json = json.loads(metadata_content.decode("utf-8"))
-                    # Bedrock 메타데이터 형식에서 attributes 추출
-                    metadata = metadata_json.get("metadataAttributes", metadata_json)
-                except Exception:
-                    metadata = {}
-
-                documents.append(
+    def _read_metadata(self, key: str) -> dict:
+        """문서의 메타데이터 파일 조회 (동기, 없으면 빈 dict)"""
+        try:
+            metadata_content = self._s3.get_document(f"{key}.metadata.json")
+            metadata_json = json.loads(metadata_content.decode("utf-8"))
+            # Bedrock 메타데이터 형식에서 attributes 추출
+            return metadata_json.get("metadataAttributes", metadata_json)
+        except Exception as e:
+            if is_transient(e):
+                raise
+            return {}
+
+    @staticmethod
+    def _level(metadata: dict, level: int | None) -> int:
+        """compaction level (None이면 메타데이터의 compaction_level, 없으면 1)"""
+        if level is not None:
+            return level
+        try:
+            return max(1, int(metadata.get("compaction_level", 1)))
+        except (TypeError, ValueError):
+            return 1
+
+    def _fingerprint(self, document: dict, level: int | None) -> dict:
+        """원문 대신 보관할 문서 요약 정보 (해시 + 앞부분 발췌)
+
+        Args:
+            level: compaction level (None이면 메타데이터의 compaction_level, 없으면 1)
+        """
+        content = document["content"]
+        excerpt = content[: self._excerpt_chars * 4].decode("utf-8", errors="ignore")[: self._excerpt_chars]
+        return {
+            "key": document["key"],
+            "level": self._level(document["metadata"], level),
+            "etag": document["etag"],
+            "size": document["size"],
+            "last_modified": document.get("last_modified", ""),
+            "hash": hashlib.sha256(content).hexdigest(),
+            "tokens": estimate_tokens(content.decode("utf-8", errors="ignore")),
+            "content": excerpt,
+            "excerpt_tokens": estimate_tokens(excerpt),
+            "metadata": document["metadata"],
+        }
+
+    async def _load_fingerprints(self, prefixes: list[str], budget: ByteBudget) -> list[dict]:
+        """list → fetch → fingerprint 스트리밍 단계
+
+        원문은 fingerprint 계산 직후 버리며, 동시에 보유하는 원문 크기는 budget으로 제한합니다.
+
+        Returns:
+            [{key, level, etag, size, last_modified, hash, tokens, content(발췌), metadata}, ...] (목록 조회 순서)
+            base prefix 문서는 level 0, 그 외에는 메타데이터의 compaction_level
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._fetch_concurrency * 2)
+        fingerprints: dict[int, dict] = {}
+
+        async def list_stage():
+            index = 0
+            seen = set()
+            for prefix in prefixes:
+                logger.info(f"Loading documents from s3://{settings.s3_bucket}/{prefix}")
+                level = 0 if prefix == settings.s3_base_prefix else None
+                for obj in await asyncio.to_thread(self._s3.list_documents, prefix):
+                    # 메타데이터 파일을 제외한 문서만 처리 (prefix가 겹치면 먼저 나온 쪽 기준)
+                    if obj["key"].endswith(".metadata.json") or obj["key"] in seen:
+                        continue
+                    seen.add(obj["key"])
+                    await queue.put((index, obj, level))
+                    index += 1
+            for _ in range(self._fetch_concurrency):
+                await queue.put(None)
+
+        async def fetch_stage():
+            while (item := await queue.get()) is not None:
+                index, obj, level = item
+                async with budget.reserve(obj.get("size", 0)):
+                    document = await asyncio.to_thread(self._load_document, obj)
+                    if document is not None:
+                        fingerprints[index] = self._fingerprint(document, level)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(list_stage())
+            for _ in range(self._fetch_concurrency):
+                tg.create_task(fetch_stage())
+
+        return [fingerprints[index] for index in sorted(fingerprints)]
+
+    def _fingerprint_index_key(self) -> str:
+        return f"{settings.s3_state_prefix}/fingerprints.json"
+
+    def _read_fingerprint_index(self) -> dict[str, dict]:
+        try:
+            return json.loads(self._s3.get_document(self._fingerprint_index_key()).decode("utf-8"))
+        except Exception as e:
+            if is_transient(e):
+                raise
+            return {}
+
+    async def _save_fingerprint_index(self, fingerprints: list[dict]) -> None:
+        """추정(estimate)에서 원문을 읽지 않도록 마지막 실행의 fingerprint 요약 저장 (발췌 제외)"""
+        index = {
+            fp["key"]: {
+                "etag": fp["etag"],
+                "last_modified": fp["last_modified"],
+                "level": fp["level"],
+                "hash": fp["hash"],
+                "tokens": fp["tokens"],
+                "excerpt_tokens": fp["excerpt_tokens"],
+                "keywords": sorted(self._keywords(fp["metadata"])),
+            }
+            for fp in fingerprints
+        }
+        result = await self._s3.upload_file(
+            file_content=json.dumps(index).encode("utf-8"),
+            directory=settings.s3_state_prefix,
+            filename="fingerprints.json",
+            content_type="application/json",
+        )
+        if not result.get("success"):
+            logger.warning(f"Failed to save fingerprint index: {result.get('error')}")
+
+    async def _estimate_fingerprints(self, prefixes: list[str]) -> list[dict]:
+        """원문을 읽지 않고 만든 fingerprint (추정용)
+
+        마지막 실행 이후 바뀌지 않은 문서는 fingerprint 색인을 사용하고, 새/변경 문서는 목록의 크기로
+        토큰 수를 추정하며 메타데이터 파일만 조회합니다. 새/변경 문서는 내용 해시가 없으므로 판정 없음으로 봅니다.
+        """
+        index = await asyncio.to_thread(self._read_fingerprint_index)
+        fingerprints, uncached = [], []
+        seen = set()
+        for prefix in prefixes:
+            level = 0 if prefix == settings.s3_base_prefix else None
+            for obj in await asyncio.to_thread(self._s3.list_documents, prefix):
+                if obj["key"].endswith(".metadata.json") or obj["key"] in seen:
+                    continue
+                seen.add(obj["key"])
+                etag, last_modified = obj.get("etag", ""), obj.get("last_modified", "")
+                entry = index.get(obj["key"])
+                if entry and entry["etag"] == etag and entry["last_modified"] == last_modified:
+                    fingerprints.append(
+                        {
+                            "key": obj["key"],
+                            "level": entry["level"],
+                            "etag": etag,
+                            "size": obj.get("size", 0),
+                            "last_modified": last_modified,
+                            "hash": entry["hash"],
+                            "tokens": entry["tokens"],
+                            "excerpt_tokens": entry["excerpt_tokens"],
+                            "metadata": {"tags": entry["keywords"]},
+                        }
+                    )
+                else:
+                    uncached.append((len(fingerprints), obj, level))
+                    fingerprints.append({})
+
+        metadata = await asyncio.gather(*(asyncio.to_thread(self._read_metadata, obj["key"]) for _, obj, _ in uncached))
+        for (position, obj, level), doc_metadata in zip(uncached, metadata, strict=True):
+            tokens = estimate_tokens_from_size(obj.get("size", 0))
+            fingerprints[position] = {
+                "key": obj["key"],
+                "level": self._level(doc_metadata, level),
+                "etag": obj.get("etag", ""),
+                "size": obj.get("size", 0),
+                "last_modified": obj.get("last_modified", ""),
+                "hash": "",
+                "tokens": tokens,
+                "excerpt_tokens": min(tokens, self._excerpt_chars),
+                "metadata": doc_metadata,
+            }
+        return fingerprints
+
+    async def _rehydrate(self, fingerprints: list[dict]) -> list[dict]:
+        """병합 대상 그룹 멤버의 원문 재로드"""
+        documents = await asyncio.gather(*(asyncio.to_thread(self._load_document, fp) for fp in fingerprints))
+        return [doc for doc in documents if doc is not None]
+
+    @staticmethod
+    def _keywords(metadata: dict) -> set[str]:
+        """메타데이터의 카테고리/태그 키워드 (Bedrock 형식의 쉼표 구분 문자열 포함)"""
+        keywords = set()
+        for field in ("categories", "tags"):
+            values = metadata.get(field, [])
+            if isinstance(values, str):
+                values = values.split(",")
+            keywords.update(str(v).strip().lower() for v in values if str(v).strip())
+        return keywords
+
+    def _related_documents(self, documents: list[dict], others: list[dict]) -> list[dict]:
+        """documents와 카테고리/태그가 겹치는 문서를 겹치는 수 순으로 선택"""
+        new_keywords = set().union(*(self._keywords(doc["metadata"]) for doc in documents))
+        scored = []
+        for doc in others:
+            score = len(new_keywords & self._keywords(doc["metadata"]))
+            if score:
+                scored.append((score, doc))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [doc for _, doc in scored[: self._tier_candidate_limit]]
+
+    def _select_candidates(
+        self, documents: list[dict], run_count: int, watermark: str | None = None
+    ) -> tuple[list[dict], set[int]]:
+        """이번 실행에서 분석할 문서 선택 (LSM 방식 tier 정책)
+
+        - level 0 (새 업로드): 항상 포함
+          (watermark 이전에 수정된 base prefix 문서는 이미 분석된 단독 문서이므로 level 1로 취급)
+        - level L+1: 이번 실행에서 비교하는 level L 문서와 카테고리/태그가 겹치는 문서만 비교 후보로 포함
+        - level L (>=1): tier_reexamine_runs ** L 번째 실행마다 전체를 다시 포함하여 같은 level끼리 비교
+
+        Returns:
+            (분석 대상 문서, 이번 실행에서 재검토하는 level 집합)
+        """
+        by_level = defaultdict(list)
+        for doc in documents:
+            if doc["level"] == 0 and watermark and doc["last_modified"] and doc["last_modified"] <= watermark:
+                doc = {**doc, "level": 1}
+            by_level[doc["level"]].append(doc)
+
+        reexamined = {
+            level
+            for level in by_level
+            if level >= 1 and run_count > 0 and run_count % (self._tier_reexamine_runs**level) == 0
+        }
+
+        candidates = []
+        for level in sorted({0, *reexamined}):
+            documents_at_level = by_level.get(level, [])
+            if not documents_at_level:
+                continue
+            candidates.extend(documents_at_level)
+            # 다음 tier 전체를 재검토하는 실행이면 관련 후보를 따로 고르지 않음
+            if level + 1 not in reexamined:
+                candidates.extend(self._related_documents(documents_at_level, by_level.get(level + 1, [])))
+        return candidates, reexamined
+
+    @staticmethod
+    def _allowed_group(fingerprints: list[dict], reexamined: set[int]) -> bool:
+        """가장 낮은 level이 0이거나 재검토 중인 level인 그룹만 병합"""
+        lowest = min(fp["level"] for fp in fingerprints)
+        return lowest == 0 or lowest in reexamined
+
+    @staticmethod
+    def _output_level(fingerprints: list[dict]) -> int:
+        """병합 결과의 level (낮은 level을 흡수하면 높은 쪽 유지, 같은 tier끼리 병합 시 한 단계 상승)"""
+        levels = {fp["level"] for fp in fingerprints}
+        if len(levels) > 1 or 0 in levels:
+            return max(1, max(levels))
+        return max(levels) + 1
+
+    @staticmethod
+    def _next_watermark(level0: list[dict], pending: list[dict], watermark: str | None) -> str | None:
+        """이번 실행에서 처리가 끝난 level 0 문서의 마지막 수정 시각
+
+        미룬 문서(분석/병합 예산 초과, 병합 실패)보다 먼저 수정된 문서까지만 처리된 것으로 봅니다.
+        """
+        cutoff = min((doc["last_modified"] for doc in pending), default=None)
+        done = [
+            doc["last_modified"]
+            for doc in level0
+            if doc["last_modified"] and (cutoff is None or doc["last_modified"] < cutoff)
+        ]
+        return max([*done, watermark or ""]) or None
+
+    def _read_tier_state(self) -> dict:
+        try:
+            state = json.loads(self._s3.get_document(f"{settings.s3_state_prefix}/tiers.json").decode("utf-8"))
+        except Exception as e:
+            # 일시적 오류를 상태 없음으로 보면 tier 상태가 초기화됨
+            if is_transient(e):
+                raise
+            state = {}
+        return {"run_count": int(state.get("run_count", 0)), "watermark": state.get("watermark")}
+
+    async def _load_tier_state(self) -> dict:
+        """tier 상태 {run_count: 완료된 실행 횟수, watermark: 분석이 끝난 base prefix 문서의 마지막 수정 시각}"""
+        return await asyncio.to_thread(self._read_tier_state)
+
+    async def _save_tier_state(self, state: dict) -> None:
+        result = await self._s3.upload_file(
+            file_content=json.dumps(state).encode("utf-8"),
+            directory=settings.s3_state_prefix,
+            filename="tiers.json",
+            content_type="application/json",
+        )
+        if not result.get("success"):
+            logger.warning(f"Failed to save tier state: {result.get('error')}")
+
+    def _verdict_key(self) -> str:
+        return f"{settings.s3_state_prefix}/verdicts/{SIMILARITY_PROMPT_VERSION}.json"
+
+    def _read_verdicts(self) -> VerdictStore:
+        try:
+            return VerdictStore.from_json(self._s3.get_document(self._verdict_key()))
+        except Exception as e:
+            # 일시적 오류를 캐시 없음으로 보면 빈 캐시로 덮어쓰게 됨
+            if is_transient(e):
+                raise
+            return VerdictStore()
+
+    async def _load_verdicts(self) -> VerdictStore:
+        """프롬프트 버전별 판정 캐시 로드 (없으면 빈 캐시)"""
+        # 판정 캐시는 수 MB까지 커질 수 있으므로 조회/파싱을 스레드에서 실행
+        return await asyncio.to_thread(self._read_verdicts)
+
+    def _write_verdicts(self, verdicts: VerdictStore) -> dict:
+        return self._s3.put_object_conditional(self._verdict_key(), verdicts.to_json(), content_type="application/json")
+
+    async def _save_verdicts(self, verdicts: VerdictStore) -> None:
+        result = await asyncio.to_thread(self._write_verdicts, verdicts)
+        if not result.get("success"):
+            logger.warning(f"Failed to save verdicts: {result.get('error')}")
+
+    def _filter_known(
+        self, documents: list[dict], verdicts: VerdictStore
+    ) -> tuple[list[dict], list[str], list[tuple[str, str]]]:
+        """판정 캐시로 모델에 물어볼 문서를 줄임 (동기, 스레드에서 실행)
+
+        내용이 바뀐(판정 없는) 문서와, 판정이 없는 문서 쌍에 속한 문서만 모델에 보냅니다.
+        바뀐 문서끼리는 항상 분석하므로 따로 확인하지 않고, 나머지 쌍은 카테고리/태그가 겹칠 때만
+        판정이 필요하다고 봅니다. 모든 쌍을 비교하지 않도록 키워드 → 문서 역색인으로 겹치는 쌍만 확인합니다.
+
+        Returns:
+            (모델 분석 대상, 캐시로 결정된 삭제 키, 캐시로 결정된 병합 쌍)
+        """
+        changed = {doc["key"] for doc in documents if verdicts.value(doc["hash"]) is None}
+        known_deletes = [doc["key"] for doc in documents if verdicts.value(doc["hash"]) == DELETE]
+        deleted = set(known_deletes)
+        live = [doc for doc in documents if doc["key"] not in deleted]
+
+        index = defaultdict(list)
+        for doc in live:
+            for keyword in self._keywords(doc["metadata"]):
+                index[keyword].append(doc)
+
+        needed = set(changed)
+        for docs in index.values():
+            for a, b in combinations(docs, 2):
+                # 이미 둘 다 분석 대상이면 판정을 확인할 필요 없음
+                if a["key"] in needed and b["key"] in needed:
+                    continue
+                if verdicts.pair(a["hash"], b["hash"]) is None:
+                    needed.update((a["key"], b["key"]))
+
+        return [doc for doc in documents if doc["key"] in needed], known_deletes, verdicts.merged_pairs(live)
+
+    @staticmethod
+    def _union_groups(groups: list[list[str]], pairs: list[tuple[str, str]]) -> list[list[str]]:
+        """모델이 반환한 그룹과 캐시된 병합 쌍을 합쳐 최종 그룹 생성"""
+        parent: dict[str, str] = {}
+
+        def find(key: str) -> str:
+            parent.setdefault(key, key)
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for group in groups:
+            for key in group:
+                parent[find(key)] = find(group[0])
+        for a, b in pairs:
+            parent[find(b)] = find(a)
+
+        merged = defaultdict(list)
+        for key in list(parent):
+            merged[find(key)].append(key)
+        return list(merged.values())
+
+    def _estimate_seconds(self, tokens: int, agent_calls: int) -> float:
+        """토큰 수와 Agent 호출 수로 소요 시간 추정"""
+        return round(agent_calls * self._call_overhead_seconds + tokens / self._tokens_per_second, 1)
+
+    def _fit_analysis_budget(self, documents: list[dict]) -> tuple[list[dict], list[dict], list[dict]]:
+        """분석 프롬프트가 토큰 예산의 절반을 넘지 않도록 문서를 나눔
+
+        예산에 들어가지 않는 문서는 건너뛰고 뒤의 문서로 계속 채웁니다.
+        혼자서도 예산을 넘는 문서는 어느 실행에서도 분석할 수 없으므로 따로 반환합니다.
+
+        Returns:
+            (이번 실행에서 분석할 문서, 다음 실행으로 미룬 문서, 예산보다 커서 분석할 수 없는 문서)
+        """
+        if not self._max_tokens:
+            return documents, [], []
+
+        limit = self._max_tokens // 2
+        base_tokens = estimate_tokens(build_similarity_prompt([]))
+        tokens = base_tokens
+        selected, deferred, oversized = [], [], []
+        for doc in documents:
+            doc_tokens = estimate_tokens(doc["key"]) + doc["excerpt_tokens"]
+            if base_tokens + doc_tokens > limit:
+                oversized.append(doc)
+            elif tokens + doc_tokens > limit:
+                deferred.append(doc)
+            else:
+                selected.append(doc)
+                tokens += doc_tokens
+        return selected, deferred, oversized
+
+    @staticmethod
+    def _group_value(fingerprints: list[dict]) -> int:
+        """병합으로 줄어드는 예상 바이트 수 (우선순위 기준)"""
+        sizes = [fp["size"] for fp in fingerprints]
+        return sum(sizes) - max(sizes)
+
+    def _within_budget(self, merged_groups: int, tokens: int, started: float) -> bool:
+        """다음 그룹을 처리해도 실행 예산 이내인지 확인"""
+        if self._max_groups and merged_groups >= self._max_groups:
+            return False
+        if self._max_tokens and tokens > self._max_tokens:
+            return False
+        if self._max_seconds and time.monotonic() - started >= self._max_seconds:
+            return False
+        return True
+
+    def _delete_with_metadata(self, keys: list[str]) -> list[str]:
+        """문서와 메타데이터 파일 삭제
+
+        Returns:
+            실제 삭제된 키 리스트
+        """
+        keys_to_delete = []
+        for key in keys:
+            keys_to_delete.append(key)
+            keys_to_delete.append(f"{key}.metadata.json")
+
+        delete_result = self._s3.delete_objects(keys_to_delete)
+        return delete_result.get("deleted", [])
+
+    async def _write_merged(self, merged: dict) -> str | None:
+        """병합된 문서를 compact prefix에 업로드
+
+        Returns:
+            업로드된 문서 키, 실패 시 None
+        """
+        output_directory = f"{settings.s3_compact_prefix}/{merged['directory']}"
+
+        content = merged["content"]
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        upload_result = await self._s3.upload_file_with_metadata(
+            file_content=content,
+            directory=output_directory,
+            filename=merged["filename"],
+            metadata=merged["metadata"],
+        )
+
+        if not upload_result.get("success"):
+            logger.error(f"Failed to upload merged document: {upload_result}")
+            return None
+        return upload_result["file"]["key"]
+
+    async def _sync_knowledge_base(self, written_keys: list[str], deleted_keys: list[str]) -> None:
+        """Bedrock KB 동기화 (추적기가 있으면 변경된 문서만 반영)"""
+        logger.info("Starting Bedrock KB sync...")
+        if self._sync_tracker is None:
+            sync_result = await self._bedrock.start_sync()
+        else:
+            removed = [key for key in deleted_keys if not key.endswith(".metadata.json")]
+            sync_result = await self._sync_tracker.sync_documents(written_keys, removed)
+        if not sync_result.get("success"):
+            logger.error(f"KB sync failed: {sync_result.get('error')}")
+        elif sync_result.get("mode") == "documents":
+            logger.info(f"KB documents synced: ingested={written_keys}, deleted={deleted_keys}")
+        else:
+            logger.info(f"KB sync started: job_id={sync_result.get('ingestion_job_id')}")
+
+    def _take_late_merges(self) -> list[MergeTaskResult]:
+        """이전 실행에서 timeout 이후 도착한 병합 결과 (dry run 결과 제외)"""
+        if self._merge_collector is None:
+            return []
+        late = [
+            result
+            for result in self._merge_collector.take_late()
+            if result.status == "merged" and result.plan_group is None
+        ]
+        if late:
+            logger.info(f"Applying {len(late)} merge results that arrived after the previous run timed out")
+        return late
+
+    async def _sync_late_merges(self) -> None:
+        """병합할 그룹이 없는 실행에서도 늦게 도착한 병합 결과는 KB에 동기화"""
+        late = self._take_late_merges()
+        if late:
+            await self._sync_knowledge_base(
+                [key for result in late for key in result.written_keys],
+                [key for result in late for key in result.deleted_keys],
+            )
+
+    def _plan_directory(self, plan_id: str) -> str:
+        return f"{settings.s3_plan_prefix}/{plan_id}"
+
+    async def _save_plan_content(self, plan_id: str, index: int, merged: dict) -> str | None:
+        """병합 결과 내용을 plan 디렉토리에 저장하고 S3 키 반환"""
+        content = merged["content"]
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        result = await self._s3.upload_file(
+            file_content=content,
+            directory=f"{self._plan_directory(plan_id)}/merged",
+            filename=f"{index}.md",
+            content_type="text/markdown",
+        )
+        if not result.get("success"):
+            logger.error(f"Failed to save merged content for plan {plan_id}: {result}")
+            return None
+        return result["key"]
+
+    async def _save_plan(self, plan: CompactPlan) -> bool:
+        """plan 본문을 S3에 저장"""
+        result = await self._s3.upload_file(
+            file_content=plan.model_dump_json(indent=2).encode("utf-8"),
+            directory=self._plan_directory(plan.plan_id),
+            filename="plan.json",
+            content_type="application/json",
+        )
+        if not result.get("success"):
+            logger.error(f"Failed to save plan {plan.plan_id}: {result}")
+            return False
+        logger.info(f"Saved compact plan: s3://{settings.s3_bucket}/{result['key']}")
+        return True
+
+    def _read_plan(self, plan_id: str) -> CompactPlan | None:
+        try:
+            content = self._s3.get_document(f"{self._plan_directory(plan_id)}/plan.json")
+            return CompactPlan.model_validate_json(content)
+        except Exception as e:
+            if is_transient(e):
+                raise
+            logger.warning(f"Failed to load plan {plan_id}: {e}")
+            return None
+
+    async def _load_plan(self, plan_id: str) -> CompactPlan | None:
+        """S3에서 plan 조회"""
+        return await asyncio.to_thread(self._read_plan, plan_id)
+
+    async def _merge_group(
+        self,
+        group_fingerprints: list[dict],
+        output_level: int,
+        memory_budget: ByteBudget,
+        plan_id: str | None = None,
+        plan_index: int = 0,
+    ) -> dict:
+        """그룹 하나를 병합 (로컬 실행과 병합 작업 worker 공용)
+
+        Args:
+            plan_id: dry run이면 병합 결과를 저장할 plan (업로드/삭제 건너뜀)
+
+        Returns:
+            {status: merged|skipped|failed, deleted_keys, written_keys, plan_group}
+        """
+        with tracer.start_as_current_span(
+            "compact.merge_group", attributes={"compact.group_size": len(group_fingerprints)}
+        ):
+            # 그룹 멤버만 원문을 다시 로드하여 Claude로 병합 (메모리 예산 내에서)
+            async with memory_budget.reserve(sum(fp["size"] for fp in group_fingerprints)):
+                group_docs = await self._rehydrate(group_fingerprints)
+                if len(group_docs) <= 1:
+                    return {"status": "skipped", "deleted_keys": [], "written_keys": [], "plan_group": None}
+
+                # 분석 이후 내용이 바뀐 문서가 있으면 병합하지 않음
+                hashes = {fp["key"]: fp["hash"] for fp in group_fingerprints}
+                changed = [
+                    doc["key"] for doc in group_docs if hashlib.sha256(doc["content"]).hexdigest() != hashes[doc["key"]]
+                ]
+                if changed:
+                    logger.warning(f"Skipping group, documents changed since analysis: {changed}")
+                    return {"status": "skipped", "deleted_keys": [], "written_keys": [], "plan_group": None}
+
+                group = [doc["key"] for doc in group_docs]
+                logger.info(f"Merging {len(group_docs)} documents: {group}")
+                merged = await self._agent.merge_documents(group_docs)
+                merged["metadata"] = {**merged["metadata"], "compaction_level": output_level}
+
+                if plan_id is not None:
+                    content_key = await self._save_plan_content(plan_id, plan_index, merged)
+                    if content_key is None:
+                        return {"status": "failed", "deleted_keys": [], "written_keys": [], "plan_group": None}
+                    plan_group = PlanGroup(
+                        sources=[PlanDocument(key=doc["key"], etag=doc["etag"]) for doc in group_docs],
+                        directory=merged["directory"],
+                        filename=merged["filename"],
+                        metadata=merged["metadata"],
+                        content_key=content_key,
+                    )
+                    dest = f"{settings.s3_compact_prefix}/{merged['directory']}/{merged['filename']}"
+                    sources = [key for key in group if key != dest]
+                    logger.info(f"[DRY RUN] Would upload to: {dest}")
+                    logger.info(f"[DRY RUN] Would delete: {sources}")
+                    deleted_keys = [k for key in sources for k in (key, f"{key}.metadata.json")]
+                    return {
+                        "status": "merged",
+                        "deleted_keys": deleted_keys,
+                        "written_keys": [],
+                        "plan_group": plan_group,
+                    }
+
+                # 병합된 문서를 compact prefix에 업로드
+                written_key = await self._write_merged(merged)
+                if written_key is None:
+                    return {"status": "failed", "deleted_keys": [], "written_keys": [], "plan_group": None}
+
+            # 기존 문서들 삭제 (병합 문서가 원본 중 하나의 키를 덮어썼으면 그 키는 남김)
+            return {
+                "status": "merged",
+                "deleted_keys": await asyncio.to_thread(
+                    self._delete_with_metadata, [key for key in group if key != written_key]
+                ),
+                "written_keys": [written_key],
+                "plan_group": None,
+            }
+
+    async def merge_task(self, task: MergeTask) -> MergeTaskResult:
+        """병합 작업 처리 (worker) - Agent 사용량은 결과에 담아 coordinator에서 합산"""
+        with track_usage() as usage:
+            outcome = await self._merge_group(
+                [source.model_dump() for source in task.sources],
+                task.output_level,
+                self._memory_budget,
+                plan_id=task.plan_id,
+                plan_index=task.plan_index,
+            )
+        return MergeTaskResult(run_id=task.run_id, group_id=task.group_id, usage=usage, **outcome)
+
+    async def _dispatch_merge_tasks(
+        self,
+        groups: list[tuple[int, list[dict]]],
+        plan_id: str | None,
+    ) -> list[dict]:
+        """그룹별 병합 작업을 발행하고 결과를 수집
+
+        Args:
+            groups: [(plan_index, group_fingerprints), ...]
+
+        Returns:
+            그룹별 결과 (timeout까지 오지 않은 그룹은 failed, 나중에 도착하면 다음 실행에서 반영)
+        """
+        run_id = uuid.uuid4().hex
+        tasks = [
+            MergeTask(
+                run_id=run_id,
+                group_id=f"{run_id}-{index}",
+                sources=[
+                    MergeSource(key=fp["key"], etag=fp["etag"], size=fp["size"], hash=fp["hash"])
+                    for fp in group_fingerprints
+                ],
+                output_level=self._output_level(group_fingerprints),
+                plan_id=plan_id,
+                plan_index=index,
+            )
+            for index, group_fingerprints in groups
+        ]
+
+        self._merge_collector.expect(run_id, [task.group_id for task in tasks])
+        await publish_batch(tasks, topic=settings.kafka_topic_compact_merge, keys=[task.group_id for task in tasks])
+        logger.info(f"Dispatched {len(tasks)} merge tasks: run_id={run_id}")
+
+        results = await self._merge_collector.wait(run_id, timeout=self._merge_task_timeout_seconds)
+        outcomes = []
+        for task in tasks:
+            result = results.get(task.group_id)
+            if result is None:
+                outcomes.append({"status": "failed", "deleted_keys": [], "written_keys": [], "plan_group": None})
+            else:
+                if result.status == "failed":
+                    logger.error(f"Merge task {task.group_id} failed: {result.error}")
+                if result.usage is not None:
+                    merge_usage(result.usage)
+                outcomes.append(
                     {
-                        "key": key,
-                        "content": content,
-                        "metadata": metadata,
+                        "status": result.status,
+                        "deleted_keys": result.deleted_keys,
+                        "written_keys": result.written_keys,
+                        "plan_group": result.plan_group,
                     }
                 )
-            except Exception as e:
-                logger.warning(f"Failed to load document {key}: {e}")
-                continue
+        return outcomes
+
+    async def estimate(self) -> dict:
+        """Compact 사전 비용 추정 (Agent 호출 없이 로컬에서 토큰 계산)
+
+        문서 원문은 읽지 않습니다. 마지막 실행 이후 바뀌지 않은 문서는 그 실행의 fingerprint 색인을,
+        새/변경 문서는 목록의 크기를 사용합니다.
+        병합 그룹은 분석 전에는 알 수 없으므로, 모든 문서가 두 개씩 병합된다고 가정한 상한값을 반환합니다.
+        """
+        documents = await self._estimate_fingerprints([settings.s3_base_prefix, settings.s3_compact_prefix])
+        tier_state = await self._load_tier_state()
+        candidates, reexamined = self._select_candidates(documents, tier_state["run_count"], tier_state["watermark"])
+        # run()과 같이 판정 캐시로 결정되는 문서는 모델에 보내지 않음
+        verdicts = await self._load_verdicts()
+        needed, _, _ = await asyncio.to_thread(self._filter_known, candidates, verdicts)
+        analyzed, deferred, oversized = self._fit_analysis_budget(needed)
 
-        return documents
+        analysis_tokens = (
+            estimate_tokens(build_similarity_prompt([]))
+            + sum(estimate_tokens(doc["key"]) + doc["excerpt_tokens"] for doc in analyzed)
+            if analyzed
+            else 0
+        )
+        max_merge_calls = len(analyzed) // 2
+        max_merge_tokens = sum(doc["tokens"] for doc in analyzed) if max_merge_calls else 0
+        max_merge_tokens += estimate_tokens(build_merge_prompt([])) * max_merge_calls
+        max_tokens = analysis_tokens + max_merge_tokens
+        max_agent_calls = (1 if analyzed else 0) + max_merge_calls
 
-    async def run(self, dry_run: bool = False) -> dict:
+        return {
+            "documents": len(documents),
+            "bytes": sum(doc["size"] for doc in documents),
+            "candidates": len(candidates),
+            "cached_documents": len(candidates) - len(needed),
+            "reexamined_levels": sorted(reexamined),
+            "deferred_documents": len(deferred),
+            "oversized_documents": len(oversized),
+            "analysis_tokens": analysis_tokens,
+            "max_merge_tokens": max_merge_tokens,
+            "max_tokens": max_tokens,
+            "max_agent_calls": max_agent_calls,
+            "estimated_seconds": self._estimate_seconds(analysis_tokens, 1 if analyzed else 0),
+            "max_estimated_seconds": self._estimate_seconds(max_tokens, max_agent_calls),
+            "budget": {
+                "max_tokens": self._max_tokens,
+                "max_seconds": self._max_seconds,
+                "max_groups": self._max_groups,
+            },
+        }
+
+    async def run(self, dry_run: bool = False, progress: RunStats | None = None) -> dict:
         """Compact 실행
 
         Args:
-            dry_run: True면 분석/병합만 수행하고 업로드/삭제/동기화는 건너뜀
+            dry_run: True면 분석/병합 결과를 plan으로 저장하고 업로드/삭제/동기화는 건너뜀
+            progress: 단계별 진행 상황 집계/보고 (없으면 내부에서 생성)
         """
-        # 1. S3에서 문서 로드 (원본 + 기존 compact 문서)
-        documents = []
-        for prefix in [settings.s3_base_prefix, settings.s3_compact_prefix]:
-            logger.info(f"Loading documents from s3://{settings.s3_bucket}/{prefix}")
-            documents.extend(self._load_documents(prefix))
+        started = time.monotonic()
+        memory_budget = self._memory_budget
+        run_stats = progress or RunStats()
+        stats = run_stats.stats
+        empty = {"status": "completed", "merged": 0, "deleted": 0, "run_id": run_stats.run_id}
+
+        # 1. S3에서 문서 로드 (원본 + 기존 compact 문서) - 원문 대신 fingerprint만 보관
+        async with run_stats.stage("load"):
+            documents = await self._load_fingerprints(
+                [settings.s3_base_prefix, settings.s3_compact_prefix], memory_budget
+            )
+            stats.documents_loaded = len(documents)
+            stats.bytes_read = sum(doc["size"] for doc in documents)
+            await self._save_fingerprint_index(documents)
 
         if not documents:
             logger.info("No documents found")
-            return {"status": "completed", "merged": 0, "deleted": 0}
+            if not dry_run:
+                await self._sync_late_merges()
+            return {**empty, "stats": stats.model_dump()}
 
         logger.info(f"Found {len(documents)} documents")
+        live_hashes = {doc["hash"] for doc in documents}
 
-        # 2. Claude로 유사 문서 그룹 분석 + 가치 없는 문서 필터링
-        logger.info("Analyzing document similarity...")
-        analysis = await self._agent.find_similar_documents(documents)
-        trash_keys = analysis.get("delete", [])
-        groups = analysis.get("groups", [])
+        # tier 정책에 따라 분석 대상 선택 (새 문서 + 관련 level 1 후보 + 재검토 주기가 된 level)
+        async with run_stats.stage("select"):
+            tier_state = await self._load_tier_state()
+            run_count = tier_state["run_count"]
+            documents, reexamined = self._select_candidates(documents, run_count, tier_state["watermark"])
+            level0 = [doc for doc in documents if doc["level"] == 0]
+            stats.candidates = len(documents)
+        if not documents:
+            logger.info("No new documents to compact")
+            if not dry_run:
+                await self._sync_late_merges()
+            return {**empty, "stats": stats.model_dump()}
+        logger.info(f"Selected {len(documents)} candidates (reexamined levels: {sorted(reexamined)})")
 
-        # key -> document 매핑
+        # key -> fingerprint 매핑
         doc_map = {doc["key"]: doc for doc in documents}
 
+        async with run_stats.stage("analyze"):
+            # 판정 캐시에 있는 문서 쌍은 모델에 다시 묻지 않음
+            verdicts = await self._load_verdicts()
+            documents, known_deletes, known_merges = await asyncio.to_thread(self._filter_known, documents, verdicts)
+            logger.info(
+                f"{len(documents)}/{len(doc_map)} candidates need analysis "
+                f"(cached: {len(known_deletes)} deletes, {len(known_merges)} merge pairs)"
+            )
+
+            documents, deferred_documents, oversized_documents = self._fit_analysis_budget(documents)
+            if deferred_documents:
+                logger.info(f"Token budget exceeded, deferring {len(deferred_documents)} documents to next run")
+            if oversized_documents:
+                logger.warning(
+                    f"Skipping {len(oversized_documents)} documents larger than the analysis budget: "
+                    f"{[doc['key'] for doc in oversized_documents]}"
+                )
+            tokens_used = estimate_tokens(build_similarity_prompt(documents)) if documents else 0
+
+            # 2. Claude로 유사 문서 그룹 분석 + 가치 없는 문서 필터링 (문서 발췌 기반)
+            # 판정을 받지 못한 문서는 다음 실행에서 다시 level 0으로 분석
+            unanswered = list(documents)
+            if documents:
+                logger.info("Analyzing document similarity...")
+                analysis = await self._agent.find_similar_documents(documents)
+                # 응답을 파싱하지 못해 만든 대체 결과는 판정으로 남기지 않음
+                if analysis.get("parsed", True):
+                    answered = verdicts.record_analysis(documents, analysis)
+                    unanswered = [doc for doc in documents if doc["key"] not in answered]
+                    verdicts.prune(live_hashes, self._verdict_max_pairs)
+                    await self._save_verdicts(verdicts)
+            else:
+                analysis = {"delete": [], "groups": []}
+
+            # 모델 판정 + 캐시된 판정 결합
+            trash_keys = list(dict.fromkeys([*analysis.get("delete", []), *known_deletes]))
+            groups = self._union_groups(analysis.get("groups", []), known_merges)
+
+            stats.analyzed_documents = len(documents)
+            stats.groups_found = sum(1 for group in groups if len(group) > 1)
+            stats.tokens_used = tokens_used
+
+        plan = CompactPlan() if dry_run else None
         merged_count = 0
         deleted_count = 0
         deleted_keys = []
+        written_keys = []
+        deferred_groups = 0
+        oversized_groups = 0
 
         # 2-1. 가치 없는 문서 삭제
         if trash_keys:
-            logger.info(f"Removing {len(trash_keys)} low-value documents: {trash_keys}")
-            keys_to_delete = []
-            for key in trash_keys:
-                keys_to_delete.append(key)
-                keys_to_delete.append(f"{key}.metadata.json")
-
-            if dry_run:
-                logger.info(f"[DRY RUN] Would delete low-value: {trash_keys}")
-                deleted_keys.extend(keys_to_delete)
-                deleted_count += len(keys_to_delete)
-            elif keys_to_delete:
-                delete_result = self._s3.delete_objects(keys_to_delete)
-                deleted_count += len(delete_result.get("deleted", []))
-                deleted_keys.extend(delete_result.get("deleted", []))
-
-        # 3. 각 그룹 처리
+            async with run_stats.stage("delete"):
+                logger.info(f"Removing {len(trash_keys)} low-value documents: {trash_keys}")
+
+                if dry_run:
+                    logger.info(f"[DRY RUN] Would delete low-value: {trash_keys}")
+                    plan.deletes.extend(
+                        PlanDocument(key=key, etag=doc_map[key]["etag"]) for key in trash_keys if key in doc_map
+                    )
+                    for key in trash_keys:
+                        deleted_keys.extend([key, f"{key}.metadata.json"])
+                    deleted_count += len(trash_keys) * 2
+                else:
+                    deleted = await asyncio.to_thread(self._delete_with_metadata, trash_keys)
+                    deleted_count += len(deleted)
+                    deleted_keys.extend(deleted)
+                stats.deleted = deleted_count
+
+        # 3. 병합 대상 그룹을 가치(줄어드는 바이트) 순으로 정렬
+        candidates = []
         for group in groups:
-            if len(group) <= 1:
-                continue
+            group_fingerprints = [doc_map[key] for key in group if key in doc_map]
+            if len(group) > 1 and len(group_fingerprints) > 1:
+                if not self._allowed_group(group_fingerprints, reexamined):
+                    logger.info(f"Skipping group without new documents: {group}")
+                    continue
+                candidates.append((group, group_fingerprints))
+        candidates.sort(key=lambda candidate: self._group_value(candidate[1]), reverse=True)
+        merge_overhead = estimate_tokens(build_merge_prompt([]))
 
-            group_docs = [doc_map[key] for key in group if key in doc_map]
-            if len(group_docs) <= 1:
-                continue
+        plan_id = plan.plan_id if dry_run else None
+        outcomes = []
+        dispatched = []
+        attempted = []
+        # 다음 실행에서 다시 level 0으로 다뤄야 하는 문서 (미룬 분석 문서 + 미루거나 실패한 그룹)
+        pending = [*deferred_documents, *unanswered]
 
-            logger.info(f"Merging {len(group_docs)} documents: {group}")
+        async with run_stats.stage("merge"):
+            for index, (group, group_fingerprints) in enumerate(candidates):
+                # 실행 예산 초과 시 남은 그룹은 다음 실행으로 미룸
+                group_tokens = merge_overhead + sum(fp["tokens"] for fp in group_fingerprints)
+                # 혼자서도 토큰 예산을 넘는 그룹은 미뤄도 처리할 수 없으므로 건너뜀
+                if self._max_tokens and group_tokens > self._max_tokens:
+                    logger.warning(f"Skipping group larger than the token budget ({group_tokens} tokens): {group}")
+                    oversized_groups += 1
+                    continue
+                merged_groups = len(dispatched) + sum(outcome["status"] == "merged" for outcome in outcomes)
+                if not self._within_budget(merged_groups, tokens_used + group_tokens, started):
+                    deferred_groups += 1
+                    pending.extend(group_fingerprints)
+                    continue
+                tokens_used += group_tokens
+                stats.tokens_used = tokens_used
+                stats.merges_planned += 1
+                stats.bytes_read += sum(fp["size"] for fp in group_fingerprints)
 
-            # 4. Claude로 문서 병합
-            merged = await self._agent.merge_documents(group_docs)
+                # 4. 그룹 병합 (분산 모드면 작업 발행 후 일괄 수집)
+                attempted.append(group_fingerprints)
+                if self._merge_fanout:
+                    dispatched.append((index, group_fingerprints))
+                    continue
+                outcome = await self._merge_group(
+                    group_fingerprints, self._output_level(group_fingerprints), memory_budget, plan_id, index
+                )
+                outcomes.append(outcome)
+                stats.merges_done += outcome["status"] == "merged"
+                await run_stats.emit("merge")
+
+            if dispatched:
+                outcomes.extend(await self._dispatch_merge_tasks(dispatched, plan_id))
 
-            if dry_run:
-                dest = f"{settings.s3_compact_prefix}/{merged['directory']}/{merged['filename']}"
-                logger.info(f"[DRY RUN] Would upload to: {dest}")
-                logger.info(f"[DRY RUN] Would delete: {group}")
+            for group_fingerprints, outcome in zip(attempted, outcomes, strict=True):
+                if outcome["status"] != "merged":
+                    pending.extend(group_fingerprints)
+                    continue
                 merged_count += 1
-                for key in group:
-                    deleted_keys.extend([key, f"{key}.metadata.json"])
-                deleted_count += len(group) * 2
-                continue
+                deleted_count += len(outcome["deleted_keys"])
+                deleted_keys.extend(outcome["deleted_keys"])
+                written_keys.extend(outcome["written_keys"])
+                if dry_run:
+                    plan.groups.append(outcome["plan_group"])
+            # 이전 실행에서 timeout 이후 도착한 병합 결과도 이번 동기화에 반영
+            if not dry_run:
+                for result in self._take_late_merges():
+                    merged_count += 1
+                    deleted_count += len(result.deleted_keys)
+                    deleted_keys.extend(result.deleted_keys)
+                    written_keys.extend(result.written_keys)
+            stats.merges_done = merged_count
+            stats.deleted = deleted_count
 
-            # 5. 병합된 문서를 compact prefix에 업로드
-            output_directory = f"{settings.s3_compact_prefix}/{merged['directory']}"
+        if deferred_groups:
+            logger.info(f"Run budget reached, deferred {deferred_groups} groups to next run")
 
-            content = merged["content"]
-            if isinstance(content, str):
-                content = content.encode("utf-8")
+        summary = {
+            "run_id": run_stats.run_id,
+            "merged": merged_count,
+            "deleted": deleted_count,
+            "deleted_keys": deleted_keys,
+            "deferred_groups": deferred_groups,
+            "deferred_documents": len(deferred_documents),
+            "oversized_documents": [doc["key"] for doc in oversized_documents],
+            "oversized_groups": oversized_groups,
+            "estimated_tokens": tokens_used,
+        }
+
+        if dry_run:
+            async with run_stats.stage("plan"):
+                saved = await self._save_plan(plan)
+            return {
+                "status": "dry_run",
+                **summary,
+                "plan_id": plan.plan_id if saved else None,
+                "stats": stats.model_dump(),
+            }
 
-            upload_result = await self._s3.upload_file_with_metadata(
-                file_content=content,
-                directory=output_directory,
-                filename=merged["filename"],
-                metadata=merged["metadata"],
+        # 7. Bedrock KB 동기화 (쓰거나 지운 문서만)
+        async with run_stats.stage("sync"):
+            if written_keys or deleted_keys:
+                await self._sync_knowledge_base(written_keys, deleted_keys)
+            pending_level0 = [doc for doc in pending if doc["level"] == 0]
+            await self._save_tier_state(
+                {
+                    "run_count": run_count + 1,
+                    "watermark": self._next_watermark(level0, pending_level0, tier_state["watermark"]),
+                }
             )
 
-            if not upload_result.get("success"):
-                logger.error(f"Failed to upload merged document: {upload_result}")
-                continue
+        return {"status": "completed", **summary, "stats": stats.model_dump()}
 
-            merged_count += 1
+    async def apply(self, plan_id: str) -> dict:
+        """dry run으로 생성된 plan 적용
 
-            # 6. 기존 문서들 삭제
-            keys_to_delete = []
-            for key in group:
-                keys_to_delete.append(key)
-                keys_to_delete.append(f"{key}.metadata.json")
+        Agent 호출 없이 S3/Bedrock I/O만 수행합니다 (boto3 호출은 스레드에서 실행).
+        plan 생성 이후 원본 문서의 ETag가 바뀌었으면 적용을 거부합니다.
+        """
+        rejected = {"status": "rejected", "merged": 0, "deleted": 0, "deleted_keys": [], "plan_id": plan_id}
 
-            if keys_to_delete:
-                delete_result = self._s3.delete_objects(keys_to_delete)
-                deleted_count += len(delete_result.get("deleted", []))
-                deleted_keys.extend(delete_result.get("deleted", []))
+        plan = await self._load_plan(plan_id)
+        if plan is None:
+            return {**rejected, "error": f"Plan not found: {plan_id}"}
+        if plan.version != PLAN_VERSION:
+            return {**rejected, "error": f"Unsupported plan version: {plan.version} (expected {PLAN_VERSION})"}
 
-        # 7. Bedrock KB 동기화
-        if merged_count > 0 and not dry_run:
-            logger.info("Starting Bedrock KB sync...")
-            sync_result = await self._bedrock.start_sync()
-            if sync_result.get("success"):
-                logger.info(f"KB sync started: job_id={sync_result.get('ingestion_job_id')}")
-            else:
-                logger.error(f"KB sync failed: {sync_result.get('error')}")
+        # 1. 원본 문서 변경 여부 확인
+        current_etags = {}
+        for prefix in [settings.s3_base_prefix, settings.s3_compact_prefix]:
+            for obj in await asyncio.to_thread(self._s3.list_documents, prefix):
+                current_etags[obj["key"]] = obj.get("etag", "")
+
+        stale_keys = [doc.key for doc in plan.source_documents() if current_etags.get(doc.key) != doc.etag]
+        if stale_keys:
+            logger.warning(f"Rejecting plan {plan_id}, documents changed: {stale_keys}")
+            return {**rejected, "error": f"Documents changed since plan was created: {stale_keys}"}
+
+        logger.info(f"Applying plan {plan_id}: {len(plan.deletes)} deletes, {len(plan.groups)} groups")
+
+        merged_count = 0
+        deleted_keys = []
+        written_keys = []
+
+        # 2. 가치 없는 문서 삭제
+        if plan.deletes:
+            deleted_keys.extend(await asyncio.to_thread(self._delete_with_metadata, [doc.key for doc in plan.deletes]))
+
+        # 3. 저장된 병합 결과 업로드 후 원본 삭제
+        for group in plan.groups:
+            try:
+                content = await asyncio.to_thread(self._s3.get_document, group.content_key)
+            except Exception as e:
+                if is_transient(e):
+                    raise
+                logger.error(f"Failed to load merged content {group.content_key}: {e}")
+                continue
+
+            merged = {
+                "content": content,
+                "directory": group.directory,
+                "filename": group.filename,
+                "metadata": group.metadata,
+            }
+            written_key = await self._write_merged(merged)
+            if written_key is None:
+                continue
+
+            merged_count += 1
+            written_keys.append(written_key)
+            deleted_keys.extend(
+                await asyncio.to_thread(
+                    self._delete_with_metadata, [doc.key for doc in group.sources if doc.key != written_key]
+                )
+            )
+
+        # 4. Bedrock KB 동기화
+        if written_keys or deleted_keys:
+            await self._sync_knowledge_base(written_keys, deleted_keys)
 
-        status = "dry_run" if dry_run else "completed"
         return {
-            "status": status,
+            "status": "completed",
             "merged": merged_count,
-            "deleted": deleted_count,
+            "deleted": len(deleted_keys),
             "deleted_keys": deleted_keys,
+            "plan_id": plan_id,
         }
@@ -0,0 +1,126 @@
+"""Compact 실행 잠금
+
+compact 이벤트는 API, 스케줄러, 수동 발행 등 여러 곳에서 들어오므로 한 번에 하나의 실행만 허용합니다.
+실행 중에 들어온 트리거는 후속 실행 표시 하나로 합쳐지고, 실행이 끝나면 후속 실행을 한 번만 발행합니다.
+실행 중 갱신 오류는 lease 만료 전까지 재시도하고, 다른 replica가 잠금을 가져갔거나 만료될 때까지 갱신하지
+못하면 실행을 취소하고 CompactLockLostError를 발생시킵니다.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.external_service.s3 import S3Service
+from src.services.lease import S3Lease
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class CompactLockLostError(Exception):
+    """실행 중 compact 잠금을 잃음"""
+
+
+class CompactRunLock:
+    """S3 lease 기반 compact 단일 실행 잠금 + 후속 실행 표시"""
+
+    def __init__(
+        self,
+        s3_service: S3Service,
+        key: str,
+        pending_key: str,
+        owner: str,
+        ttl_seconds: float = 300,
+    ):
+        self._s3 = s3_service
+        self.key = key
+        self.pending_key = pending_key
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+
+    async def acquire(self) -> S3Lease | None:
+        """잠금 획득 (다른 실행이 보유 중이면 None)
+
+        같은 replica의 동시 실행도 구분하도록 획득마다 소유자를 새로 만듭니다.
+
+        Raises:
+            ClientError, LeaseError: S3 오류로 보유 여부를 확인하지 못한 경우
+        """
+        lease = S3Lease(self._s3, self.key, owner=f"{self.owner}:{uuid.uuid4().hex[:8]}", ttl_seconds=self.ttl_seconds)
+        if await lease.acquire():
+            return lease
+        return None
+
+    @asynccontextmanager
+    async def hold(self, lease: S3Lease) -> AsyncIterator[None]:
+        """실행 동안 lease를 주기적으로 갱신하고, 끝나면 반환
+
+        갱신 오류는 만료 전까지 재시도하고, 다른 보유자가 있거나 만료되면
+        실행 중인 task를 취소하고 CompactLockLostError를 발생시킵니다.
+        """
+        running = asyncio.current_task()
+        lost = False
+
+        async def renew():
+            nonlocal lost
+            interval = self.ttl_seconds / 3
+            delay = interval
+            while True:
+                await asyncio.sleep(delay)
+                delay = interval
+                try:
+                    held = await lease.acquire()
+                except Exception as e:
+                    remaining = lease.expires_at - utc_now().timestamp()
+                    if remaining > 0:
+                        delay = min(interval, remaining / 2)
+                        logger.warning(f"Failed to renew compact lock {self.key} ({remaining:.1f}s left): {e}")
+                        continue
+                    held = False
+                if not held:
+                    logger.error(f"Lost compact lock {self.key} during run, cancelling")
+                    lost = True
+                    running.cancel()
+                    return
+
+        task = asyncio.create_task(renew())
+        try:
+            yield
+        except asyncio.CancelledError:
+            if not lost:
+                raise
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await lease.release()
+        if lost:
+            running.uncancel()
+            raise CompactLockLostError(f"Lost compact lock {self.key} during run")
+
+    def _request_follow_up(self) -> None:
+        # 이미 표시되어 있으면 (precondition 실패) 그대로 둠 - 여러 트리거가 하나로 합쳐짐
+        self._s3.put_object_conditional(self.pending_key, b"{}", if_none_match="*", content_type="application/json")
+
+    def _take_follow_up(self) -> bool:
+        try:
+            self._s3.get_document(self.pending_key)
+        except Exception:
+            return False
+        return bool(self._s3.delete_objects([self.pending_key]).get("deleted"))
+
+    async def request_follow_up(self) -> None:
+        """실행 중 들어온 트리거를 후속 실행 표시로 기록"""
+        await asyncio.to_thread(self._request_follow_up)
+
+    async def take_follow_up(self) -> bool:
+        """후속 실행 표시가 있으면 지우고 True 반환"""
+        try:
+            return await asyncio.to_thread(self._take_follow_up)
+        except Exception as e:
+            logger.warning(f"Failed to check pending compact trigger: {e}")
+            return False
@@ -0,0 +1,116 @@
+"""S3 조건부 쓰기 기반 분산 lease
+
+여러 replica 중 하나만 작업을 수행하도록 보장합니다 (leader election, 단일 실행 잠금).
+lease 객체에는 소유자와 만료 시각을 기록하고, ETag 조건부 쓰기로 경쟁 상태를 막습니다.
+보유자는 data로 작업 상태를 lease 객체에 함께 저장하여, 보유자가 바뀌어도 새 보유자가 이어받을 수 있습니다.
+
+acquire는 다른 보유자가 있을 때만 False를 반환하고, S3 오류는 그대로 발생시킵니다
+(일시적 오류를 "다른 보유자가 있음"과 구분하여 재시도할 수 있도록).
+"""
+
+import asyncio
+import json
+import logging
+
+from botocore.exceptions import ClientError
+
+from src.external_service.s3 import S3Service
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseError(Exception):
+    """lease 객체 쓰기 실패 (조건 불일치가 아닌 오류)"""
+
+
+class S3Lease:
+    """S3 객체 하나로 표현되는 만료형 lease"""
+
+    def __init__(self, s3_service: S3Service, key: str, owner: str, ttl_seconds: float = 60):
+        self._s3 = s3_service
+        self.key = key
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+        self._etag: str | None = None
+        # 마지막으로 기록한 만료 시각 (epoch seconds)
+        self.expires_at = 0.0
+        # acquire 때 함께 쓸 데이터 / 마지막 acquire 때 lease 객체에 저장되어 있던 데이터
+        self.data: dict = {}
+        self.stored_data: dict = {}
+
+    @property
+    def held(self) -> bool:
+        """마지막 acquire 성공 후 아직 보유 중인지 (로컬 기준)"""
+        return self._etag is not None
+
+    def _read(self) -> tuple[dict | None, str | None]:
+        """현재 lease 내용과 ETag 조회 (없으면 (None, None))"""
+        try:
+            content, etag = self._s3.get_document_with_etag(self.key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None, None
+            raise
+        try:
+            return json.loads(content.decode("utf-8")), etag
+        except ValueError:
+            return {}, etag
+
+    def _write(self, expires_at: float, if_match: str | None) -> bool:
+        body = json.dumps({"owner": self.owner, "expires_at": expires_at, "data": self.data}).encode("utf-8")
+        result = self._s3.put_object_conditional(
+            self.key,
+            body,
+            if_match=if_match,
+            if_none_match=None if if_match else "*",
+            content_type="application/json",
+        )
+        if result["success"]:
+            self._etag = result["etag"]
+            self.expires_at = expires_at
+            return True
+        if not result.get("precondition_failed"):
+            raise LeaseError(f"Failed to write lease {self.key}: {result.get('error')}")
+        self._etag = None
+        return False
+
+    def _acquire(self) -> bool:
+        now = utc_now().timestamp()
+        current, etag = self._read()
+        self.stored_data = (current or {}).get("data") or {}
+
+        if current is not None:
+            owned = current.get("owner") == self.owner
+            expired = current.get("expires_at", 0) <= now
+            if not owned and not expired:
+                self._etag = None
+                return False
+
+        return self._write(now + self.ttl_seconds, if_match=etag)
+
+    def _release(self) -> None:
+        if self._etag is None:
+            return
+        # 삭제 대신 만료된 lease로 덮어써서 다른 replica가 바로 획득할 수 있게 함
+        self._write(0, if_match=self._etag)
+        self._etag = None
+
+    async def acquire(self) -> bool:
+        """lease 획득 (이미 보유 중이면 만료 시각 연장)
+
+        Returns:
+            획득 여부 (다른 보유자가 있거나 동시에 갱신되면 False)
+
+        Raises:
+            ClientError, LeaseError: S3 조회/쓰기 실패 시 (보유 여부는 바뀌지 않음)
+        """
+        return await asyncio.to_thread(self._acquire)
+
+    async def release(self) -> None:
+        """보유 중인 lease 반환"""
+        try:
+            await asyncio.to_thread(self._release)
+        except Exception as e:
+            logger.warning(f"Failed to release lease {self.key}: {e}")
+            self._etag = None
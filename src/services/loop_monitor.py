@@ -0,0 +1,107 @@
+"""이벤트 루프 지연 / 멈춤 감지
+
+boto3 호출처럼 async 메서드 안의 동기 I/O는 이벤트 루프 전체를 멈추게 하지만 로그에는 드러나지 않습니다.
+
+- probe task: interval마다 깨어나 예정 시각보다 늦어진 시간(lag)을 히스토그램으로 기록
+- watchdog 스레드: probe의 마지막 heartbeat가 임계값 이상 지나면 루프 스레드의 현재 스택을 기록
+  (멈춘 동안 캡처하므로 루프를 막고 있는 코드가 스택에 나타남)
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from src.conf.metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALLS
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """이벤트 루프 lag 측정 및 멈춤 스택 기록
+
+    Args:
+        interval_seconds: lag 측정 간격
+        stall_threshold_seconds: 이 시간 이상 루프가 응답하지 않으면 멈춤으로 기록
+        max_stalls: 보관할 최근 멈춤 기록 수
+    """
+
+    def __init__(self, interval_seconds: float = 0.1, stall_threshold_seconds: float = 0.25, max_stalls: int = 20):
+        self._interval_seconds = interval_seconds
+        self._stall_threshold_seconds = stall_threshold_seconds
+        self._stalls: deque[dict] = deque(maxlen=max_stalls)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def stalls(self) -> list[dict]:
+        """최근 멈춤 기록 [{detected_at, blocked_seconds, lag_seconds, stack}, ...] (오래된 순)"""
+        return list(self._stalls)
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self._interval_seconds
+            await asyncio.sleep(self._interval_seconds)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            # watchdog이 기록한 멈춤이면 실제로 멈춘 전체 시간을 채움
+            if lag >= self._stall_threshold_seconds and self._stalls and self._stalls[-1]["lag_seconds"] is None:
+                self._stalls[-1]["lag_seconds"] = round(lag, 3)
+            self._heartbeat = now
+
+    def _capture(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        self._stalls.append(
+            {
+                "detected_at": utc_now().isoformat(),
+                "blocked_seconds": round(blocked, 3),
+                "lag_seconds": None,
+                "stack": stack,
+            }
+        )
+        EVENT_LOOP_STALLS.inc()
+        logger.warning(f"Event loop blocked for {blocked:.3f}s, loop thread stack:\n{stack}")
+
+    def _watch(self) -> None:
+        """루프 밖에서 heartbeat를 확인하여 멈춤당 한 번 스택 캡처"""
+        reported = None
+        check_interval = max(self._stall_threshold_seconds / 4, 0.01)
+        while not self._stopping.wait(check_interval):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self._interval_seconds
+            if blocked >= self._stall_threshold_seconds and heartbeat != reported:
+                reported = heartbeat
+                self._capture(blocked)
+
+    async def start(self) -> None:
+        """현재 이벤트 루프 모니터링 시작"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """모니터링 중지"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
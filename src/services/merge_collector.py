@@ -0,0 +1,82 @@
+"""병합 작업 결과 수집기
+
+결과 토픽은 모든 replica가 수신하므로, 각 replica는 자신이 coordinator인 실행의 결과만 보관합니다.
+
+worker는 결과를 보내기 전에 이미 병합 문서를 쓰고 원본을 지웠으므로, timeout 이후에 도착한 결과도 버리지 않고
+모아 두었다가 다음 실행의 KB 동기화에 반영합니다.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+from src.schema.v1.merge_task import MergeTaskResult
+
+logger = logging.getLogger(__name__)
+
+
+class MergeResultCollector:
+    """실행(run_id)별로 기다리는 그룹의 결과를 모음"""
+
+    def __init__(self, max_expired_runs: int = 100):
+        self._pending: dict[str, set[str]] = {}
+        self._results: dict[str, dict[str, MergeTaskResult]] = {}
+        self._done: dict[str, asyncio.Event] = {}
+        # timeout된 실행의 아직 오지 않은 그룹 (오래된 실행부터 잊음)
+        self._expired: OrderedDict[str, set[str]] = OrderedDict()
+        self._max_expired_runs = max_expired_runs
+        self._late: list[MergeTaskResult] = []
+
+    def expect(self, run_id: str, group_ids: list[str]) -> None:
+        """결과를 기다릴 그룹 등록 (작업 발행 전에 호출해야 결과 유실이 없음)"""
+        self._pending[run_id] = set(group_ids)
+        self._results[run_id] = {}
+        self._done[run_id] = asyncio.Event()
+        if not group_ids:
+            self._done[run_id].set()
+
+    def deliver(self, result: MergeTaskResult) -> bool:
+        """결과 전달 (이 replica가 기다리는 결과가 아니면 무시)
+
+        Returns:
+            결과 수락 여부
+        """
+        expired = self._expired.get(result.run_id)
+        if expired is not None and result.group_id in expired:
+            logger.warning(f"Late merge result: group_id={result.group_id}, status={result.status}")
+            expired.discard(result.group_id)
+            if not expired:
+                del self._expired[result.run_id]
+            self._late.append(result)
+            return True
+
+        pending = self._pending.get(result.run_id)
+        if pending is None or result.group_id not in pending:
+            return False
+        pending.discard(result.group_id)
+        self._results[result.run_id][result.group_id] = result
+        if not pending:
+            self._done[result.run_id].set()
+        return True
+
+    async def wait(self, run_id: str, timeout: float | None = None) -> dict[str, MergeTaskResult]:
+        """모든 결과가 도착하거나 timeout까지 대기 후 받은 결과 반환 (등록 해제)"""
+        try:
+            await asyncio.wait_for(self._done[run_id].wait(), timeout=timeout or None)
+        except TimeoutError:
+            logger.warning(
+                f"Timed out waiting for merge results: run_id={run_id}, missing={sorted(self._pending[run_id])}"
+            )
+        finally:
+            missing = self._pending.pop(run_id, None)
+            self._done.pop(run_id, None)
+            if missing:
+                self._expired[run_id] = missing
+                while len(self._expired) > self._max_expired_runs:
+                    self._expired.popitem(last=False)
+        return self._results.pop(run_id, {})
+
+    def take_late(self) -> list[MergeTaskResult]:
+        """timeout 이후 도착한 결과를 꺼냄 (다음 실행에서 KB 동기화에 반영)"""
+        late, self._late = self._late, []
+        return late
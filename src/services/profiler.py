@@ -0,0 +1,129 @@
+"""요청/compact 실행 프로파일링
+
+debug 또는 PROFILING_ENABLED일 때만 동작하며, 요청 헤더(X-Profile)/쿼리(?profile=)나 CompactEvent.profile로 요청된
+실행 하나를 프로파일러로 감싸 결과를 로컬 디스크 또는 S3에 저장합니다.
+
+pyinstrument 샘플링 프로파일러로 speedscope 형식(.speedscope.json)을 저장합니다 (https://www.speedscope.app).
+이벤트 루프 스레드 단위로 기록하므로 프로파일 중 같은 이벤트 루프에서 실행된 다른 요청도 함께 기록됩니다.
+프로파일러는 동시에 하나만 실행하며, 이미 실행 중이면 프로파일 없이 그대로 처리합니다.
+"""
+
+import asyncio
+import logging
+import re
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Literal
+
+import pyinstrument
+from pyinstrument.renderers import SpeedscopeRenderer
+
+from src.external_service.s3 import S3Service
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+# 토큰 없이 허용하는 요청 값
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+class ProfileRun:
+    """프로파일 한 번의 결과 (저장 위치는 종료 후 채워짐, 건너뛰었으면 None)"""
+
+    def __init__(self):
+        self.location: str | None = None
+
+
+class Profiler:
+    """요청된 실행을 프로파일링하여 저장
+
+    Args:
+        enabled: False면 프로파일 요청을 무시
+        token: 설정 시 요청 값이 일치해야 프로파일 (없으면 1/true/yes/on)
+        output: local(디스크) | s3
+        directory: local 저장 디렉토리
+        s3_service: s3 저장용
+        s3_prefix: s3 저장 prefix
+        interval_seconds: pyinstrument 샘플링 간격
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        token: str = "",
+        output: Literal["local", "s3"] = "local",
+        directory: str = "profiles",
+        s3_service: S3Service | None = None,
+        s3_prefix: str = "profiles",
+        interval_seconds: float = 0.001,
+    ):
+        self.enabled = enabled
+        self._token = token
+        self._output = output
+        self._directory = Path(directory)
+        self._s3 = s3_service
+        self._s3_prefix = s3_prefix
+        self._interval_seconds = interval_seconds
+        self._active = False
+
+    def requested(self, value: str | None) -> bool:
+        """요청 헤더/쿼리 값이 프로파일을 요청하는지 확인"""
+        if not self.enabled or not value:
+            return False
+        if self._token:
+            return value == self._token
+        return value.lower() in TRUTHY
+
+    @staticmethod
+    def _filename(name: str, suffix: str) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_")
+        return f"{utc_now().strftime('%Y%m%dT%H%M%S%fZ')}-{safe_name}{suffix}"
+
+    async def _save(self, filename: str, content: bytes) -> str | None:
+        """프로파일 저장 후 위치 반환 (실패 시 None)"""
+        if self._output == "s3" and self._s3 is not None:
+            result = await self._s3.upload_file(
+                file_content=content,
+                directory=self._s3_prefix,
+                filename=filename,
+                content_type="application/octet-stream",
+            )
+            if not result.get("success"):
+                logger.warning(f"Failed to upload profile {filename}: {result.get('error')}")
+                return None
+            return result["url"]
+
+        path = self._directory / filename
+        try:
+            await asyncio.to_thread(self._directory.mkdir, parents=True, exist_ok=True)
+            await asyncio.to_thread(path.write_bytes, content)
+        except OSError as e:
+            logger.warning(f"Failed to write profile {path}: {e}")
+            return None
+        return str(path)
+
+    @asynccontextmanager
+    async def profile(self, name: str) -> AsyncIterator[ProfileRun]:
+        """블록 실행을 프로파일링하고 종료 후 ProfileRun.location에 저장 위치 기록"""
+        run = ProfileRun()
+        if not self.enabled or self._active:
+            if self.enabled:
+                logger.info(f"Profiler busy, running {name} without profiling")
+            yield run
+            return
+
+        self._active = True
+        sampler = pyinstrument.Profiler(interval=self._interval_seconds, async_mode="enabled")
+        sampler.start()
+        try:
+            yield run
+        finally:
+            # 실패한 실행의 프로파일도 저장
+            try:
+                sampler.stop()
+                content = sampler.output(SpeedscopeRenderer()).encode("utf-8")
+            finally:
+                self._active = False
+            run.location = await self._save(self._filename(name, ".speedscope.json"), content)
+            logger.info(f"Saved profile of {name}: {run.location}")
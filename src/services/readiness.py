@@ -0,0 +1,155 @@
+"""시작 작업과 readiness 상태
+
+Kafka 토픽 확인과 broker 연결은 수 초가 걸릴 수 있으므로 lifespan에서 기다리지 않고 백그라운드로 실행합니다.
+프로세스는 바로 liveness(`/health`)에 응답하고, 시작 작업이 끝난 뒤에만 readiness(`/ready`)가 성공합니다.
+
+시작 후에는 S3/Bedrock/Kafka/Agent CLI를 interval마다 백그라운드로 확인하고 결과를 캐시합니다.
+`/ready`는 의존성을 직접 호출하지 않고 마지막 확인 결과(의존성별 지연 포함)를 그대로 반환합니다.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from src.conf.kafka import broker
+from src.conf.metrics import DEPENDENCY_PROBE_SECONDS, DEPENDENCY_UP
+from src.external_service.agent import AgentService
+from src.external_service.bedrock import BedrockKBService
+from src.external_service.s3 import S3Service
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[None]]
+
+
+async def _ping_kafka() -> None:
+    # 제한 시간은 Readiness가 적용 (ping은 연결될 때까지 재시도)
+    if not await broker.ping(timeout=None):
+        raise ConnectionError("Kafka broker not connected")
+
+
+def dependency_probes(
+    s3_service: S3Service,
+    bedrock_kb_service: BedrockKBService,
+    agent_service: AgentService,
+    names: list[str],
+) -> dict[str, Probe]:
+    """설정된 의존성 이름별 probe (실패 시 예외)"""
+    probes = {
+        "s3": lambda: asyncio.to_thread(s3_service.check_access),
+        "bedrock": lambda: asyncio.to_thread(bedrock_kb_service.check_access),
+        "kafka": _ping_kafka,
+        "agent": agent_service.check_cli,
+    }
+    return {name: probes[name] for name in names}
+
+
+class Readiness:
+    """백그라운드 시작 작업 실행 및 의존성 확인 결과 캐시
+
+    Args:
+        probes: 의존성 이름 → probe (실패 시 예외)
+        interval_seconds: 의존성 확인 주기
+        timeout_seconds: 의존성별 확인 제한 시간
+    """
+
+    def __init__(
+        self,
+        probes: dict[str, Probe] | None = None,
+        interval_seconds: float = 15,
+        timeout_seconds: float = 5,
+    ):
+        self._probes = probes or {}
+        self._interval_seconds = interval_seconds
+        self._timeout_seconds = timeout_seconds
+        self.ready = False
+        self.error: str | None = None
+        self.startup_seconds: float | None = None
+        self.dependencies: dict[str, dict] = {}
+        self._checked = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self, startup: Callable[[], Awaitable[None]]) -> None:
+        """시작 작업 후 주기적 의존성 확인을 백그라운드로 실행 (완료를 기다리지 않음)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(startup))
+
+    async def _run(self, startup: Callable[[], Awaitable[None]]) -> None:
+        started = time.perf_counter()
+        try:
+            await startup()
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+            logger.exception("Startup failed")
+            self._checked.set()
+            return
+        self.startup_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Started in {self.startup_seconds}s")
+
+        while True:
+            await self.check()
+            await asyncio.sleep(self._interval_seconds)
+
+    async def _probe(self, name: str, probe: Probe) -> dict:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(probe(), self._timeout_seconds)
+        except TimeoutError:
+            error = f"timed out after {self._timeout_seconds}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        elapsed = time.perf_counter() - started
+
+        DEPENDENCY_PROBE_SECONDS.labels(name, "ok" if error is None else "error").observe(elapsed)
+        DEPENDENCY_UP.labels(name).set(error is None)
+        # 상태가 바뀔 때만 로그
+        previous = self.dependencies.get(name)
+        if error is not None and (previous is None or previous["ok"]):
+            logger.warning(f"Dependency {name} unavailable: {error}")
+        elif error is None and previous is not None and not previous["ok"]:
+            logger.info(f"Dependency {name} recovered")
+        return {
+            "ok": error is None,
+            "latency_ms": round(elapsed * 1000, 1),
+            "error": error,
+            "checked_at": utc_now().isoformat(),
+        }
+
+    async def check(self) -> None:
+        """모든 의존성을 동시에 확인하여 결과 캐시"""
+        names = list(self._probes)
+        results = await asyncio.gather(*(self._probe(name, self._probes[name]) for name in names))
+        self.dependencies = dict(zip(names, results, strict=True))
+        self.ready = all(result["ok"] for result in results)
+        self._checked.set()
+
+    async def wait(self) -> bool:
+        """시작 작업과 첫 의존성 확인이 끝날 때까지 대기 후 ready 여부 반환"""
+        if self._task is not None:
+            await self._checked.wait()
+        return self.ready
+
+    async def stop(self) -> None:
+        """시작 작업/의존성 확인 중지"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def status(self) -> dict:
+        """readiness 응답 (starting | ready | unavailable | failed) - 마지막 확인 결과를 그대로 반환"""
+        if self.error:
+            return {"status": "failed", "error": self.error}
+        if not self._checked.is_set():
+            return {"status": "starting"}
+        return {
+            "status": "ready" if self.ready else "unavailable",
+            "startup_seconds": self.startup_seconds,
+            "dependencies": self.dependencies,
+        }
@@ -0,0 +1,50 @@
+"""Compact 실행 진행 상황 집계"""
+
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+from src.conf.tracing import tracer
+from src.schema.v1.compact_event import CompactStats
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, str, CompactStats], Awaitable[None]]
+
+
+class RunStats:
+    """단계별 소요 시간과 처리량을 모으고, 단계가 끝날 때마다 progress 콜백 호출
+
+    콜백 실패는 로그만 남기고 실행에는 영향을 주지 않습니다.
+    """
+
+    def __init__(self, on_progress: ProgressCallback | None = None, run_id: str | None = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.stats = CompactStats()
+        self._on_progress = on_progress
+        self._started = time.monotonic()
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[CompactStats]:
+        """단계 소요 시간 측정(span 포함) 후 progress 발행"""
+        started = time.monotonic()
+        try:
+            with tracer.start_as_current_span(f"compact.{name}", attributes={"compact.run_id": self.run_id}):
+                yield self.stats
+        finally:
+            self.stats.stage_seconds[name] = round(
+                self.stats.stage_seconds.get(name, 0) + time.monotonic() - started, 3
+            )
+        await self.emit(name)
+
+    async def emit(self, stage: str) -> None:
+        """현재 집계 상태로 progress 콜백 호출"""
+        self.stats.elapsed_seconds = round(time.monotonic() - self._started, 3)
+        if self._on_progress is None:
+            return
+        try:
+            await self._on_progress(self.run_id, stage, self.stats.model_copy(deep=True))
+        except Exception as e:
+            logger.warning(f"Failed to report compact progress ({stage}): {e}")
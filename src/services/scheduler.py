@@ -0,0 +1,146 @@
+"""Compact 스케줄러 - 코퍼스 증가량 기반 자동 실행"""
+
+import asyncio
+import logging
+import time
+
+from src.conf.kafka import broker
+from src.conf.settings import settings
+from src.schema.v1.compact_event import CompactEvent
+from src.services.lease import S3Lease
+
+logger = logging.getLogger(__name__)
+
+
+class CompactScheduler:
+    """마지막 compact 이후 새로 업로드된 문서 수/용량을 추적하여 compact 이벤트 발행
+
+    tiers는 (최소 문서 수, 최소 바이트, 마지막 실행 후 최소 대기 초) 목록이며,
+    문서 수 또는 용량 조건과 대기 시간을 함께 만족하는 tier가 하나라도 있으면 실행합니다.
+    쌓인 양이 많을수록 대기 시간이 짧은 tier가 먼저 충족되어 더 자주 실행됩니다.
+    새 문서가 있으면 max_interval_seconds가 지나면 무조건 실행합니다.
+
+    업로드/compact 이벤트는 모든 replica가 수신하고, lease를 보유한 replica만 이벤트를 발행합니다.
+    leader는 누적량과 마지막 실행 시각을 매 tick lease 객체에 저장하고, 새 leader는 leader가 되는 시점에
+    저장된 값을 이어받습니다 (누적량은 자신이 집계한 값과 큰 쪽 사용 - 같은 이벤트를 두 번 세지 않음).
+    """
+
+    def __init__(
+        self,
+        lease: S3Lease,
+        tiers: list[tuple[int, int, float]],
+        max_interval_seconds: float = 86400,
+        check_interval_seconds: float = 60,
+    ):
+        self._lease = lease
+        self._tiers = tiers
+        self._max_interval_seconds = max_interval_seconds
+        self._check_interval_seconds = check_interval_seconds
+        self._task: asyncio.Task | None = None
+
+        self.pending_documents = 0
+        self.pending_bytes = 0
+        # lease 객체에 저장하여 replica 간에 이어받으므로 wall clock 사용
+        self.last_run = time.time()
+
+    def record_upload(self, size: int) -> None:
+        """새 문서 업로드 기록"""
+        self.pending_documents += 1
+        self.pending_bytes += size
+
+    def record_run(self) -> None:
+        """compact 전체 실행 기록 - 누적량 초기화"""
+        self.pending_documents = 0
+        self.pending_bytes = 0
+        self.last_run = time.time()
+
+    def state(self) -> dict:
+        """lease 객체에 저장할 스케줄러 상태"""
+        return {
+            "pending_documents": self.pending_documents,
+            "pending_bytes": self.pending_bytes,
+            "last_run": self.last_run,
+        }
+
+    def restore(self, state: dict) -> None:
+        """이전 leader가 저장한 상태 이어받기
+
+        누적량은 자신이 집계한 값과 큰 쪽을 사용하고, 마지막 실행 시각은 저장된 값을 사용합니다
+        (자신의 값은 실행 기록이 없으면 프로세스 시작 시각이므로).
+        """
+        self.pending_documents = max(self.pending_documents, int(state.get("pending_documents", 0)))
+        self.pending_bytes = max(self.pending_bytes, int(state.get("pending_bytes", 0)))
+        if "last_run" in state:
+            self.last_run = float(state["last_run"])
+
+    def trigger_reason(self, now: float | None = None) -> str | None:
+        """실행 조건을 만족하면 사유 반환"""
+        if not self.pending_documents:
+            return None
+
+        elapsed = (now if now is not None else time.time()) - self.last_run
+        for min_documents, min_bytes, min_wait_seconds in self._tiers:
+            if elapsed < min_wait_seconds:
+                continue
+            if self.pending_documents >= min_documents or self.pending_bytes >= min_bytes:
+                return f"tier(documents>={min_documents} or bytes>={min_bytes}, wait>={min_wait_seconds}s)"
+
+        if elapsed >= self._max_interval_seconds:
+            return f"max_interval({self._max_interval_seconds}s)"
+        return None
+
+    async def tick(self) -> bool:
+        """조건 확인 후 leader면 compact 이벤트 발행
+
+        Returns:
+            이벤트 발행 여부
+        """
+        # 매 tick마다 lease를 갱신하여 leader 유지 (상태도 함께 저장)
+        was_leader = self._lease.held
+        self._lease.data = self.state()
+        if not await self._lease.acquire():
+            return False
+        if not was_leader:
+            self.restore(self._lease.stored_data)
+            logger.info(f"Became compact scheduler leader, restored state: {self.state()}")
+            self._lease.data = self.state()
+            await self._lease.acquire()
+
+        reason = self.trigger_reason()
+        if reason is None:
+            return False
+
+        logger.info(
+            f"Scheduling compact: {reason}, pending_documents={self.pending_documents}, "
+            f"pending_bytes={self.pending_bytes}"
+        )
+        await broker.publish(CompactEvent(trigger="scheduled"), topic=settings.kafka_topic_compact)
+        self.record_run()
+        self._lease.data = self.state()
+        await self._lease.acquire()
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning(f"Compact scheduler tick failed: {e}")
+            await asyncio.sleep(self._check_interval_seconds)
+
+    async def start(self) -> None:
+        """백그라운드 스케줄링 시작"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """스케줄링 중지 및 lease 반환"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lease.held:
+            await self._lease.release()
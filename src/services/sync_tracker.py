@@ -0,0 +1,234 @@
+"""Bedrock KB 동기화 작업 추적
+
+시작한 ingestion job을 기록하고 백그라운드에서 backoff로 상태를 polling하여 최신 상태를 캐시합니다.
+호출자는 Bedrock API를 직접 조회하지 않고 캐시된 상태를 읽거나 완료를 기다립니다.
+진행 중인 작업이 있을 때 들어온 동기화 요청은 작업이 끝난 뒤 한 번의 후속 동기화로 합칩니다.
+변경된 문서 수가 적으면 데이터 소스 전체 동기화 대신 해당 문서만 직접 ingest/delete 합니다.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+from src.external_service.bedrock import BedrockKBService
+from src.utils.datetime import utc_now
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"COMPLETE", "FAILED", "STOPPED"}
+CONFLICT_ERROR_CODE = "ConflictException"
+
+
+class SyncTracker:
+    """ingestion job 상태 캐시 및 백그라운드 polling"""
+
+    def __init__(
+        self,
+        bedrock_kb_service: BedrockKBService,
+        poll_interval_seconds: float = 5,
+        poll_max_interval_seconds: float = 60,
+        poll_backoff: float = 2,
+        max_jobs: int = 50,
+        document_sync_threshold: int = 0,
+        poll_max_errors: int = 10,
+    ):
+        self._bedrock = bedrock_kb_service
+        self._poll_interval_seconds = poll_interval_seconds
+        self._poll_max_interval_seconds = poll_max_interval_seconds
+        self._poll_backoff = poll_backoff
+        self._max_jobs = max_jobs
+        # 상태 조회가 연속으로 이 횟수만큼 실패하면 FAILED로 처리 (권한 없음, 삭제된 작업 등)
+        self._poll_max_errors = poll_max_errors
+        # 변경 문서 수가 이 값 이하면 문서 단위 ingest/delete (0이면 항상 전체 동기화)
+        self._document_sync_threshold = document_sync_threshold
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._done: dict[str, asyncio.Event] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._follow_up = False
+
+    def _active_job_id(self) -> str | None:
+        for job_id, job in reversed(self._jobs.items()):
+            if job["status"] not in TERMINAL_STATUSES:
+                return job_id
+        return None
+
+    def _track(self, job_id: str, status: str) -> dict:
+        """작업 기록 및 (진행 중이면) polling 시작"""
+        if job_id in self._jobs:
+            return self._jobs[job_id]
+
+        now = utc_now().isoformat()
+        job = {
+            "ingestion_job_id": job_id,
+            "status": status,
+            "statistics": {},
+            "failure_reasons": [],
+            "started_at": now,
+            "updated_at": now,
+            "finished_at": None,
+        }
+        self._jobs[job_id] = job
+        self._done[job_id] = asyncio.Event()
+
+        # 오래된 완료 작업부터 정리
+        while len(self._jobs) > self._max_jobs:
+            old_id = next((jid for jid, j in self._jobs.items() if j["status"] in TERMINAL_STATUSES), None)
+            if old_id is None:
+                break
+            self._jobs.pop(old_id)
+            self._done.pop(old_id, None)
+
+        if status in TERMINAL_STATUSES:
+            job["finished_at"] = now
+            self._done[job_id].set()
+        else:
+            self._tasks[job_id] = asyncio.create_task(self._poll(job_id))
+        return job
+
+    def _update(self, job_id: str, result: dict) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job["status"] = result["status"]
+        job["statistics"] = result.get("statistics", {})
+        job["failure_reasons"] = result.get("failure_reasons", [])
+        job["updated_at"] = utc_now().isoformat()
+        if job["status"] in TERMINAL_STATUSES:
+            job["finished_at"] = job["updated_at"]
+            self._done[job_id].set()
+
+    async def _poll(self, job_id: str) -> None:
+        delay = self._poll_interval_seconds
+        errors = 0
+        try:
+            while not self._done[job_id].is_set():
+                await asyncio.sleep(delay)
+                delay = min(delay * self._poll_backoff, self._poll_max_interval_seconds)
+                try:
+                    result = await self._bedrock.get_sync_status(job_id)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                if result.get("success"):
+                    errors = 0
+                    self._update(job_id, result)
+                    continue
+
+                errors += 1
+                logger.warning(
+                    f"Failed to poll KB sync job {job_id} ({errors}/{self._poll_max_errors}): {result.get('error')}"
+                )
+                if errors >= self._poll_max_errors:
+                    self._update(
+                        job_id,
+                        {"status": "FAILED", "failure_reasons": [f"status polling failed: {result.get('error')}"]},
+                    )
+        finally:
+            self._tasks.pop(job_id, None)
+
+        job = self._jobs.get(job_id, {})
+        logger.info(f"KB sync job finished: job_id={job_id}, status={job.get('status')}")
+        if self._follow_up and self._active_job_id() is None:
+            self._follow_up = False
+            logger.info("Starting follow-up KB sync requested during previous job")
+            try:
+                await self.start_sync()
+            except Exception as e:
+                logger.error(f"Follow-up KB sync failed to start: {e}")
+
+    def _coalesce(self, job_id: str) -> dict:
+        self._follow_up = True
+        job = self._jobs[job_id]
+        logger.info(f"KB sync job {job_id} in progress, follow-up sync scheduled")
+        return {
+            "success": True,
+            "ingestion_job_id": job_id,
+            "status": job["status"],
+            "follow_up": True,
+        }
+
+    async def start_sync(self) -> dict:
+        """동기화 시작 (진행 중인 작업이 있으면 끝난 뒤 후속 동기화 예약)"""
+        active_job_id = self._active_job_id()
+        if active_job_id is not None:
+            return self._coalesce(active_job_id)
+
+        result = await self._bedrock.start_sync()
+        if result.get("success"):
+            self._track(result["ingestion_job_id"], result["status"])
+            return result
+
+        if result.get("error_code") != CONFLICT_ERROR_CODE:
+            return result
+
+        # 다른 replica가 시작한 작업이 진행 중 - 찾아서 추적
+        active = await self._bedrock.list_active_sync_jobs()
+        if not active.get("success") or not active["jobs"]:
+            return result
+        job = active["jobs"][0]
+        self._track(job["ingestion_job_id"], job["status"])
+        return self._coalesce(job["ingestion_job_id"])
+
+    async def sync_documents(self, ingest_keys: list[str], delete_keys: list[str]) -> dict:
+        """변경된 문서만 KB에 반영 (변경이 많거나 문서 단위 반영에 실패하면 전체 동기화)
+
+        Args:
+            ingest_keys: 새로 쓰거나 바뀐 문서 S3 키 (메타데이터 파일 제외)
+            delete_keys: 삭제된 문서 S3 키 (메타데이터 파일 제외)
+        """
+        changes = len(ingest_keys) + len(delete_keys)
+        if changes == 0:
+            return {"success": True, "mode": "none"}
+        if changes > self._document_sync_threshold:
+            return {**await self.start_sync(), "mode": "full"}
+
+        result = {"success": True, "mode": "documents", "ingested": [], "deleted": []}
+        for keys, call, field in (
+            (ingest_keys, self._bedrock.ingest_documents, "ingested"),
+            (delete_keys, self._bedrock.delete_documents, "deleted"),
+        ):
+            if not keys:
+                continue
+            response = await call(keys)
+            result[field] = response.get("documents", [])
+            if not response.get("success"):
+                logger.warning(f"Document-level KB sync failed, falling back to full sync: {response.get('error')}")
+                return {**await self.start_sync(), "mode": "full"}
+
+        logger.info(f"KB documents synced: ingested={len(ingest_keys)}, deleted={len(delete_keys)}")
+        return result
+
+    async def get(self, job_id: str) -> dict | None:
+        """작업 상태 조회 (추적 중이 아니면 한 번 조회 후 추적)"""
+        if job_id not in self._jobs:
+            result = await self._bedrock.get_sync_status(job_id)
+            if not result.get("success"):
+                return None
+            self._track(job_id, result["status"])
+            self._update(job_id, result)
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def jobs(self) -> list[dict]:
+        """추적 중인 작업 목록 (최신순)"""
+        return [dict(job) for job in reversed(self._jobs.values())]
+
+    async def wait(self, job_id: str, timeout: float | None = None) -> dict | None:
+        """작업이 끝나거나 timeout까지 대기 후 상태 반환 (캐시에서 정리된 작업이면 None)"""
+        if await self.get(job_id) is None:
+            return None
+        done = self._done.get(job_id)
+        if done is not None:
+            try:
+                await asyncio.wait_for(done.wait(), timeout=timeout or None)
+            except TimeoutError:
+                pass
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def stop(self) -> None:
+        """백그라운드 polling 중지"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
@@ -0,0 +1,38 @@
+"""요청/실행 단위 Agent 사용량 집계
+
+track_usage 블록 안에서 (하위 task 포함) 발생한 Agent 호출의 사용량을 contextvar로 모읍니다.
+블록 밖의 호출은 메트릭으로만 기록됩니다.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.schema.v1.usage import AgentUsage, UsageTotals
+
+_current_usage: ContextVar[AgentUsage | None] = ContextVar("agent_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[AgentUsage]:
+    """블록 안의 Agent 사용량 집계 (중첩되면 안쪽 블록만 집계)"""
+    usage = AgentUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_usage(operation: str, call: UsageTotals) -> None:
+    """현재 집계 중인 사용량에 호출 추가"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.record(operation, call)
+
+
+def merge_usage(other: AgentUsage) -> None:
+    """다른 곳에서 집계한 사용량을 현재 집계에 합산"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.merge(other)
@@ -0,0 +1,118 @@
+"""유사도 분석 판정 캐시
+
+find_similar_documents의 판정(문서 쌍 병합 여부, 문서별 가치 없음 여부)을 내용 해시 기준으로 기록하여
+내용이 바뀌지 않은 문서 쌍을 모델에 다시 묻지 않도록 합니다.
+프롬프트가 바뀌면 판정도 달라질 수 있으므로 프롬프트 버전별로 따로 저장합니다.
+
+문서 쌍 판정은 문서 수의 제곱으로 늘어나므로 최근에 기록된 max_pairs개만 유지합니다.
+밀려난 쌍은 판정이 없는 것으로 보고 다시 분석합니다.
+"""
+
+import json
+from collections import defaultdict
+from itertools import combinations
+
+# 해시 앞부분만 키로 사용하여 저장 크기 절약
+HASH_PREFIX_LENGTH = 16
+
+MERGE = "merge"
+SEPARATE = "separate"
+DELETE = "delete"
+KEEP = "keep"
+
+
+def _short(content_hash: str) -> str:
+    return content_hash[:HASH_PREFIX_LENGTH]
+
+
+def _pair_key(hash_a: str, hash_b: str) -> str:
+    a, b = sorted((_short(hash_a), _short(hash_b)))
+    return f"{a}:{b}"
+
+
+class VerdictStore:
+    """(내용 해시 A, 내용 해시 B) -> 병합/분리, 내용 해시 -> 삭제/유지 판정 저장소"""
+
+    def __init__(self, pairs: dict[str, str] | None = None, values: dict[str, str] | None = None):
+        self.pairs = pairs or {}
+        self.values = values or {}
+
+    @classmethod
+    def from_json(cls, content: bytes) -> "VerdictStore":
+        data = json.loads(content.decode("utf-8"))
+        return cls(pairs=data.get("pairs", {}), values=data.get("values", {}))
+
+    def to_json(self) -> bytes:
+        return json.dumps({"pairs": self.pairs, "values": self.values}).encode("utf-8")
+
+    def pair(self, hash_a: str, hash_b: str) -> str | None:
+        """두 문서의 병합 판정 (없으면 None)"""
+        return self.pairs.get(_pair_key(hash_a, hash_b))
+
+    def value(self, content_hash: str) -> str | None:
+        """문서의 가치 판정 (없으면 None)"""
+        return self.values.get(_short(content_hash))
+
+    def merged_pairs(self, documents: list[dict]) -> list[tuple[str, str]]:
+        """documents 중 병합 판정이 있는 문서 key 쌍 (documents 순서)
+
+        문서 쌍을 모두 확인하지 않고 저장된 병합 판정만 순회합니다.
+        """
+        by_hash = defaultdict(list)
+        for index, doc in enumerate(documents):
+            by_hash[_short(doc["hash"])].append((index, doc["key"]))
+
+        found = []
+        for key, verdict in self.pairs.items():
+            if verdict != MERGE:
+                continue
+            hash_a, hash_b = key.split(":")
+            for a in by_hash.get(hash_a, []):
+                for b in by_hash.get(hash_b, []):
+                    found.append(tuple(sorted((a, b))))
+        found.sort()
+        return [(a[1], b[1]) for a, b in found]
+
+    def record_analysis(self, documents: list[dict], analysis: dict) -> set[str]:
+        """분석 결과를 판정으로 기록
+
+        응답에 나타난(delete 또는 groups에 포함된) 문서만 기록합니다.
+        모델이 빠뜨린 문서는 판정이 없는 것으로 남겨 다음 실행에서 다시 분석합니다.
+
+        Args:
+            documents: 분석에 사용한 문서 [{key, hash, ...}, ...]
+            analysis: find_similar_documents 결과 {delete, groups}
+
+        Returns:
+            판정을 기록한 문서 key
+        """
+        delete_keys = set(analysis.get("delete", []))
+        group_of = {key: index for index, group in enumerate(analysis.get("groups", [])) for key in group}
+        answered = [doc for doc in documents if doc["key"] in delete_keys or doc["key"] in group_of]
+
+        for doc in answered:
+            self.values[_short(doc["hash"])] = DELETE if doc["key"] in delete_keys else KEEP
+
+        for a, b in combinations(answered, 2):
+            if a["hash"] == b["hash"]:
+                continue
+            same_group = a["key"] in group_of and group_of[a["key"]] == group_of.get(b["key"])
+            key = _pair_key(a["hash"], b["hash"])
+            # 다시 기록된 쌍을 최근 순서로 이동
+            self.pairs.pop(key, None)
+            self.pairs[key] = MERGE if same_group else SEPARATE
+        return {doc["key"] for doc in answered}
+
+    def prune(self, live_hashes: set[str], max_pairs: int = 0) -> None:
+        """현재 코퍼스에 없는 문서의 판정 제거
+
+        Args:
+            live_hashes: 현재 코퍼스 문서의 내용 해시
+            max_pairs: 유지할 최대 문서 쌍 판정 수 (0: 무제한, 초과 시 오래된 판정부터 제거)
+        """
+        live = {_short(h) for h in live_hashes}
+        self.values = {h: v for h, v in self.values.items() if h in live}
+        pairs = [(key, v) for key, v in self.pairs.items() if all(part in live for part in key.split(":"))]
+        if max_pairs and len(pairs) > max_pairs:
+            pairs = pairs[-max_pairs:]
+        self.pairs = dict(pairs)
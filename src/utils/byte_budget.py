@@ -0,0 +1,32 @@
+"""메모리 예산 유틸리티"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class ByteBudget:
+    """동시에 메모리에 보유할 수 있는 바이트 수 제한
+
+    예산이 부족하면 다른 작업이 반환할 때까지 대기합니다 (backpressure).
+    한도보다 큰 단일 항목은 한도만큼 예약하여 단독으로 처리합니다.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def reserve(self, size: int) -> AsyncIterator[None]:
+        """size 바이트를 예약하고 블록 종료 시 반환"""
+        size = min(max(size, 0), self.limit)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_use + size <= self.limit)
+            self.in_use += size
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_use -= size
+                self._condition.notify_all()
@@ -0,0 +1,30 @@
+"""AWS 오류 분류 유틸리티"""
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+TRANSIENT_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "SlowDown",
+    "ServiceUnavailable",
+    "ServiceUnavailableException",
+    "InternalError",
+    "InternalServerException",
+    "RequestTimeout",
+}
+
+
+def is_transient(error: Exception) -> bool:
+    """재시도하면 성공할 수 있는 오류인지 (throttling, 5xx, 연결/timeout)"""
+    # TaskGroup 등에서 묶인 오류는 모든 원인이 일시적일 때만 재시도
+    if isinstance(error, ExceptionGroup):
+        return all(is_transient(e) for e in error.exceptions)
+    if isinstance(error, ClientError):
+        if error.response.get("Error", {}).get("Code") in TRANSIENT_ERROR_CODES:
+            return True
+        return error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+    return isinstance(error, (BotoConnectionError, HTTPClientError, ConnectionError, TimeoutError))
@@ -0,0 +1,24 @@
+"""토큰 수 추정 유틸리티 (네트워크 호출 없음)"""
+
+import math
+
+# 영문/숫자/기호는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 약 1자당 1토큰
+ASCII_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 대략적인 토큰 수 추정"""
+    if not text:
+        return 0
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN)
+
+
+# UTF-8 한글은 3바이트 = 약 1토큰
+BYTES_PER_TOKEN_UPPER_BOUND = 3
+
+
+def estimate_tokens_from_size(size: int) -> int:
+    """크기(바이트)만 알 때의 토큰 수 추정 (한글 기준 상한, 영문은 실제보다 크게 추정)"""
+    return math.ceil(size / BYTES_PER_TOKEN_UPPER_BOUND)
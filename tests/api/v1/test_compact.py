@@ -0,0 +1,77 @@
+"""Compact API 테스트"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.fixture
+def mock_compact_broker():
+    """compact API에서 사용하는 Kafka 브로커 모킹"""
+    with patch("src.api.v1.compact.broker") as mock:
+        mock.publish = AsyncMock()
+        yield mock
+
+
+@pytest.fixture
+async def compact_client(client: AsyncClient):
+    """CompactService 모킹 적용 클라이언트"""
+    from src.main import app
+
+    mock_compact_service = MagicMock()
+    mock_compact_service.estimate = AsyncMock(return_value={"documents": 3, "max_tokens": 1200})
+    app.container.compact_service.override(mock_compact_service)
+    yield client
+    app.container.compact_service.reset_override()
+
+
+class TestPublishCompact:
+    """compact 이벤트 발행"""
+
+    async def test_publish_compact(self, client: AsyncClient, mock_compact_broker):
+        """POST /compact - dry_run 이벤트 발행"""
+        response = await client.post("/api/v1/compact", params={"dry_run": True})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["event"]["dry_run"] is True
+        assert data["event"]["profile"] is False
+        mock_compact_broker.publish.assert_called_once()
+
+    async def test_publish_profiled_compact(self, client: AsyncClient, mock_compact_broker):
+        """POST /compact?profile_run=true - 프로파일링 요청 이벤트 발행"""
+        response = await client.post("/api/v1/compact", params={"profile_run": True})
+
+        assert response.status_code == 200
+        assert mock_compact_broker.publish.call_args[0][0].profile is True
+
+    async def test_publish_apply(self, client: AsyncClient, mock_compact_broker):
+        """POST /compact/apply - plan 적용 이벤트 발행"""
+        response = await client.post("/api/v1/compact/apply", params={"plan_id": "plan-123"})
+
+        assert response.status_code == 200
+        event = mock_compact_broker.publish.call_args[0][0]
+        assert event.plan_id == "plan-123"
+        assert event.dry_run is False
+
+    async def test_apply_requires_plan_id(self, client: AsyncClient, mock_compact_broker):
+        """plan_id 없이 요청"""
+        response = await client.post("/api/v1/compact/apply")
+
+        assert response.status_code == 422
+        mock_compact_broker.publish.assert_not_called()
+
+
+class TestEstimateCompact:
+    """compact 비용 추정"""
+
+    async def test_estimate(self, compact_client: AsyncClient):
+        """GET /compact/estimate"""
+        response = await compact_client.get("/api/v1/compact/estimate")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["estimate"]["max_tokens"] == 1200
@@ -0,0 +1,37 @@
+"""동기화 상태 API 테스트"""
+
+from httpx import AsyncClient
+
+
+class TestSyncStatus:
+    """동기화 작업 조회"""
+
+    async def test_list_started_jobs(self, client: AsyncClient, mock_bedrock_kb_service):
+        """GET /sync - 업로드로 시작된 작업 목록"""
+        from src.main import app
+
+        await app.container.sync_tracker().start_sync()
+
+        response = await client.get("/api/v1/sync")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert [job["ingestion_job_id"] for job in data["jobs"]] == ["test-job-id"]
+
+    async def test_get_job(self, client: AsyncClient, mock_bedrock_kb_service):
+        """GET /sync/{job_id} - 추적 중이 아닌 작업은 한 번 조회 후 캐시"""
+        response = await client.get("/api/v1/sync/test-job-id")
+
+        data = response.json()
+        assert data["success"] is True
+        assert data["job"]["status"] == "COMPLETE"
+        mock_bedrock_kb_service.get_sync_status.assert_awaited_once_with("test-job-id")
+
+    async def test_get_unknown_job(self, client: AsyncClient, mock_bedrock_kb_service):
+        """GET /sync/{job_id} - 없는 작업"""
+        mock_bedrock_kb_service.get_sync_status.return_value = {"success": False, "error": "not found"}
+
+        response = await client.get("/api/v1/sync/missing")
+
+        assert response.json()["success"] is False
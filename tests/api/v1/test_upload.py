@@ -9,6 +9,24 @@ from httpx import AsyncClient
 class TestUploadSuccess:
     """파일 업로드 성공 케이스"""
 
+    async def test_upload_returns_agent_usage(self, client: AsyncClient, mock_agent_service):
+        """메타데이터 생성에 사용한 Agent 토큰/비용 반환"""
+        from src.schema.v1.usage import UsageTotals
+        from src.services.usage import record_usage
+
+        async def analyze_file(file_content, filename):
+            record_usage("analyze_file", UsageTotals(calls=1, input_tokens=800, output_tokens=60, cost_usd=0.004))
+            return {"summary": "요약", "categories": [], "tags": []}
+
+        mock_agent_service.analyze_file.side_effect = analyze_file
+        files = {"file": ("test.md", io.BytesIO(b"# Test"), "text/markdown")}
+
+        response = await client.post("/api/v1/upload", files=files)
+
+        usage = response.json()["usage"]
+        assert usage["input_tokens"] == 800
+        assert usage["operations"]["analyze_file"]["cost_usd"] == 0.004
+
     async def test_upload_md_file(
         self,
         client: AsyncClient,
@@ -211,3 +229,91 @@ class TestUploadBehavior:
         assert "my-document" in call_args.kwargs["directory"]
         assert "test-uuid-1234" in call_args.kwargs["directory"]
         assert call_args.kwargs["filename"] == "my-document.md"
+
+    async def test_publishes_upload_event(
+        self,
+        client: AsyncClient,
+        mock_agent_service,
+        mock_s3_service,
+        mock_bedrock_kb_service,
+    ):
+        """업로드 성공 시 업로드 이벤트 발행"""
+        file_content = b"test content"
+        files = {"file": ("test.md", io.BytesIO(file_content), "text/markdown")}
+
+        with patch("src.api.v1.upload.broker") as mock_broker:
+            mock_broker.publish = AsyncMock()
+            response = await client.post("/api/v1/upload", files=files)
+
+        assert response.status_code == 200
+        event = mock_broker.publish.call_args[0][0]
+        assert event.key == "knowledge-base/test/uuid/test.md"
+        assert event.size == len(file_content)
+
+    async def test_upload_event_failure_ignored(
+        self,
+        client: AsyncClient,
+        mock_agent_service,
+        mock_s3_service,
+        mock_bedrock_kb_service,
+    ):
+        """업로드 이벤트 발행 실패해도 업로드는 성공"""
+        files = {"file": ("test.md", io.BytesIO(b"test"), "text/markdown")}
+
+        with patch("src.api.v1.upload.broker") as mock_broker:
+            mock_broker.publish = AsyncMock(side_effect=Exception("Kafka unavailable"))
+            response = await client.post("/api/v1/upload", files=files)
+
+        assert response.status_code == 200
+        assert response.json()["success"] is True
+
+
+class TestBatchUpload:
+    """여러 파일 업로드 테스트"""
+
+    async def test_batch_upload_publishes_events_once(
+        self,
+        client: AsyncClient,
+        mock_agent_service,
+        mock_s3_service,
+        mock_bedrock_kb_service,
+    ):
+        """업로드 이벤트를 일괄 발행하고 KB 동기화는 한 번만"""
+        files = [
+            ("files", ("a.md", io.BytesIO(b"aaa"), "text/markdown")),
+            ("files", ("b.txt", io.BytesIO(b"bbbbb"), "text/plain")),
+        ]
+
+        with patch("src.api.v1.upload.publish_batch", new=AsyncMock()) as mock_publish_batch:
+            response = await client.post("/api/v1/upload/batch", files=files)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["uploaded"] == 2
+        assert mock_agent_service.analyze_file.call_count == 2
+        mock_bedrock_kb_service.start_sync.assert_called_once()
+
+        events = mock_publish_batch.call_args[0][0]
+        assert sorted(event.size for event in events) == [3, 5]
+
+    async def test_batch_upload_partial_failure(
+        self,
+        client: AsyncClient,
+        mock_agent_service,
+        mock_s3_service,
+        mock_bedrock_kb_service,
+    ):
+        """지원하지 않는 파일은 실패로 집계하고 나머지는 업로드"""
+        files = [
+            ("files", ("a.md", io.BytesIO(b"aaa"), "text/markdown")),
+            ("files", ("run.exe", io.BytesIO(b"bin"), "application/octet-stream")),
+        ]
+
+        response = await client.post("/api/v1/upload/batch", files=files)
+
+        data = response.json()
+        assert data["success"] is False
+        assert data["uploaded"] == 1
+        assert data["failed"] == 1
+        assert data["results"][1]["success"] is False
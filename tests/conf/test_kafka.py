@@ -0,0 +1,181 @@
+"""Kafka 설정 테스트"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pydantic import ValidationError
+
+from src.conf.kafka import MSKTokenProvider, _get_producer_kwargs, ensure_topics, publish_batch
+from src.conf.settings import AppSettings
+
+
+def _admin(existing: list[str], partitions: dict[str, int] | None = None) -> MagicMock:
+    admin = MagicMock()
+    admin.start = AsyncMock()
+    admin.close = AsyncMock()
+    admin.list_topics = AsyncMock(return_value=existing)
+    admin.create_topics = AsyncMock()
+    admin.create_partitions = AsyncMock()
+    admin.describe_topics = AsyncMock(
+        return_value=[
+            {"topic": topic, "partitions": [{} for _ in range(count)]} for topic, count in (partitions or {}).items()
+        ]
+    )
+    return admin
+
+
+class TestKafkaTopicSpec:
+    """토픽별 파티션/복제 수 설정 테스트"""
+
+    def test_defaults_and_overrides(self):
+        settings = AppSettings(
+            kafka_default_partitions=2,
+            kafka_default_replication_factor=3,
+            kafka_topic_partitions={"merge": 12},
+        )
+
+        assert settings.kafka_topic_spec("merge") == (12, 3)
+        assert settings.kafka_topic_spec("compact") == (2, 3)
+
+
+class TestProducerSettings:
+    """producer 설정 테스트"""
+
+    def test_idempotence_requires_acks_all(self):
+        with pytest.raises(ValidationError):
+            AppSettings(kafka_producer_acks="1", kafka_producer_enable_idempotence=True)
+
+    @patch("src.conf.kafka.settings")
+    def test_producer_kwargs(self, mock_settings):
+        mock_settings.kafka_producer_acks = "1"
+        mock_settings.kafka_producer_enable_idempotence = False
+        mock_settings.kafka_producer_linger_ms = 10
+        mock_settings.kafka_producer_max_batch_size = 131072
+        mock_settings.kafka_producer_compression_type = "gzip"
+
+        assert _get_producer_kwargs() == {
+            "acks": 1,
+            "enable_idempotence": False,
+            "linger_ms": 10,
+            "max_batch_size": 131072,
+            "compression_type": "gzip",
+        }
+
+    @patch("src.conf.kafka.settings")
+    def test_unavailable_codec_falls_back(self, mock_settings):
+        mock_settings.kafka_producer_acks = "all"
+        mock_settings.kafka_producer_compression_type = "zstd"
+
+        with patch("aiokafka.codec.has_zstd", return_value=False):
+            assert _get_producer_kwargs()["compression_type"] is None
+
+    @patch("src.conf.kafka.broker")
+    async def test_publish_batch_with_keys(self, mock_broker):
+        from src.schema.v1.upload_event import DocumentUploadedEvent
+
+        mock_broker.publish = AsyncMock()
+        events = [DocumentUploadedEvent(key=f"k{i}", size=i) for i in range(3)]
+
+        await publish_batch(events, topic="t", keys=["a", "b", "c"])
+
+        assert mock_broker.publish.call_count == 3
+        assert [c.kwargs["key"] for c in mock_broker.publish.call_args_list] == [b"a", b"b", b"c"]
+
+
+class TestEnsureTopics:
+    """ensure_topics 테스트"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        with patch.dict("src.conf.kafka._ensured_partitions", clear=True):
+            yield
+
+    @patch("src.conf.kafka.settings")
+    async def test_creates_missing_topics_with_spec(self, mock_settings):
+        mock_settings.kafka_use_iam = False
+        mock_settings.kafka_topic_spec.side_effect = lambda topic: (6, 2) if topic == "merge" else (1, 2)
+        admin = _admin(existing=[])
+
+        with patch("aiokafka.admin.AIOKafkaAdminClient", return_value=admin):
+            await ensure_topics(["compact", "merge"])
+
+        created = {t.name: (t.num_partitions, t.replication_factor) for t in admin.create_topics.call_args[0][0]}
+        assert created == {"compact": (1, 2), "merge": (6, 2)}
+        admin.create_partitions.assert_not_called()
+        admin.close.assert_awaited_once()
+
+    @patch("src.conf.kafka.settings")
+    async def test_increases_partitions_of_existing_topics(self, mock_settings):
+        mock_settings.kafka_use_iam = False
+        mock_settings.kafka_topic_spec.side_effect = lambda topic: (6, 1) if topic == "merge" else (1, 1)
+        admin = _admin(existing=["compact", "merge"], partitions={"compact": 3, "merge": 2})
+
+        with patch("aiokafka.admin.AIOKafkaAdminClient", return_value=admin):
+            await ensure_topics(["compact", "merge"])
+
+        admin.create_topics.assert_not_called()
+        increases = admin.create_partitions.call_args[0][0]
+        assert list(increases) == ["merge"]
+        assert increases["merge"].total_count == 6
+
+    @patch("src.conf.kafka.settings")
+    async def test_skips_already_ensured_topics(self, mock_settings):
+        """확인한 토픽은 다시 연결하지 않고, 설정된 파티션 수가 늘어난 토픽만 다시 확인"""
+        mock_settings.kafka_use_iam = False
+        mock_settings.kafka_topic_spec.return_value = (2, 1)
+        admin = _admin(existing=["compact"], partitions={"compact": 2})
+
+        with patch("aiokafka.admin.AIOKafkaAdminClient", return_value=admin) as admin_client:
+            await ensure_topics(["compact", "merge"])
+            await ensure_topics(["compact", "merge"])
+            assert admin_client.call_count == 1
+
+            mock_settings.kafka_topic_spec.side_effect = lambda topic: (4, 1) if topic == "merge" else (2, 1)
+            admin.list_topics.return_value = ["compact", "merge"]
+            admin.describe_topics.return_value = [{"topic": "merge", "partitions": [{}, {}]}]
+            await ensure_topics(["compact", "merge"])
+
+        assert admin_client.call_count == 2
+        assert admin.describe_topics.call_args[0][0] == ["merge"]
+
+
+class TestMSKTokenProvider:
+    """MSK IAM 토큰 캐시 테스트"""
+
+    @staticmethod
+    def _provider(lifetime: float) -> tuple[MSKTokenProvider, MagicMock]:
+        provider = MSKTokenProvider("ap-northeast-2", refresh_ahead_seconds=300, expiry_margin_seconds=30)
+        tokens = iter(f"token-{i}" for i in range(100))
+        generate = MagicMock(side_effect=lambda: (next(tokens), time.time() + lifetime))
+        provider._generate = generate
+        return provider, generate
+
+    async def test_cached_until_refresh_window(self):
+        """유효한 토큰은 다시 서명하지 않음"""
+        provider, generate = self._provider(lifetime=900)
+
+        assert await provider.token() == "token-0"
+        assert await provider.token() == "token-0"
+        assert generate.call_count == 1
+
+    async def test_refreshes_in_background_near_expiry(self):
+        """만료가 가까우면 기존 토큰을 반환하고 백그라운드에서 갱신"""
+        provider, generate = self._provider(lifetime=120)
+
+        assert await provider.token() == "token-0"
+        assert await provider.token() == "token-0"
+        await provider._refresh_task
+
+        assert generate.call_count == 2
+        assert provider._token == "token-1"
+
+    async def test_concurrent_requests_share_one_signing(self):
+        """토큰이 없을 때 동시 요청은 서명 한 번만 기다림"""
+        provider, generate = self._provider(lifetime=900)
+
+        tokens = await asyncio.gather(*(provider.token() for _ in range(5)))
+
+        assert set(tokens) == {"token-0"}
+        assert generate.call_count == 1
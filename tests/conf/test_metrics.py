@@ -0,0 +1,97 @@
+"""메트릭 수집 테스트"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import boto3
+import pytest
+from moto import mock_aws
+from prometheus_client import REGISTRY
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestBoto3Instrumentation:
+    """boto3 호출 지연/바이트 기록"""
+
+    @pytest.fixture
+    def s3_service(self):
+        from src.external_service.s3 import S3Service
+
+        with mock_aws():
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+            yield S3Service(bucket="test-bucket", region="us-east-1")
+
+    async def test_s3_latency_and_bytes(self, s3_service):
+        """S3 요청을 operation별로 측정하고 읽고 쓴 바이트 누적"""
+        puts = _sample("kb_s3_request_seconds_count", operation="PutObject")
+        written = _sample("kb_s3_bytes_total", direction="write")
+        read = _sample("kb_s3_bytes_total", direction="read")
+
+        await s3_service.upload_file(b"hello", "kb", "a.md")
+        s3_service.get_document("kb/a.md")
+
+        assert _sample("kb_s3_request_seconds_count", operation="PutObject") == puts + 1
+        assert _sample("kb_s3_bytes_total", direction="write") == written + 5
+        assert _sample("kb_s3_bytes_total", direction="read") == read + 5
+
+    async def test_s3_error_counted(self, s3_service):
+        """실패 응답은 오류 수에도 기록"""
+        errors = _sample("kb_s3_request_errors_total", operation="GetObject")
+
+        with pytest.raises(Exception):
+            s3_service.get_document("kb/missing.md")
+
+        assert _sample("kb_s3_request_errors_total", operation="GetObject") == errors + 1
+
+
+class TestAgentMetrics:
+    """Agent 호출 대기/소요 시간"""
+
+    async def test_concurrency_limit_records_queue_wait(self):
+        """동시 호출 제한을 넘는 호출은 대기하며 대기 시간 기록"""
+        from src.external_service.agent import AgentService
+
+        service = AgentService(max_concurrency=1)
+        running = 0
+        peak = 0
+
+        async def query(prompt, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return
+            yield
+
+        service.query = query
+        calls = _sample("kb_agent_call_seconds_count", operation="analyze_file")
+        waits = _sample("kb_agent_queue_seconds_count", operation="analyze_file")
+
+        await asyncio.gather(*(service.query_text("p", operation="analyze_file") for _ in range(3)))
+
+        assert peak == 1
+        assert _sample("kb_agent_call_seconds_count", operation="analyze_file") == calls + 3
+        assert _sample("kb_agent_queue_seconds_count", operation="analyze_file") == waits + 3
+
+
+class TestKafkaMetricsMiddleware:
+    """Kafka 핸들러 처리 시간/lag"""
+
+    async def test_records_handler_duration_and_lag(self):
+        from src.conf.kafka import KafkaMetricsMiddleware
+
+        msg = SimpleNamespace(raw_message=SimpleNamespace(topic="t-metrics", timestamp=1))
+        middleware = KafkaMetricsMiddleware(msg, context=None)
+
+        await middleware.consume_scope(AsyncMock(return_value="done"), msg)
+        with pytest.raises(RuntimeError):
+            await middleware.consume_scope(AsyncMock(side_effect=RuntimeError("boom")), msg)
+
+        assert _sample("kb_kafka_handler_seconds_count", topic="t-metrics", outcome="ok") == 1
+        assert _sample("kb_kafka_handler_seconds_count", topic="t-metrics", outcome="error") == 1
+        assert _sample("kb_kafka_consumer_lag_seconds_count", topic="t-metrics") == 2
@@ -0,0 +1,80 @@
+"""Tracing 테스트"""
+
+import json
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tracer_provider():
+    """전역 TracerProvider는 한 번만 등록 가능하므로 모듈 단위로 등록"""
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(_exporter))
+    trace.set_tracer_provider(provider)
+    yield provider
+
+
+@pytest.fixture
+def spans():
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+class TestTracing:
+    """span 생성 테스트"""
+
+    async def test_boto3_calls_traced(self, spans):
+        """S3 API 호출마다 client span 기록"""
+        from src.external_service.s3 import S3Service
+
+        with mock_aws():
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+            service = S3Service(bucket="test-bucket", region="us-east-1")
+            await service.upload_file(b"hello", "kb", "a.md")
+            with pytest.raises(Exception):
+                service.get_document("kb/missing.md")
+
+        finished = {span.name: span for span in spans.get_finished_spans()}
+        assert finished["s3.PutObject"].kind == trace.SpanKind.CLIENT
+        assert finished["s3.GetObject"].status.status_code == trace.StatusCode.ERROR
+
+    async def test_compact_stage_spans(self, spans):
+        """compact 단계마다 span 기록"""
+        from src.services.run_stats import RunStats
+
+        run_stats = RunStats(run_id="run-1")
+        async with run_stats.stage("load"):
+            pass
+
+        (span,) = spans.get_finished_spans()
+        assert span.name == "compact.load"
+        assert span.attributes["compact.run_id"] == "run-1"
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        """file exporter는 span당 JSON 한 줄 기록"""
+        from src.conf.tracing import _span_exporter
+
+        path = tmp_path / "traces.jsonl"
+        with patch("src.conf.tracing.settings") as mock_settings:
+            mock_settings.otel_traces_exporter = "file"
+            mock_settings.otel_traces_file = str(path)
+            exporter = _span_exporter()
+
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        with provider.get_tracer("test").start_as_current_span("hello"):
+            pass
+        provider.shutdown()
+
+        lines = path.read_text().splitlines()
+        assert json.loads(lines[0])["name"] == "hello"
@@ -29,6 +29,7 @@ def mock_settings():
         mock.kafka_bootstrap_servers = "localhost:9092"
         mock.kafka_use_iam = False
         mock.kafka_topic_compact = "knowledge-base.compact"
+        mock.kafka_topic_uploaded = "knowledge-base.uploaded"
         mock.kafka_consumer_group = "quanda-kb-pipeline-test"
         yield mock
 
@@ -184,24 +185,34 @@ def mock_broker():
 @pytest.fixture
 async def client(mock_agent_service, mock_s3_service, mock_bedrock_kb_service):
     """테스트 클라이언트 (서비스 모킹 적용)"""
-    with patch("src.main.broker") as mock_broker:
+    with (
+        patch("src.main.broker") as mock_broker,
+        patch("src.api.v1.upload.broker") as mock_upload_broker,
+        patch("src.api.v1.upload.publish_batch", new=AsyncMock()),
+    ):
         mock_broker.start = AsyncMock()
         mock_broker.stop = AsyncMock()
+        mock_upload_broker.publish = AsyncMock()
 
         from src.main import app
+        from src.services.sync_tracker import SyncTracker
 
         # 컨테이너 서비스 오버라이드
+        sync_tracker = SyncTracker(mock_bedrock_kb_service)
         app.container.agent_service.override(mock_agent_service)
         app.container.s3_service.override(mock_s3_service)
         app.container.bedrock_kb_service.override(mock_bedrock_kb_service)
+        app.container.sync_tracker.override(sync_tracker)
 
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
             yield ac
 
         # 오버라이드 해제
+        await sync_tracker.stop()
         app.container.agent_service.reset_override()
         app.container.s3_service.reset_override()
         app.container.bedrock_kb_service.reset_override()
+        app.container.sync_tracker.reset_override()
 
 
 @pytest.fixture
@@ -1,11 +1,18 @@
 """CompactService 및 이벤트 핸들러 테스트"""
 
+import asyncio
 import json
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from botocore.exceptions import ClientError
 
+from src.schema.v1.merge_task import MergeTaskResult
 from src.services.compact import CompactService
+from src.services.merge_collector import MergeResultCollector
+from src.services.verdict import SEPARATE, VerdictStore
+from src.utils.byte_budget import ByteBudget
 
 
 @pytest.fixture
@@ -16,7 +23,15 @@ def mock_compact_services():
     mock_s3.list_documents = MagicMock(return_value=[])
     mock_s3.get_document = MagicMock(return_value=b"test content")
     mock_s3.delete_objects = MagicMock(return_value={"success": True, "deleted": [], "errors": []})
-    mock_s3.upload_file_with_metadata = AsyncMock(return_value={"success": True, "file": {}, "metadata": {}})
+    mock_s3.upload_file_with_metadata = AsyncMock(
+        return_value={"success": True, "file": {"key": "compacted-knowledge-base/merged.md"}, "metadata": {}}
+    )
+    mock_s3.upload_file = AsyncMock(
+        side_effect=lambda file_content, directory, filename, content_type=None: {
+            "success": True,
+            "key": f"{directory}/{filename}",
+        }
+    )
 
     # Bedrock 서비스 모킹
     mock_bedrock = MagicMock()
@@ -167,6 +182,84 @@ class TestCompactServiceMerge:
         # KB 동기화 호출 확인
         mock_compact_services["bedrock"].start_sync.assert_called_once()
 
+        # 실행 통계 확인
+        stats = result["stats"]
+        assert result["run_id"]
+        assert stats["documents_loaded"] == 2
+        assert stats["groups_found"] == 1
+        assert stats["merges_done"] == 1
+        assert stats["deleted"] == 2
+        assert {"load", "select", "analyze", "merge", "sync"} <= set(stats["stage_seconds"])
+
+    @patch("src.services.compact.settings")
+    async def test_merged_key_equal_to_source_not_deleted(self, mock_settings, compact_service, mock_compact_services):
+        """병합 문서가 원본(기존 compact 문서)과 같은 키에 쓰이면 그 키는 삭제하지 않음"""
+        mock_settings.s3_base_prefix = "knowledge-base"
+        mock_settings.s3_compact_prefix = "compacted-knowledge-base"
+        existing = "compacted-knowledge-base/test-category/merged.md"
+        new = "knowledge-base/doc1/uuid1/new.md"
+        mock_compact_services["s3"].list_documents.side_effect = lambda prefix: [
+            {"key": new if prefix == "knowledge-base" else existing, "size": 10, "last_modified": "2024-01-01"}
+        ]
+        mock_compact_services["s3"].get_document.side_effect = lambda key: (
+            json.dumps({"metadataAttributes": {"tags": "kafka", "compaction_level": 1}}).encode()
+            if key.endswith(".metadata.json")
+            else key.encode()
+        )
+        mock_compact_services["s3"].upload_file_with_metadata.return_value = {
+            "success": True,
+            "file": {"key": existing},
+        }
+        mock_compact_services["s3"].delete_objects.side_effect = lambda keys: {
+            "success": True,
+            "deleted": keys,
+            "errors": [],
+        }
+        mock_compact_services["agent"].find_similar_documents.return_value = {"delete": [], "groups": [[new, existing]]}
+
+        result = await compact_service.run()
+
+        assert result["merged"] == 1
+        mock_compact_services["s3"].delete_objects.assert_called_once_with([new, f"{new}.metadata.json"])
+        assert existing not in result["deleted_keys"]
+
+
+class TestCompactServiceDocumentSync:
+    """변경 문서 단위 KB 동기화 테스트"""
+
+    @patch("src.services.compact.settings")
+    async def test_syncs_written_and_deleted_documents(self, mock_settings, mock_compact_services):
+        """병합으로 쓰고 지운 문서만 추적기에 전달 (메타데이터 파일 제외)"""
+        mock_settings.s3_compact_prefix = "compacted-knowledge-base"
+        sync_tracker = MagicMock()
+        sync_tracker.sync_documents = AsyncMock(return_value={"success": True, "mode": "documents"})
+        service = CompactService(
+            s3_service=mock_compact_services["s3"],
+            bedrock_kb_service=mock_compact_services["bedrock"],
+            agent_service=mock_compact_services["agent"],
+            sync_tracker=sync_tracker,
+        )
+        mock_compact_services["s3"].list_documents.return_value = [
+            {"key": "kb/doc1.md", "size": 100, "last_modified": "2024-01-01"},
+            {"key": "kb/doc2.md", "size": 100, "last_modified": "2024-01-01"},
+        ]
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["kb/doc1.md", "kb/doc2.md"]],
+        }
+        mock_compact_services["s3"].delete_objects.return_value = {
+            "success": True,
+            "deleted": ["kb/doc1.md", "kb/doc1.md.metadata.json", "kb/doc2.md", "kb/doc2.md.metadata.json"],
+            "errors": [],
+        }
+
+        await service.run()
+
+        sync_tracker.sync_documents.assert_awaited_once_with(
+            ["compacted-knowledge-base/merged.md"], ["kb/doc1.md", "kb/doc2.md"]
+        )
+        mock_compact_services["bedrock"].start_sync.assert_not_called()
+
 
 class TestCompactServiceMultipleGroups:
     """여러 그룹 테스트"""
@@ -231,7 +324,7 @@ class TestCompactServiceError:
         # 첫 번째 업로드 실패, 두 번째 성공
         mock_compact_services["s3"].upload_file_with_metadata.side_effect = [
             {"success": False, "error": "Upload failed"},
-            {"success": True, "file": {}, "metadata": {}},
+            {"success": True, "file": {"key": "compacted-knowledge-base/merged.md"}, "metadata": {}},
         ]
 
         mock_compact_services["s3"].delete_objects.return_value = {
@@ -246,10 +339,801 @@ class TestCompactServiceError:
         assert result["merged"] == 1
 
 
-class TestLoadDocuments:
-    """_load_documents 메서드 테스트"""
+class TestCompactServicePlan:
+    """dry run plan 생성 및 적용 테스트"""
+
+    @pytest.fixture
+    def plan_documents(self, mock_compact_services):
+        mock_compact_services["s3"].list_documents.return_value = [
+            {"key": "kb/doc1.md", "size": 100, "last_modified": "2024-01-01", "etag": "etag-1"},
+            {"key": "kb/doc2.md", "size": 100, "last_modified": "2024-01-01", "etag": "etag-2"},
+            {"key": "kb/doc3.md", "size": 100, "last_modified": "2024-01-01", "etag": "etag-3"},
+        ]
+        mock_compact_services["s3"].get_document.return_value = b"content"
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": ["kb/doc3.md"],
+            "groups": [["kb/doc1.md", "kb/doc2.md"]],
+        }
+
+    @staticmethod
+    def _saved_plan(mock_s3) -> dict:
+        for call in mock_s3.upload_file.call_args_list:
+            if call.kwargs["filename"] == "plan.json":
+                return json.loads(call.kwargs["file_content"])
+        raise AssertionError("plan.json not saved")
+
+    @patch("src.services.compact.settings")
+    async def test_dry_run_saves_plan(self, mock_settings, compact_service, mock_compact_services, plan_documents):
+        """dry run은 병합 결과와 plan을 저장하고 원본은 건드리지 않음"""
+        mock_settings.s3_base_prefix = "kb"
+        mock_settings.s3_compact_prefix = "compacted"
+        mock_settings.s3_plan_prefix = "plans"
+
+        result = await compact_service.run(dry_run=True)
+
+        assert result["status"] == "dry_run"
+        assert result["merged"] == 1
+        assert result["plan_id"]
+
+        mock_s3 = mock_compact_services["s3"]
+        mock_s3.delete_objects.assert_not_called()
+        mock_s3.upload_file_with_metadata.assert_not_called()
+        mock_compact_services["bedrock"].start_sync.assert_not_called()
+
+        plan = self._saved_plan(mock_s3)
+        assert plan["plan_id"] == result["plan_id"]
+        assert plan["deletes"] == [{"key": "kb/doc3.md", "etag": "etag-3"}]
+        assert plan["groups"][0]["sources"] == [
+            {"key": "kb/doc1.md", "etag": "etag-1"},
+            {"key": "kb/doc2.md", "etag": "etag-2"},
+        ]
+        assert plan["groups"][0]["content_key"] == f"plans/{result['plan_id']}/merged/0.md"
+
+    @patch("src.services.compact.settings")
+    async def test_apply_plan_without_agent(
+        self, mock_settings, compact_service, mock_compact_services, plan_documents
+    ):
+        """plan 적용 시 Agent 호출 없이 업로드/삭제/동기화"""
+        mock_settings.s3_base_prefix = "kb"
+        mock_settings.s3_compact_prefix = "compacted"
+        mock_settings.s3_plan_prefix = "plans"
+
+        dry_run = await compact_service.run(dry_run=True)
+        mock_s3 = mock_compact_services["s3"]
+        plan_json = json.dumps(self._saved_plan(mock_s3)).encode()
+        # boto3 호출이 이벤트 루프 스레드에서 실행되지 않는지 기록
+        loop_thread = threading.get_ident()
+        threads = []
+        documents = mock_s3.list_documents.return_value
+
+        def in_thread(value):
+            threads.append(threading.get_ident())
+            return value
+
+        mock_s3.list_documents.side_effect = lambda prefix: in_thread(documents)
+        mock_s3.get_document.side_effect = lambda key: in_thread(plan_json if key.endswith("plan.json") else b"merged")
+        mock_s3.delete_objects.side_effect = lambda keys: in_thread({"success": True, "deleted": keys, "errors": []})
+        mock_compact_services["agent"].reset_mock()
+
+        result = await compact_service.apply(dry_run["plan_id"])
+
+        assert threads and loop_thread not in threads
+        assert result["status"] == "completed"
+        assert result["merged"] == 1
+        assert "kb/doc3.md" in result["deleted_keys"]
+        assert "kb/doc1.md.metadata.json" in result["deleted_keys"]
+        mock_compact_services["agent"].find_similar_documents.assert_not_called()
+        mock_compact_services["agent"].merge_documents.assert_not_called()
+        upload_kwargs = mock_s3.upload_file_with_metadata.call_args.kwargs
+        assert upload_kwargs["file_content"] == b"merged"
+        assert upload_kwargs["directory"] == "compacted/test-category"
+        mock_compact_services["bedrock"].start_sync.assert_called_once()
+
+    @patch("src.services.compact.settings")
+    async def test_apply_rejects_changed_documents(
+        self, mock_settings, compact_service, mock_compact_services, plan_documents
+    ):
+        """원본 ETag가 바뀌면 적용 거부"""
+        mock_settings.s3_base_prefix = "kb"
+        mock_settings.s3_compact_prefix = "compacted"
+        mock_settings.s3_plan_prefix = "plans"
+
+        dry_run = await compact_service.run(dry_run=True)
+        mock_s3 = mock_compact_services["s3"]
+        plan_json = json.dumps(self._saved_plan(mock_s3)).encode()
+        mock_s3.get_document.side_effect = lambda key: plan_json
+        mock_s3.list_documents.return_value = [
+            {"key": "kb/doc1.md", "size": 100, "last_modified": "2024-01-02", "etag": "etag-1-changed"},
+            {"key": "kb/doc2.md", "size": 100, "last_modified": "2024-01-01", "etag": "etag-2"},
+            {"key": "kb/doc3.md", "size": 100, "last_modified": "2024-01-01", "etag": "etag-3"},
+        ]
+
+        result = await compact_service.apply(dry_run["plan_id"])
+
+        assert result["status"] == "rejected"
+        assert "kb/doc1.md" in result["error"]
+        mock_s3.delete_objects.assert_not_called()
+        mock_s3.upload_file_with_metadata.assert_not_called()
+
+    @patch("src.services.compact.settings")
+    async def test_apply_missing_plan(self, mock_settings, compact_service, mock_compact_services):
+        """plan이 없으면 거부"""
+        mock_settings.s3_plan_prefix = "plans"
+        mock_compact_services["s3"].get_document.side_effect = Exception("NoSuchKey")
+
+        result = await compact_service.apply("unknown")
+
+        assert result["status"] == "rejected"
+        assert result["merged"] == 0
+
+
+class TestCompactServiceBudget:
+    """비용 추정 및 실행 예산 테스트"""
+
+    @pytest.fixture
+    def budget_documents(self, mock_compact_services):
+        # doc1/doc2 (큰 그룹), doc3/doc4 (작은 그룹)
+        mock_compact_services["s3"].list_documents.return_value = [
+            {"key": "kb/doc1.md", "size": 4000, "last_modified": "2024-01-01"},
+            {"key": "kb/doc2.md", "size": 4000, "last_modified": "2024-01-01"},
+            {"key": "kb/doc3.md", "size": 100, "last_modified": "2024-01-01"},
+            {"key": "kb/doc4.md", "size": 100, "last_modified": "2024-01-01"},
+        ]
+        mock_compact_services["s3"].get_document.return_value = b"content " * 50
+        mock_compact_services["s3"].delete_objects.side_effect = lambda keys: {
+            "success": True,
+            "deleted": keys,
+            "errors": [],
+        }
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["kb/doc3.md", "kb/doc4.md"], ["kb/doc1.md", "kb/doc2.md"]],
+        }
+
+    def _service(self, mock_compact_services, **kwargs) -> CompactService:
+        return CompactService(
+            s3_service=mock_compact_services["s3"],
+            bedrock_kb_service=mock_compact_services["bedrock"],
+            agent_service=mock_compact_services["agent"],
+            **kwargs,
+        )
+
+    @patch("src.services.compact.settings")
+    async def test_estimate_without_agent(self, mock_settings, mock_compact_services, budget_documents):
+        """사전 추정은 Agent를 호출하지 않고 문서 원문도 읽지 않음 (색인이 없으면 목록의 크기 사용)"""
+        service = self._service(mock_compact_services, max_groups=1)
+
+        estimate = await service.estimate()
+
+        read_keys = [c.args[0] for c in mock_compact_services["s3"].get_document.call_args_list]
+        assert not [key for key in read_keys if key.startswith("kb/") and not key.endswith(".metadata.json")]
+
+        assert estimate["documents"] == 4  # 두 prefix가 같은 목록을 반환해도 key 기준 중복 제거
+        assert estimate["analysis_tokens"] > 0
+        assert estimate["max_tokens"] > estimate["analysis_tokens"]
+        assert estimate["max_agent_calls"] == 3
+        assert estimate["budget"]["max_groups"] == 1
+        mock_compact_services["agent"].find_similar_documents.assert_not_called()
+        mock_compact_services["agent"].merge_documents.assert_not_called()
+
+    @patch("src.services.compact.settings")
+    async def test_max_groups_prioritizes_largest_group(self, mock_settings, mock_compact_services, budget_documents):
+        """그룹 수 제한 시 줄어드는 용량이 큰 그룹부터 처리"""
+        service = self._service(mock_compact_services, max_groups=1)
+
+        result = await service.run()
+
+        assert result["merged"] == 1
+        assert result["deferred_groups"] == 1
+        merged_keys = [doc["key"] for doc in mock_compact_services["agent"].merge_documents.call_args[0][0]]
+        assert merged_keys == ["kb/doc1.md", "kb/doc2.md"]
+
+    @patch("src.services.compact.settings")
+    async def test_token_budget_defers_analysis(self, mock_settings, mock_compact_services, budget_documents):
+        """토큰 예산 초과 시 남은 문서는 다음 실행으로 미룸"""
+        # 분석 예산(850)에 기본 프롬프트와 문서 4개 중 3개만 들어감
+        service = self._service(mock_compact_services, max_tokens=1700)
+
+        result = await service.run()
+
+        assert result["deferred_documents"] == 1
+        assert result["oversized_documents"] == []
+        analyzed = mock_compact_services["agent"].find_similar_documents.call_args[0][0]
+        assert len(analyzed) == 3
+
+    @patch("src.services.compact.settings")
+    async def test_token_budget_skips_oversized_documents(self, mock_settings, mock_compact_services, budget_documents):
+        """혼자서도 예산을 넘는 문서는 건너뛰고 보고하며 나머지 문서는 계속 분석"""
+        objects = {}
+
+        async def upload_file(file_content, directory, filename, content_type=None):
+            objects[f"{directory}/{filename}"] = file_content
+            return {"success": True}
+
+        mock_compact_services["s3"].upload_file = AsyncMock(side_effect=upload_file)
+        mock_compact_services["s3"].get_document.side_effect = lambda key: objects.get(
+            key, b"content " * 5000 if key == "kb/doc1.md" else b"content " * 50
+        )
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["kb/doc3.md", "kb/doc4.md"]],
+        }
+        service = self._service(mock_compact_services, max_tokens=2000)
+
+        result = await service.run()
+        estimate = await service.estimate()
+
+        assert result["oversized_documents"] == ["kb/doc1.md"]
+        assert result["deferred_documents"] == 0
+        assert result["merged"] == 1
+        analyzed = mock_compact_services["agent"].find_similar_documents.call_args[0][0]
+        assert sorted(doc["key"] for doc in analyzed) == ["kb/doc2.md", "kb/doc3.md", "kb/doc4.md"]
+        # 추정은 실행이 저장한 fingerprint 색인으로 같은 문서를 건너뜀
+        assert estimate["oversized_documents"] == 1
+
+    @patch("src.services.compact.settings")
+    async def test_token_budget_never_fits(self, mock_settings, mock_compact_services, budget_documents):
+        """예산이 기본 프롬프트보다 작으면 모든 문서를 건너뛰고 Agent를 호출하지 않음"""
+        service = self._service(mock_compact_services, max_tokens=1)
+
+        result = await service.run()
+
+        assert len(result["oversized_documents"]) == 4
+        assert result["merged"] == 0
+        mock_compact_services["agent"].find_similar_documents.assert_not_called()
+        mock_compact_services["agent"].merge_documents.assert_not_called()
+
+
+class TestCompactServiceTiers:
+    """LSM 방식 tier 정책 테스트"""
+
+    @pytest.fixture
+    def tier_documents(self, mock_compact_services):
+        """base prefix(level 0) 1개, compact prefix(level 1) 3개"""
+        listings = {
+            "kb": [{"key": "kb/new.md", "size": 100, "last_modified": "2024-01-01"}],
+            "compacted": [
+                {"key": "compacted/a/related.md", "size": 100, "last_modified": "2024-01-01"},
+                {"key": "compacted/b/unrelated.md", "size": 100, "last_modified": "2024-01-01"},
+                {"key": "compacted/c/level2.md", "size": 100, "last_modified": "2024-01-01"},
+            ],
+        }
+        metadata = {
+            "kb/new.md": {"categories": "기술문서", "tags": "kafka,compact"},
+            "compacted/a/related.md": {"categories": "기술문서", "tags": "kafka", "compaction_level": "1"},
+            "compacted/b/unrelated.md": {"categories": "회의록", "tags": "budget", "compaction_level": "1"},
+            "compacted/c/level2.md": {"categories": "기술문서", "tags": "kafka", "compaction_level": "2"},
+        }
+
+        def get_document(key):
+            if key.endswith(".metadata.json"):
+                return json.dumps({"metadataAttributes": metadata[key.removesuffix(".metadata.json")]}).encode()
+            if key.endswith("tiers.json"):
+                raise Exception("NoSuchKey")
+            return b"content"
+
+        mock_compact_services["s3"].list_documents.side_effect = lambda prefix: listings.get(prefix, [])
+        mock_compact_services["s3"].get_document.side_effect = get_document
+        mock_compact_services["s3"].delete_objects.side_effect = lambda keys: {
+            "success": True,
+            "deleted": keys,
+            "errors": [],
+        }
+
+    @staticmethod
+    def _set_prefixes(mock_settings):
+        mock_settings.s3_base_prefix = "kb"
+        mock_settings.s3_compact_prefix = "compacted"
+        mock_settings.s3_state_prefix = "state"
+
+    @patch("src.services.compact.settings")
+    async def test_new_documents_compared_with_related_level1(
+        self, mock_settings, compact_service, mock_compact_services, tier_documents
+    ):
+        """새 문서는 관련 level 1 후보와만 비교, level 2는 제외"""
+        self._set_prefixes(mock_settings)
+
+        await compact_service.run()
+
+        analyzed = mock_compact_services["agent"].find_similar_documents.call_args[0][0]
+        assert [doc["key"] for doc in analyzed] == ["kb/new.md", "compacted/a/related.md"]
+        assert [doc["level"] for doc in analyzed] == [0, 1]
+
+    @patch("src.services.compact.settings")
+    async def test_no_new_documents_skips_analysis(self, mock_settings, compact_service, mock_compact_services):
+        """새 문서가 없으면 compact 문서끼리 다시 분석하지 않음"""
+        self._set_prefixes(mock_settings)
+        mock_compact_services["s3"].list_documents.side_effect = lambda prefix: (
+            [{"key": "compacted/a.md", "size": 100, "last_modified": "2024-01-01"}] if prefix == "compacted" else []
+        )
+
+        result = await compact_service.run()
+
+        assert result["merged"] == 0
+        mock_compact_services["agent"].find_similar_documents.assert_not_called()
+
+    @patch("src.services.compact.settings")
+    async def test_group_without_new_documents_skipped(
+        self, mock_settings, compact_service, mock_compact_services, tier_documents
+    ):
+        """level 0 문서가 없는 그룹은 재검토 주기가 아니면 병합하지 않음"""
+        self._set_prefixes(mock_settings)
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["compacted/a/related.md", "compacted/c/level2.md"], ["kb/new.md"]],
+        }
+
+        result = await compact_service.run()
+
+        assert result["merged"] == 0
+        mock_compact_services["agent"].merge_documents.assert_not_called()
+
+    @patch("src.services.compact.settings")
+    async def test_merged_level_and_run_count(
+        self, mock_settings, compact_service, mock_compact_services, tier_documents
+    ):
+        """level 0을 흡수한 병합 결과는 level 1 유지, 실행 횟수 저장"""
+        self._set_prefixes(mock_settings)
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["kb/new.md", "compacted/a/related.md"]],
+        }
+
+        result = await compact_service.run()
+
+        assert result["merged"] == 1
+        upload_kwargs = mock_compact_services["s3"].upload_file_with_metadata.call_args.kwargs
+        assert upload_kwargs["metadata"]["compaction_level"] == 1
+        state_call = mock_compact_services["s3"].upload_file.call_args.kwargs
+        assert state_call["filename"] == "tiers.json"
+        assert json.loads(state_call["file_content"]) == {"run_count": 1, "watermark": "2024-01-01"}
+
+    def test_reexamine_schedule(self, compact_service):
+        """level L은 tier_reexamine_runs ** L 번째 실행마다 같은 level끼리 재검토"""
+        documents = [
+            {"key": "l1-a", "level": 1, "metadata": {}},
+            {"key": "l1-b", "level": 1, "metadata": {}},
+            {"key": "l2-a", "level": 2, "metadata": {}},
+        ]
+
+        candidates, reexamined = compact_service._select_candidates(documents, run_count=8)
+        assert reexamined == {1}
+        assert [doc["key"] for doc in candidates] == ["l1-a", "l1-b"]
+
+        candidates, reexamined = compact_service._select_candidates(documents, run_count=64)
+        assert reexamined == {1, 2}
+        assert compact_service._output_level(candidates[:2]) == 2
+
+        assert compact_service._select_candidates(documents, run_count=3) == ([], set())
+
+    def test_reexamined_level_pulls_related_next_tier(self, compact_service):
+        """재검토 중인 level L 문서는 카테고리/태그가 겹치는 level L+1 문서와 비교하고, 병합 결과는 L+1 유지"""
+        documents = [
+            {"key": "l1-a", "level": 1, "metadata": {"tags": "kafka"}},
+            {"key": "l2-related", "level": 2, "metadata": {"tags": "kafka"}},
+            {"key": "l2-unrelated", "level": 2, "metadata": {"tags": "budget"}},
+        ]
+
+        candidates, reexamined = compact_service._select_candidates(documents, run_count=8)
+
+        assert reexamined == {1}
+        assert [doc["key"] for doc in candidates] == ["l1-a", "l2-related"]
+        assert compact_service._allowed_group(candidates, reexamined)
+        assert compact_service._output_level(candidates) == 2
+
+    def test_watermark_promotes_analyzed_base_documents(self, compact_service):
+        """watermark 이전에 수정된 base prefix 문서는 level 1로 취급하여 매 실행 다시 분석하지 않음"""
+        documents = [
+            {"key": "kb/old.md", "level": 0, "last_modified": "2024-01-01", "metadata": {"tags": "kafka"}},
+            {"key": "kb/new.md", "level": 0, "last_modified": "2024-01-03", "metadata": {"tags": "kafka"}},
+        ]
+
+        candidates, _ = compact_service._select_candidates(documents, run_count=1, watermark="2024-01-02")
+
+        assert [(doc["key"], doc["level"]) for doc in candidates] == [("kb/new.md", 0), ("kb/old.md", 1)]
+        assert compact_service._select_candidates(documents[:1], run_count=1, watermark="2024-01-02") == ([], set())
+
+    def test_watermark_stops_before_pending_documents(self, compact_service):
+        """미룬 문서가 있으면 그보다 먼저 수정된 문서까지만 watermark를 올림"""
+        level0 = [{"key": f"kb/{day}.md", "last_modified": f"2024-01-0{day}"} for day in (1, 2, 3)]
+
+        assert compact_service._next_watermark(level0, [], None) == "2024-01-03"
+        assert compact_service._next_watermark(level0, [level0[1]], None) == "2024-01-01"
+        assert compact_service._next_watermark(level0, [level0[0]], "2023-12-31") == "2023-12-31"
+
+    @patch("src.services.compact.settings")
+    async def test_analyzed_documents_not_reselected(
+        self, mock_settings, compact_service, mock_compact_services, tier_documents
+    ):
+        """병합되지 않은 base prefix 문서는 다음 실행에서 새 문서로 다시 분석하지 않음"""
+        self._set_prefixes(mock_settings)
+        state = {}
+        get_document = mock_compact_services["s3"].get_document.side_effect
+
+        async def upload_file(file_content, directory, filename, content_type=None):
+            state[f"{directory}/{filename}"] = file_content
+            return {"success": True}
+
+        mock_compact_services["s3"].upload_file = AsyncMock(side_effect=upload_file)
+        mock_compact_services["s3"].get_document.side_effect = lambda key: state.get(key) or get_document(key)
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["kb/new.md"], ["compacted/a/related.md"]],
+        }
+
+        await compact_service.run()
+        await compact_service.run()
+
+        assert mock_compact_services["agent"].find_similar_documents.call_count == 1
+
+
+class TestCompactServiceVerdicts:
+    """판정 캐시 테스트"""
+
+    @pytest.fixture
+    def stored(self, mock_compact_services):
+        """S3 상태 객체를 메모리에 저장하는 모킹"""
+        objects = {}
+        contents = {
+            "kb/a.md": b"alpha",
+            "kb/b.md": b"beta",
+            "kb/c.md": b"gamma",
+        }
+        tags = {"kb/a.md": "kafka", "kb/b.md": "kafka", "kb/c.md": "budget"}
+
+        async def upload_file(file_content, directory, filename, content_type=None):
+            objects[f"{directory}/{filename}"] = file_content
+            return {"success": True, "key": f"{directory}/{filename}"}
+
+        def put_object_conditional(key, body, if_match=None, if_none_match=None, content_type=None):
+            objects[key] = body
+            return {"success": True, "key": key}
+
+        def get_document(key):
+            if key in objects:
+                return objects[key]
+            if key.endswith(".metadata.json"):
+                doc_key = key.removesuffix(".metadata.json")
+                return json.dumps({"metadataAttributes": {"tags": tags[doc_key]}}).encode()
+            if key in contents:
+                return contents[key]
+            raise Exception("NoSuchKey")
+
+        mock_s3 = mock_compact_services["s3"]
+        mock_s3.upload_file = AsyncMock(side_effect=upload_file)
+        mock_s3.put_object_conditional.side_effect = put_object_conditional
+        mock_s3.get_document.side_effect = get_document
+        # 내용이 바뀌면 수정 시각도 바뀌도록 내용 길이로 수정 시각을 만듦
+        mock_s3.list_documents.side_effect = lambda prefix: (
+            [
+                {"key": key, "size": 10, "last_modified": f"2024-01-01T00:00:{len(content):02d}"}
+                for key, content in contents.items()
+            ]
+            if prefix == "kb"
+            else []
+        )
+        mock_compact_services["agent"].find_similar_documents.side_effect = lambda docs: {
+            "delete": [],
+            "groups": [[doc["key"]] for doc in docs],
+        }
+        return contents
+
+    @staticmethod
+    def _set_prefixes(mock_settings):
+        mock_settings.s3_base_prefix = "kb"
+        mock_settings.s3_compact_prefix = "compacted"
+        mock_settings.s3_state_prefix = "state"
+
+    @patch("src.services.compact.settings")
+    async def test_unchanged_documents_not_reanalyzed(
+        self, mock_settings, compact_service, mock_compact_services, stored
+    ):
+        """두 번째 실행에서 내용이 같은 문서는 모델에 보내지 않음"""
+        self._set_prefixes(mock_settings)
+        agent = mock_compact_services["agent"]
+
+        await compact_service.run()
+        assert agent.find_similar_documents.call_count == 1
+
+        await compact_service.run()
+        assert agent.find_similar_documents.call_count == 1
+
+    @patch("src.services.compact.settings")
+    async def test_changed_document_sent_with_related_only(
+        self, mock_settings, compact_service, mock_compact_services, stored
+    ):
+        """바뀐 문서는 태그가 겹치는 기존 문서와만 다시 분석"""
+        self._set_prefixes(mock_settings)
+        agent = mock_compact_services["agent"]
+
+        await compact_service.run()
+        stored["kb/a.md"] = b"alpha v2"
+        await compact_service.run()
+
+        analyzed = [doc["key"] for doc in agent.find_similar_documents.call_args[0][0]]
+        assert analyzed == ["kb/a.md", "kb/b.md"]
+
+    @patch("src.services.compact.settings")
+    async def test_cached_merge_verdict_merges_without_model(
+        self, mock_settings, compact_service, mock_compact_services, stored
+    ):
+        """병합 판정이 캐시된 쌍은 모델 없이 병합 (예: dry run 이후 실제 실행)"""
+        self._set_prefixes(mock_settings)
+        agent = mock_compact_services["agent"]
+        agent.find_similar_documents.side_effect = None
+        agent.find_similar_documents.return_value = {"delete": ["kb/c.md"], "groups": [["kb/a.md", "kb/b.md"]]}
+        mock_compact_services["s3"].delete_objects.side_effect = lambda keys: {
+            "success": True,
+            "deleted": keys,
+            "errors": [],
+        }
+
+        await compact_service.run(dry_run=True)
+        result = await compact_service.run()
+
+        assert agent.find_similar_documents.call_count == 1
+        assert result["merged"] == 1
+        assert "kb/c.md" in result["deleted_keys"]
+        merged_keys = [doc["key"] for doc in agent.merge_documents.call_args[0][0]]
+        assert merged_keys == ["kb/a.md", "kb/b.md"]
+
+    @patch("src.services.compact.settings")
+    async def test_unparsed_response_not_recorded(self, mock_settings, compact_service, mock_compact_services, stored):
+        """응답 파싱 실패로 만든 대체 결과는 판정으로 남기지 않아 다음 실행에서 다시 분석"""
+        self._set_prefixes(mock_settings)
+        agent = mock_compact_services["agent"]
+        agent.find_similar_documents.side_effect = lambda docs: {
+            "delete": [],
+            "groups": [[doc["key"]] for doc in docs],
+            "parsed": False,
+        }
+
+        await compact_service.run()
+        await compact_service.run()
+
+        assert agent.find_similar_documents.call_count == 2
+        mock_compact_services["s3"].put_object_conditional.assert_not_called()
+
+    @patch("src.services.compact.settings")
+    async def test_omitted_keys_not_recorded(self, mock_settings, compact_service, mock_compact_services, stored):
+        """응답에서 빠진 문서는 분리 판정으로 기록하지 않고 다음 실행에서 다시 분석"""
+        self._set_prefixes(mock_settings)
+        agent = mock_compact_services["agent"]
+        agent.find_similar_documents.side_effect = lambda docs: {"delete": [], "groups": [["kb/a.md"]]}
 
-    def test_filters_metadata_files(self, compact_service, mock_compact_services):
+        await compact_service.run()
+        agent.find_similar_documents.side_effect = lambda docs: {"delete": [], "groups": [[doc["key"]] for doc in docs]}
+        await compact_service.run()
+
+        reanalyzed = [doc["key"] for doc in agent.find_similar_documents.call_args[0][0]]
+        assert reanalyzed == ["kb/a.md", "kb/b.md", "kb/c.md"]
+
+    @patch("src.services.compact.settings")
+    async def test_estimate_applies_verdicts(self, mock_settings, compact_service, mock_compact_services, stored):
+        """추정도 run()과 같이 판정 캐시로 결정되는 문서를 분석 대상에서 제외"""
+        self._set_prefixes(mock_settings)
+
+        await compact_service.run(dry_run=True)
+        estimate = await compact_service.estimate()
+
+        assert estimate["candidates"] == 3
+        assert estimate["cached_documents"] == 3
+        assert estimate["analysis_tokens"] == 0
+
+    def test_filter_known_uses_keyword_overlap(self, compact_service):
+        """판정 없는 쌍은 키워드가 겹칠 때만 분석하고, 병합 판정은 저장된 판정에서 찾음"""
+        documents = [
+            {"key": f"doc{i}", "hash": str(i) * 64, "metadata": {"tags": tag}}
+            for i, tag in enumerate(["kafka", "kafka", "budget", "kafka"])
+        ]
+        verdicts = VerdictStore()
+        verdicts.record_analysis(documents[:3], {"delete": [], "groups": [["doc0", "doc2"], ["doc1"]]})
+
+        needed, known_deletes, known_merges = compact_service._filter_known(documents, verdicts)
+
+        # doc3만 바뀜 - 태그가 겹치는 doc0/doc1과 다시 분석, doc2와는 겹치지 않음
+        assert [doc["key"] for doc in needed] == ["doc0", "doc1", "doc3"]
+        assert known_deletes == []
+        assert known_merges == [("doc0", "doc2")]
+
+    def test_prune_keeps_recent_pairs(self):
+        """문서 쌍 판정이 max_pairs를 넘으면 오래 전에 기록된 쌍부터 제거"""
+        documents = [{"key": f"doc{i}", "hash": str(i) * 64} for i in range(4)]
+        verdicts = VerdictStore()
+        verdicts.record_analysis(documents[:3], {"delete": [], "groups": [["doc0", "doc1"], ["doc2"]]})
+        verdicts.record_analysis(documents[2:], {"delete": [], "groups": [["doc2"], ["doc3"]]})
+
+        verdicts.prune({doc["hash"] for doc in documents}, max_pairs=2)
+
+        assert len(verdicts.pairs) == 2
+        assert verdicts.pair(documents[2]["hash"], documents[3]["hash"]) == SEPARATE
+        assert verdicts.pair(documents[0]["hash"], documents[1]["hash"]) is None
+
+
+class TestCompactServiceMergeFanout:
+    """병합 작업 분산 테스트"""
+
+    @pytest.fixture
+    def fanout_service(self, mock_compact_services):
+        collector = MergeResultCollector()
+        service = CompactService(
+            s3_service=mock_compact_services["s3"],
+            bedrock_kb_service=mock_compact_services["bedrock"],
+            agent_service=mock_compact_services["agent"],
+            merge_collector=collector,
+            merge_fanout=True,
+            merge_task_timeout_seconds=5,
+        )
+        return service, collector
+
+    @pytest.fixture
+    def fanout_documents(self, mock_compact_services):
+        mock_s3 = mock_compact_services["s3"]
+        mock_s3.list_documents.side_effect = lambda prefix: (
+            [{"key": f"kb/doc{i}.md", "size": 100, "last_modified": "2024-01-01", "etag": f"e{i}"} for i in range(4)]
+            if prefix == "kb"
+            else []
+        )
+        mock_s3.get_document.side_effect = lambda key: b"{}" if key.endswith(".metadata.json") else key.encode()
+        mock_s3.delete_objects.side_effect = lambda keys: {"success": True, "deleted": keys, "errors": []}
+        mock_compact_services["agent"].find_similar_documents.return_value = {
+            "delete": [],
+            "groups": [["kb/doc0.md", "kb/doc1.md"], ["kb/doc2.md", "kb/doc3.md"]],
+        }
+
+    @staticmethod
+    def _set_prefixes(mock_settings):
+        mock_settings.s3_base_prefix = "kb"
+        mock_settings.s3_compact_prefix = "compacted"
+        mock_settings.s3_state_prefix = "state"
+        mock_settings.kafka_topic_compact_merge = "merge-tasks"
+
+    @patch("src.conf.kafka.broker")
+    @patch("src.services.compact.settings")
+    async def test_groups_published_and_aggregated(
+        self, mock_settings, mock_broker, fanout_service, mock_compact_services, fanout_documents
+    ):
+        """그룹별 작업을 발행하고 worker 결과를 실행 요약에 합산"""
+        self._set_prefixes(mock_settings)
+        service, collector = fanout_service
+        published = []
+        workers = []
+
+        async def worker(task):
+            collector.deliver(await service.merge_task(task))
+
+        async def publish(task, topic, key):
+            published.append((task, topic, key))
+            # 다른 replica의 worker가 처리한 것처럼 비동기로 결과 전달
+            workers.append(asyncio.create_task(worker(task)))
+
+        mock_broker.publish = AsyncMock(side_effect=publish)
+
+        result = await service.run()
+
+        assert len(published) == 2
+        assert {topic for _, topic, _ in published} == {"merge-tasks"}
+        assert [key for _, _, key in published] == [task.group_id.encode() for task, _, _ in published]
+        assert result["merged"] == 2
+        assert result["deleted"] == 8
+        mock_compact_services["bedrock"].start_sync.assert_called_once()
+
+    @patch("src.conf.kafka.broker")
+    @patch("src.services.compact.settings")
+    async def test_missing_results_counted_as_not_merged(
+        self, mock_settings, mock_broker, fanout_service, mock_compact_services, fanout_documents
+    ):
+        """timeout까지 결과가 오지 않은 그룹은 병합 수에서 제외"""
+        self._set_prefixes(mock_settings)
+        service, collector = fanout_service
+        service._merge_task_timeout_seconds = 0.05
+
+        async def publish(task, topic, key):
+            if task.group_id.endswith("-0"):
+                collector.deliver(
+                    MergeTaskResult(run_id=task.run_id, group_id=task.group_id, status="merged", deleted_keys=["a"])
+                )
+
+        mock_broker.publish = AsyncMock(side_effect=publish)
+
+        result = await service.run()
+
+        assert result["merged"] == 1
+        assert result["deleted_keys"] == ["a"]
+
+    @patch("src.conf.kafka.broker")
+    @patch("src.services.compact.settings")
+    async def test_late_results_synced_on_next_run(
+        self, mock_settings, mock_broker, fanout_service, mock_compact_services, fanout_documents
+    ):
+        """timeout 이후 도착한 결과는 버리지 않고 다음 실행의 KB 동기화에 반영"""
+        self._set_prefixes(mock_settings)
+        service, collector = fanout_service
+        service._merge_task_timeout_seconds = 0.05
+        published = []
+
+        async def publish(task, topic, key):
+            published.append(task)
+
+        mock_broker.publish = AsyncMock(side_effect=publish)
+        first = await service.run()
+        late = MergeTaskResult(
+            run_id=published[0].run_id,
+            group_id=published[0].group_id,
+            status="merged",
+            deleted_keys=["kb/doc0.md"],
+            written_keys=["compacted/merged.md"],
+        )
+        assert collector.deliver(late)
+        assert not collector.deliver(late)
+
+        mock_compact_services["s3"].list_documents.side_effect = lambda prefix: []
+        mock_compact_services["bedrock"].start_sync.reset_mock()
+        await service.run()
+
+        assert first["merged"] == 0
+        mock_compact_services["bedrock"].start_sync.assert_called_once()
+        assert collector.take_late() == []
+
+    async def test_merge_task_skips_changed_documents(self, fanout_service, mock_compact_services):
+        """분석 이후 내용이 바뀐 문서가 있으면 병합하지 않음"""
+        from src.schema.v1.merge_task import MergeSource, MergeTask
+
+        service, _ = fanout_service
+        mock_compact_services["s3"].get_document.side_effect = lambda key: b"changed"
+        task = MergeTask(
+            run_id="r",
+            group_id="r-0",
+            sources=[MergeSource(key=f"kb/doc{i}.md", size=10, hash="stale") for i in range(2)],
+        )
+
+        result = await service.merge_task(task)
+
+        assert result.status == "skipped"
+        mock_compact_services["agent"].merge_documents.assert_not_called()
+
+    async def test_merge_tasks_share_memory_budget(self, mock_compact_services):
+        """동시에 처리하는 병합 작업은 프로세스 공용 메모리 예산을 나눠 씀"""
+        from src.schema.v1.merge_task import MergeSource, MergeTask
+
+        budget = ByteBudget(100)
+        service = CompactService(
+            s3_service=mock_compact_services["s3"],
+            bedrock_kb_service=mock_compact_services["bedrock"],
+            agent_service=mock_compact_services["agent"],
+            memory_budget=budget,
+        )
+        mock_compact_services["s3"].get_document.side_effect = lambda key: b"{}"
+        task = MergeTask(run_id="r", group_id="r-0", sources=[MergeSource(key="kb/a.md", size=80, hash="h")])
+
+        async with budget.reserve(80):
+            pending = asyncio.create_task(service.merge_task(task))
+            await asyncio.sleep(0.05)
+            assert not pending.done()
+        assert (await pending).status == "skipped"
+        assert budget.in_use == 0
+
+
+class TestMergeResultCollector:
+    """병합 결과 수집기 테스트"""
+
+    async def test_ignores_unknown_runs(self):
+        collector = MergeResultCollector()
+        collector.expect("run", ["run-0"])
+
+        assert not collector.deliver(MergeTaskResult(run_id="other", group_id="other-0", status="merged"))
+        assert collector.deliver(MergeTaskResult(run_id="run", group_id="run-0", status="merged"))
+
+        results = await collector.wait("run", timeout=1)
+        assert list(results) == ["run-0"]
+        # 대기가 끝난 실행의 결과는 더 이상 받지 않음
+        assert not collector.deliver(MergeTaskResult(run_id="run", group_id="run-0", status="merged"))
+
+
+class TestLoadFingerprints:
+    """_load_fingerprints 스트리밍 로드 테스트"""
+
+    async def test_filters_metadata_files(self, compact_service, mock_compact_services):
         """메타데이터 파일 필터링"""
         mock_compact_services["s3"].list_documents.return_value = [
             {"key": "kb/doc1.md", "size": 100, "last_modified": "2024-01-01"},
@@ -257,12 +1141,12 @@ class TestLoadDocuments:
         ]
         mock_compact_services["s3"].get_document.return_value = b"content"
 
-        docs = compact_service._load_documents("kb")
+        docs = await compact_service._load_fingerprints(["kb"], ByteBudget(1024))
 
         assert len(docs) == 1
         assert docs[0]["key"] == "kb/doc1.md"
 
-    def test_handles_missing_metadata(self, compact_service, mock_compact_services):
+    async def test_handles_missing_metadata(self, compact_service, mock_compact_services):
         """메타데이터 파일 없을 때"""
         mock_compact_services["s3"].list_documents.return_value = [
             {"key": "kb/doc1.md", "size": 100, "last_modified": "2024-01-01"},
@@ -276,35 +1160,81 @@ class TestLoadDocuments:
 
         mock_compact_services["s3"].get_document.side_effect = get_doc
 
-        docs = compact_service._load_documents("kb")
+        docs = await compact_service._load_fingerprints(["kb"], ByteBudget(1024))
 
         assert len(docs) == 1
         assert docs[0]["metadata"] == {}
 
-    def test_handles_document_load_failure(self, compact_service, mock_compact_services):
+    async def test_handles_document_load_failure(self, compact_service, mock_compact_services):
         """문서 로드 실패 시 건너뛰기"""
         mock_compact_services["s3"].list_documents.return_value = [
             {"key": "kb/doc1.md", "size": 100, "last_modified": "2024-01-01"},
             {"key": "kb/doc2.md", "size": 100, "last_modified": "2024-01-01"},
         ]
 
-        call_count = [0]
-
         def get_doc(key):
             if key.endswith(".metadata.json"):
                 return json.dumps({"metadataAttributes": {}}).encode()
-            call_count[0] += 1
-            if call_count[0] == 1:
+            if key == "kb/doc1.md":
                 raise Exception("Load failed")
             return b"content"
 
         mock_compact_services["s3"].get_document.side_effect = get_doc
 
-        docs = compact_service._load_documents("kb")
+        docs = await compact_service._load_fingerprints(["kb"], ByteBudget(1024))
 
         assert len(docs) == 1
         assert docs[0]["key"] == "kb/doc2.md"
 
+    async def test_keeps_excerpt_and_hash_only(self, mock_compact_services):
+        """원문 대신 발췌와 해시만 보관, 목록 순서 유지"""
+        service = CompactService(
+            s3_service=mock_compact_services["s3"],
+            bedrock_kb_service=mock_compact_services["bedrock"],
+            agent_service=mock_compact_services["agent"],
+            fetch_concurrency=3,
+            excerpt_chars=5,
+        )
+        mock_compact_services["s3"].list_documents.return_value = [
+            {"key": f"kb/doc{i}.md", "size": 100, "last_modified": "2024-01-01"} for i in range(10)
+        ]
+        mock_compact_services["s3"].get_document.side_effect = lambda key: f"{key} full content".encode()
+
+        docs = await service._load_fingerprints(["kb"], ByteBudget(150))
+
+        assert [doc["key"] for doc in docs] == [f"kb/doc{i}.md" for i in range(10)]
+        assert docs[0]["content"] == "kb/do"
+        assert len(docs[0]["hash"]) == 64
+        assert docs[0]["hash"] != docs[1]["hash"]
+
+
+class TestByteBudget:
+    """ByteBudget 테스트"""
+
+    async def test_waits_until_released(self):
+        """예산 초과 시 반환될 때까지 대기"""
+        budget = ByteBudget(100)
+        order = []
+
+        async def hold(name: str, size: int, delay: float):
+            async with budget.reserve(size):
+                order.append(f"{name}-start")
+                assert budget.in_use <= budget.limit
+                await asyncio.sleep(delay)
+                order.append(f"{name}-end")
+
+        await asyncio.gather(hold("a", 80, 0.01), hold("b", 80, 0))
+
+        assert order == ["a-start", "a-end", "b-start", "b-end"]
+        assert budget.in_use == 0
+
+    async def test_oversized_item_runs_alone(self):
+        """한도보다 큰 항목도 단독으로 처리"""
+        budget = ByteBudget(100)
+
+        async with budget.reserve(500):
+            assert budget.in_use == 100
+
 
 class TestHandleCompact:
     """handle_compact 핸들러 테스트"""
@@ -323,3 +1253,283 @@ class TestHandleCompact:
         assert compact_result.status == "completed"
         assert compact_result.merged == 0
         assert compact_result.deleted == 0
+
+
+def _published_to(broker, topic: str) -> list:
+    """topic으로 발행된 메시지 목록"""
+    return [c.args[0] for c in broker.publish.call_args_list if c.kwargs.get("topic") == topic]
+
+
+class TestHandleCompactLock:
+    """handle_compact 단일 실행 잠금 테스트"""
+
+    @pytest.fixture
+    def lock_container(self):
+        compact_service = MagicMock()
+        compact_service.run = AsyncMock(return_value={"status": "completed", "merged": 1, "deleted": 2})
+        compact_service.apply = AsyncMock(return_value={"status": "completed", "merged": 1, "deleted": 2})
+        compact_lock = MagicMock()
+        compact_lock.acquire = AsyncMock(return_value=MagicMock())
+        compact_lock.hold = MagicMock(return_value=AsyncMock())
+        compact_lock.request_follow_up = AsyncMock()
+        compact_lock.take_follow_up = AsyncMock(return_value=False)
+
+        with (
+            patch("src.events.v1.compact.Container") as mock_container,
+            patch("src.events.v1.compact.broker") as mock_broker,
+            patch("src.events.retry.broker") as mock_retry_broker,
+        ):
+            mock_container.compact_service.return_value = compact_service
+            mock_container.compact_lock.return_value = compact_lock
+            mock_broker.publish = AsyncMock()
+            mock_retry_broker.publish = AsyncMock()
+            yield {
+                "service": compact_service,
+                "lock": compact_lock,
+                "broker": mock_broker,
+                "retry_broker": mock_retry_broker,
+            }
+
+    async def test_runs_while_holding_lock(self, lock_container):
+        """잠금을 잡고 실행"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        result = await handle_compact(CompactEvent(trigger="api"))
+
+        from src.conf.settings import settings
+
+        assert result.status == "completed"
+        lock_container["lock"].hold.assert_called_once()
+        assert _published_to(lock_container["broker"], settings.kafka_topic_compact) == []
+
+    async def test_trigger_during_run_coalesced(self, lock_container):
+        """실행 중 트리거는 실행하지 않고 후속 실행으로 표시"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["lock"].acquire.return_value = None
+
+        result = await handle_compact(CompactEvent(trigger="api"))
+
+        assert result.status == "coalesced"
+        lock_container["service"].run.assert_not_called()
+        lock_container["lock"].request_follow_up.assert_awaited_once()
+
+    async def test_plan_apply_rejected_during_run(self, lock_container):
+        """실행 중 plan 적용은 거부"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["lock"].acquire.return_value = None
+
+        result = await handle_compact(CompactEvent(trigger="api", plan_id="p1"))
+
+        assert result.status == "rejected"
+        assert result.plan_id == "p1"
+        lock_container["service"].apply.assert_not_called()
+        lock_container["lock"].request_follow_up.assert_not_called()
+
+    async def test_follow_up_published_after_run(self, lock_container):
+        """실행 중 들어온 트리거가 있으면 끝난 뒤 후속 실행 한 번 발행"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["lock"].take_follow_up.return_value = True
+
+        await handle_compact(CompactEvent(trigger="scheduled"))
+
+        from src.conf.settings import settings
+
+        follow_ups = _published_to(lock_container["broker"], settings.kafka_topic_compact)
+        assert len(follow_ups) == 1
+        assert follow_ups[0].trigger == "coalesced"
+
+    async def test_dry_run_takes_lock(self, lock_container):
+        """dry run도 verdict/plan 파일을 쓰므로 잠금을 잡고 실행"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        result = await handle_compact(CompactEvent(trigger="api", dry_run=True))
+
+        assert result.status == "completed"
+        lock_container["lock"].hold.assert_called_once()
+
+    async def test_dry_run_rejected_during_run(self, lock_container):
+        """실행 중 dry run은 후속 실행으로 합치지 않고 거부"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["lock"].acquire.return_value = None
+
+        result = await handle_compact(CompactEvent(trigger="api", dry_run=True))
+
+        assert result.status == "rejected"
+        lock_container["service"].run.assert_not_called()
+        lock_container["lock"].request_follow_up.assert_not_called()
+
+    async def test_lock_error_scheduled_for_retry(self, lock_container):
+        """잠금 확인 중 S3 오류는 실행 중으로 보지 않고 재시도 토픽으로 보냄"""
+        from src.conf.settings import settings
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["lock"].acquire.side_effect = ClientError(
+            {"Error": {"Code": "SlowDown"}, "ResponseMetadata": {"HTTPStatusCode": 503}}, "GetObject"
+        )
+
+        result = await handle_compact(CompactEvent(trigger="api", dry_run=True))
+
+        assert result.status == "retrying"
+        lock_container["lock"].request_follow_up.assert_not_called()
+        assert (
+            len(
+                _published_to(
+                    lock_container["retry_broker"], settings.kafka_retry_topic(settings.kafka_topic_compact, 1)
+                )
+            )
+            == 1
+        )
+
+    async def test_lost_lock_fails_run(self, lock_container):
+        """실행 중 잠금을 잃으면 재시도하지 않고 실패 처리 후 후속 실행 표시"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+        from src.services.compact_lock import CompactLockLostError
+
+        lock_container["service"].run.side_effect = CompactLockLostError("Lost compact lock")
+
+        result = await handle_compact(CompactEvent(trigger="scheduled"))
+
+        assert result.status == "failed"
+        lock_container["lock"].request_follow_up.assert_awaited_once()
+        lock_container["lock"].take_follow_up.assert_not_called()
+        lock_container["retry_broker"].publish.assert_not_called()
+
+    async def test_transient_failure_scheduled_for_retry(self, lock_container, mock_compact_services):
+        """S3 throttling은 빈 코퍼스로 보지 않고 재시도 토픽으로 보내며 잠금 반환"""
+        import boto3
+        from botocore.stub import Stubber
+
+        from src.events.v1.compact import handle_compact
+        from src.external_service.s3 import S3Service
+        from src.schema.v1.compact_event import CompactEvent
+
+        s3_service = S3Service(bucket="test-bucket")
+        s3_service.client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        stubber = Stubber(s3_service.client)
+        stubber.add_client_error("list_objects_v2", service_error_code="SlowDown", http_status_code=503)
+        stubber.activate()
+        service = CompactService(
+            s3_service=s3_service,
+            bedrock_kb_service=mock_compact_services["bedrock"],
+            agent_service=mock_compact_services["agent"],
+        )
+
+        with patch("src.events.v1.compact.Container.compact_service", return_value=service, create=True):
+            result = await handle_compact(CompactEvent(trigger="api"))
+
+        assert result.status == "retrying"
+        assert lock_container["retry_broker"].publish.call_args.kwargs["topic"].endswith(".retry.1")
+        lock_container["lock"].hold.return_value.__aexit__.assert_awaited()
+
+    async def test_result_published_to_results_topic(self, lock_container):
+        """최종 결과를 run_id 키로 결과 토픽에 발행"""
+        from src.conf.settings import settings
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        result = await handle_compact(CompactEvent(trigger="api"))
+
+        published = _published_to(lock_container["broker"], settings.kafka_topic_compact_results)
+        assert published == [result]
+        assert result.run_id
+        call = lock_container["broker"].publish.call_args
+        assert call.kwargs["key"] == result.run_id.encode("utf-8")
+        assert call.kwargs["headers"] == {"x-event-type": "result"}
+
+    async def test_coalesced_result_published(self, lock_container):
+        """실행하지 않은 트리거도 결과 이벤트 발행"""
+        from src.conf.settings import settings
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["lock"].acquire.return_value = None
+
+        await handle_compact(CompactEvent(trigger="api"))
+
+        published = _published_to(lock_container["broker"], settings.kafka_topic_compact_results)
+        assert [p.status for p in published] == ["coalesced"]
+
+    async def test_progress_published_during_run(self, lock_container):
+        """run이 보고하는 단계별 진행 상황을 결과 토픽에 발행"""
+        from src.conf.settings import settings
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent, CompactProgress
+
+        async def run(dry_run=False, progress=None):
+            async with progress.stage("load"):
+                progress.stats.documents_loaded = 3
+            return {
+                "status": "completed",
+                "merged": 0,
+                "deleted": 0,
+                "run_id": progress.run_id,
+                "stats": progress.stats.model_dump(),
+            }
+
+        lock_container["service"].run.side_effect = run
+
+        result = await handle_compact(CompactEvent(trigger="api"))
+
+        published = _published_to(lock_container["broker"], settings.kafka_topic_compact_results)
+        progress = [p for p in published if isinstance(p, CompactProgress)]
+        assert [(p.stage, p.stats.documents_loaded) for p in progress] == [("load", 3)]
+        assert progress[0].run_id == result.run_id
+        assert result.stats.documents_loaded == 3
+
+    async def test_results_publish_failure_ignored(self, lock_container):
+        """결과 토픽 발행 실패는 compact 결과에 영향 없음"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        lock_container["broker"].publish.side_effect = RuntimeError("broker down")
+
+        result = await handle_compact(CompactEvent(trigger="api"))
+
+        assert result.status == "completed"
+
+    async def test_agent_usage_in_result(self, lock_container):
+        """실행 중 Agent 사용량을 결과에 포함"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+        from src.schema.v1.usage import UsageTotals
+        from src.services.usage import record_usage
+
+        async def run(dry_run=False, progress=None):
+            record_usage("find_similar_documents", UsageTotals(calls=1, input_tokens=500, cost_usd=0.02))
+            return {"status": "completed", "merged": 0, "deleted": 0}
+
+        lock_container["service"].run.side_effect = run
+
+        result = await handle_compact(CompactEvent(trigger="api"))
+
+        assert result.usage.input_tokens == 500
+        assert result.usage.operations["find_similar_documents"].cost_usd == 0.02
+
+    async def test_profiled_run_reports_location(self, lock_container, tmp_path):
+        """profile 요청된 실행은 프로파일을 저장하고 결과에 위치 포함"""
+        from src.events.v1.compact import handle_compact
+        from src.schema.v1.compact_event import CompactEvent
+        from src.services.profiler import Profiler
+
+        with patch(
+            "src.events.v1.compact.Container.profiler", return_value=Profiler(enabled=True, directory=str(tmp_path))
+        ):
+            result = await handle_compact(CompactEvent(trigger="api", profile=True))
+
+        assert result.status == "completed"
+        assert result.profile_location.startswith(str(tmp_path))
+        assert f"compact-{result.run_id}" in result.profile_location
@@ -0,0 +1,96 @@
+"""이벤트 재시도/dead letter 유틸리티 테스트"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from src.events.retry import (
+    RETRY_ATTEMPT_HEADER,
+    RETRY_NOT_BEFORE_HEADER,
+    is_transient,
+    retry_or_dead_letter,
+    wait_for_retry,
+)
+from src.schema.v1.compact_event import CompactEvent
+from src.utils.datetime import utc_now
+
+
+def _client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "StartIngestionJob")
+
+
+@pytest.fixture
+def mock_broker():
+    with patch("src.events.retry.broker") as broker, patch("src.events.retry.settings") as mock_settings:
+        mock_settings.kafka_retry_delays_seconds = [30, 120]
+        mock_settings.kafka_retry_topic.side_effect = lambda topic, attempt: f"{topic}.retry.{attempt}"
+        mock_settings.kafka_dlq_topic.side_effect = lambda topic: f"{topic}.dlq"
+        broker.publish = AsyncMock()
+        yield broker
+
+
+class TestIsTransient:
+    """일시적 오류 판단"""
+
+    def test_throttling_is_transient(self):
+        assert is_transient(_client_error("ThrottlingException"))
+        assert is_transient(EndpointConnectionError(endpoint_url="https://s3"))
+        assert is_transient(TimeoutError())
+
+    def test_server_errors_are_transient(self):
+        error = ClientError(
+            {"Error": {"Code": "BadGateway", "Message": "bad gateway"}, "ResponseMetadata": {"HTTPStatusCode": 502}},
+            "ListObjectsV2",
+        )
+        assert is_transient(error)
+        assert is_transient(ExceptionGroup("fetch", [error, TimeoutError()]))
+        assert not is_transient(ExceptionGroup("fetch", [error, ValueError("bad input")]))
+
+    def test_other_errors_are_not_transient(self):
+        assert not is_transient(_client_error("AccessDenied"))
+        assert not is_transient(ValueError("bad input"))
+
+
+class TestRetryOrDeadLetter:
+    """재시도 토픽/dead letter 발행"""
+
+    async def test_transient_error_goes_to_next_retry_topic(self, mock_broker):
+        outcome = await retry_or_dead_letter(CompactEvent(), "compact", 0, _client_error("Throttling"))
+
+        assert outcome == "retry"
+        kwargs = mock_broker.publish.call_args.kwargs
+        assert kwargs["topic"] == "compact.retry.1"
+        assert kwargs["headers"][RETRY_ATTEMPT_HEADER] == "1"
+        assert float(kwargs["headers"][RETRY_NOT_BEFORE_HEADER]) >= utc_now().timestamp() + 29
+
+    async def test_exhausted_retries_go_to_dlq(self, mock_broker):
+        outcome = await retry_or_dead_letter(CompactEvent(), "compact", 2, _client_error("Throttling"))
+
+        assert outcome == "dead_letter"
+        assert mock_broker.publish.call_args.kwargs["topic"] == "compact.dlq"
+
+    async def test_permanent_error_goes_to_dlq(self, mock_broker):
+        outcome = await retry_or_dead_letter(CompactEvent(), "compact", 0, ValueError("bad"))
+
+        assert outcome == "dead_letter"
+        assert "ValueError" in mock_broker.publish.call_args.kwargs["headers"]["x-error"]
+
+
+class TestWaitForRetry:
+    """재시도 지연 대기"""
+
+    async def test_original_message_not_delayed(self):
+        with patch("src.events.retry.asyncio.sleep", new=AsyncMock()) as sleep:
+            assert await wait_for_retry({}) == 0
+            assert await wait_for_retry(None) == 0
+
+        sleep.assert_not_called()
+
+    async def test_waits_until_not_before(self):
+        headers = {RETRY_ATTEMPT_HEADER: "2", RETRY_NOT_BEFORE_HEADER: str(utc_now().timestamp() + 60)}
+
+        with patch("src.events.retry.asyncio.sleep", new=AsyncMock()) as sleep:
+            assert await wait_for_retry(headers) == 2
+
+        assert 55 < sleep.call_args[0][0] <= 60
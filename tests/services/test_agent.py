@@ -0,0 +1,137 @@
+"""AgentService 테스트"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.external_service.agent import AgentService
+
+
+def _documents(count: int, chars: int = 400) -> list[dict]:
+    return [{"key": f"kb/doc{i}.md", "content": "x" * chars, "metadata": {}} for i in range(count)]
+
+
+def _merge_response(content: str) -> str:
+    return json.dumps(
+        {
+            "directory": "merged-docs",
+            "filename": "merged.md",
+            "content": content,
+            "metadata": {"summary": "s", "categories": [], "tags": []},
+        }
+    )
+
+
+class TestAgentServiceTreeMerge:
+    """tree-reduce 병합 테스트"""
+
+    async def test_small_group_single_call(self):
+        """토큰 상한 이내 그룹은 한 번에 병합"""
+        service = AgentService(merge_max_tokens=10000, merge_fan_in=4)
+        service.query_text = AsyncMock(return_value=_merge_response("merged"))
+
+        result = await service.merge_documents(_documents(3))
+
+        assert service.query_text.call_count == 1
+        assert result["content"] == "merged"
+
+    async def test_large_group_tree_reduce(self):
+        """상한을 넘는 그룹은 배치 병합 후 중간 결과를 다시 병합"""
+        # 문서당 100토큰, 호출당 250토큰 -> 문서 2개씩 배치
+        service = AgentService(merge_max_tokens=250, merge_fan_in=4)
+        service.query_text = AsyncMock(return_value=_merge_response("m" * 40))
+
+        result = await service.merge_documents(_documents(8))
+
+        # 8 -> 4 배치 병합 -> 4개 중간 결과(10토큰)를 한 번에 병합
+        assert service.query_text.call_count == 5
+        assert result["directory"] == "merged-docs"
+        final_prompt = service.query_text.call_args[0][0]
+        assert "x" * 400 not in final_prompt
+
+    async def test_fan_in_limits_batch_size(self):
+        """토큰 여유가 있어도 호출당 문서 수는 fan_in 이하"""
+        service = AgentService(merge_max_tokens=1000, merge_fan_in=2)
+        service.query_text = AsyncMock(return_value=_merge_response("m"))
+
+        batches = service._merge_batches(_documents(5, chars=4))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    async def test_oversized_documents_still_reduce(self):
+        """문서 하나가 상한을 넘어도 fan_in개씩 묶어 병합 단계가 진행됨"""
+        service = AgentService(merge_max_tokens=50, merge_fan_in=2)
+
+        batches = service._merge_batches(_documents(4))
+
+        assert [len(batch) for batch in batches] == [2, 2]
+
+    async def test_disabled_merges_whole_group(self):
+        """merge_max_tokens=0이면 기존처럼 한 번에 병합"""
+        service = AgentService()
+        service.query_text = AsyncMock(return_value=_merge_response("merged"))
+
+        await service.merge_documents(_documents(30))
+
+        assert service.query_text.call_count == 1
+
+
+class TestAgentServiceSimilarity:
+    """유사도 분석 응답 파싱 테스트"""
+
+    async def test_parsed_response(self):
+        """JSON 응답은 parsed=True로 반환"""
+        service = AgentService()
+        service.query_text = AsyncMock(return_value=json.dumps({"delete": [], "groups": [["kb/doc0.md"]]}))
+
+        result = await service.find_similar_documents(_documents(1))
+
+        assert result == {"delete": [], "groups": [["kb/doc0.md"]], "parsed": True}
+
+    async def test_unparsable_response(self):
+        """파싱할 수 없는 응답은 문서별 단독 그룹과 parsed=False로 반환"""
+        service = AgentService()
+        service.query_text = AsyncMock(return_value="not json")
+
+        result = await service.find_similar_documents(_documents(2))
+
+        assert result["groups"] == [["kb/doc0.md"], ["kb/doc1.md"]]
+        assert result["parsed"] is False
+
+
+class TestAgentServiceCheckCli:
+    """readiness용 CLI 확인 테스트"""
+
+    @staticmethod
+    def _cli(tmp_path, exit_code: int = 0) -> str:
+        path = tmp_path / "claude"
+        path.write_text(f'#!/bin/sh\necho run >> "{tmp_path}/calls"\necho "boom" >&2\nexit {exit_code}\n')
+        path.chmod(0o755)
+        return str(path)
+
+    async def test_runs_cli_once(self, tmp_path):
+        """처음 한 번만 --version으로 실행하고 이후에는 실행 파일만 확인"""
+        cli = self._cli(tmp_path)
+        service = AgentService(system_prompt="system")
+
+        with patch("src.external_service.agent.shutil.which", return_value=cli):
+            await service.check_cli()
+            await service.check_cli()
+
+        assert (tmp_path / "calls").read_text().count("run") == 1
+
+    async def test_failing_cli(self, tmp_path):
+        """CLI 실행이 실패하면 RuntimeError"""
+        cli = self._cli(tmp_path, exit_code=1)
+        service = AgentService(system_prompt="system", cli_path=cli)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await service.check_cli()
+
+    async def test_missing_cli(self):
+        """설정된 경로가 없고 PATH에도 없으면 RuntimeError"""
+        service = AgentService(system_prompt="system")
+
+        with patch("src.external_service.agent.shutil.which", return_value=None), pytest.raises(RuntimeError):
+            await service.check_cli()
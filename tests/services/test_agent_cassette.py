@@ -0,0 +1,111 @@
+"""Agent 응답 기록/재생 테스트"""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from src.external_service.agent import AgentService
+from src.external_service.agent_cassette import AgentCassette, CassetteMissError
+from src.services.usage import track_usage
+
+
+def _live_query(texts: list[str], delay: float = 0.05):
+    """호출마다 texts를 차례로 응답하는 claude_agent_sdk.query 대체"""
+    responses = iter(texts)
+
+    async def query(prompt, options):
+        await asyncio.sleep(delay)
+        yield AssistantMessage(content=[TextBlock(text=next(responses))], model="claude-test")
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=int(delay * 1000),
+            duration_api_ms=int(delay * 1000),
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+            total_cost_usd=0.01,
+            usage={"input_tokens": 100, "output_tokens": 20},
+        )
+
+    return query
+
+
+async def _record(path, texts: list[str], prompts: list[str], delay: float = 0.05) -> None:
+    service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="record"))
+    with patch("src.external_service.agent.query", _live_query(texts, delay)):
+        for prompt in prompts:
+            await service.query_text(prompt)
+
+
+class TestAgentCassette:
+    """기록/재생 테스트"""
+
+    async def test_record_writes_messages_with_timing(self, tmp_path):
+        """record 모드는 실제 응답을 그대로 돌려주고 메시지와 도착 시각을 기록"""
+        path = tmp_path / "cassette.jsonl"
+        service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="record"))
+
+        with patch("src.external_service.agent.query", _live_query(["hello"])):
+            text = await service.query_text("prompt")
+
+        assert text == "hello"
+        entry = json.loads(path.read_text().strip())
+        assert entry["prompt_preview"] == "prompt"
+        assert [m["type"] for m in entry["messages"]] == ["assistant", "result"]
+        assert entry["messages"][0]["offset_ms"] >= 40
+        assert entry["messages"][1]["usage"] == {"input_tokens": 100, "output_tokens": 20}
+
+    async def test_replay_without_network(self, tmp_path):
+        """replay 모드는 실제 Agent를 호출하지 않고 기록된 응답과 사용량을 재생"""
+        path = tmp_path / "cassette.jsonl"
+        await _record(path, ["answer"], ["prompt"])
+
+        service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="replay"))
+        with patch("src.external_service.agent.query", side_effect=AssertionError("network")), track_usage() as usage:
+            text = await service.query_text("prompt")
+
+        assert text == "answer"
+        assert usage.input_tokens == 100
+        assert usage.cost_usd == pytest.approx(0.01)
+
+    async def test_replay_keeps_latency(self, tmp_path):
+        """기록된 도착 시각대로 기다리고, replay_speed=0이면 기다리지 않음"""
+        path = tmp_path / "cassette.jsonl"
+        await _record(path, ["answer"], ["prompt"], delay=0.1)
+
+        service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="replay"))
+        started = time.perf_counter()
+        await service.query_text("prompt")
+        assert time.perf_counter() - started >= 0.09
+
+        service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="replay", replay_speed=0))
+        started = time.perf_counter()
+        await service.query_text("prompt")
+        assert time.perf_counter() - started < 0.05
+
+    async def test_replay_cycles_repeated_prompts(self, tmp_path):
+        """같은 프롬프트가 여러 번 기록되어 있으면 기록 순서대로 재생"""
+        path = tmp_path / "cassette.jsonl"
+        await _record(path, ["first", "second"], ["prompt", "prompt"], delay=0)
+
+        service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="replay"))
+        texts = [await service.query_text("prompt") for _ in range(3)]
+
+        assert texts == ["first", "second", "first"]
+
+    async def test_replay_miss(self, tmp_path):
+        """기록되지 않은 프롬프트나 다른 시스템 프롬프트는 CassetteMissError"""
+        path = tmp_path / "cassette.jsonl"
+        await _record(path, ["answer"], ["prompt"], delay=0)
+
+        service = AgentService(system_prompt="system", cassette=AgentCassette(str(path), mode="replay"))
+        with pytest.raises(CassetteMissError):
+            await service.query_text("other prompt")
+
+        service = AgentService(system_prompt="changed", cassette=AgentCassette(str(path), mode="replay"))
+        with pytest.raises(CassetteMissError):
+            await service.query_text("prompt")
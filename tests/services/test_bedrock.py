@@ -0,0 +1,83 @@
+"""BedrockKBService 테스트"""
+
+from botocore.exceptions import ClientError
+
+
+class TestBedrockDocumentSync:
+    """문서 단위 ingest/delete 테스트"""
+
+    def test_batch_size_within_api_limit(self):
+        """요청당 문서 수가 botocore 모델의 최대값 이하"""
+        import boto3
+
+        from src.external_service.bedrock import MAX_DOCUMENTS_PER_REQUEST
+
+        model = boto3.client("bedrock-agent", region_name="us-east-1").meta.service_model
+        for operation, member in (
+            ("IngestKnowledgeBaseDocuments", "documents"),
+            ("DeleteKnowledgeBaseDocuments", "documentIdentifiers"),
+        ):
+            shape = model.operation_model(operation).input_shape.members[member]
+            assert MAX_DOCUMENTS_PER_REQUEST <= shape.metadata["max"]
+
+    async def test_ingest_documents_in_batches(self, mock_boto3_bedrock_client):
+        """요청당 최대 문서 수로 나누어 S3 URI와 메타데이터 파일 전달"""
+        from src.external_service.bedrock import MAX_DOCUMENTS_PER_REQUEST, BedrockKBService
+
+        mock_boto3_bedrock_client.ingest_knowledge_base_documents.return_value = {
+            "documentDetails": [{"identifier": {"s3": {"uri": "s3://test-bucket/kb/a.md"}}, "status": "STARTING"}]
+        }
+        service = BedrockKBService(knowledge_base_id="kb", data_source_id="ds", bucket="test-bucket")
+        keys = [f"kb/doc{i}.md" for i in range(MAX_DOCUMENTS_PER_REQUEST + 1)]
+
+        result = await service.ingest_documents(keys)
+
+        assert result["success"] is True
+        calls = mock_boto3_bedrock_client.ingest_knowledge_base_documents.call_args_list
+        assert [len(call.kwargs["documents"]) for call in calls] == [MAX_DOCUMENTS_PER_REQUEST, 1]
+        document = calls[0].kwargs["documents"][0]
+        assert document["content"]["s3"]["s3Location"]["uri"] == "s3://test-bucket/kb/doc0.md"
+        assert document["metadata"]["s3Location"]["uri"] == "s3://test-bucket/kb/doc0.md.metadata.json"
+        assert result["documents"][0]["status"] == "STARTING"
+
+    async def test_delete_documents(self, mock_boto3_bedrock_client):
+        """S3 URI로 문서 삭제"""
+        from src.external_service.bedrock import BedrockKBService
+
+        mock_boto3_bedrock_client.delete_knowledge_base_documents.return_value = {"documentDetails": []}
+        service = BedrockKBService(knowledge_base_id="kb", data_source_id="ds", bucket="test-bucket")
+
+        result = await service.delete_documents(["kb/a.md"])
+
+        assert result["success"] is True
+        kwargs = mock_boto3_bedrock_client.delete_knowledge_base_documents.call_args.kwargs
+        assert kwargs["documentIdentifiers"] == [{"dataSourceType": "S3", "s3": {"uri": "s3://test-bucket/kb/a.md"}}]
+
+    async def test_error_code_returned(self, mock_boto3_bedrock_client):
+        """실패 시 오류 코드 반환"""
+        from src.external_service.bedrock import BedrockKBService
+
+        mock_boto3_bedrock_client.ingest_knowledge_base_documents.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "unsupported data source"}},
+            "IngestKnowledgeBaseDocuments",
+        )
+        service = BedrockKBService(knowledge_base_id="kb", data_source_id="ds", bucket="test-bucket")
+
+        result = await service.ingest_documents(["kb/a.md"])
+
+        assert result["success"] is False
+        assert result["error_code"] == "ValidationException"
+
+    async def test_transient_error_raised(self, mock_boto3_bedrock_client):
+        """throttling은 실패 결과로 삼키지 않고 재시도할 수 있도록 ClientError로 전달"""
+        import pytest
+
+        from src.external_service.bedrock import BedrockKBService
+
+        mock_boto3_bedrock_client.start_ingestion_job.side_effect = ClientError(
+            {"Error": {"Code": "ThrottlingException", "Message": "rate exceeded"}}, "StartIngestionJob"
+        )
+        service = BedrockKBService(knowledge_base_id="kb", data_source_id="ds", bucket="test-bucket")
+
+        with pytest.raises(ClientError):
+            await service.start_sync()
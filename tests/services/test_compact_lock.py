@@ -0,0 +1,87 @@
+"""CompactRunLock 테스트"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.services.compact_lock import CompactLockLostError, CompactRunLock
+
+
+@pytest.fixture
+def compact_lock():
+    from src.external_service.s3 import S3Service
+
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+        s3_service = S3Service(bucket="test-bucket", region="us-east-1")
+        yield CompactRunLock(
+            s3_service, key="state/compact.lease", pending_key="state/compact.pending", owner="pod", ttl_seconds=60
+        )
+
+
+class TestCompactRunLock:
+    """compact 단일 실행 잠금"""
+
+    async def test_single_run_per_lock(self, compact_lock):
+        """같은 replica라도 실행 중에는 다시 획득할 수 없음"""
+        lease = await compact_lock.acquire()
+
+        assert lease is not None
+        assert await compact_lock.acquire() is None
+
+    async def test_hold_releases_on_exit(self, compact_lock):
+        """실행이 끝나면 다음 실행이 획득"""
+        lease = await compact_lock.acquire()
+        async with compact_lock.hold(lease):
+            pass
+
+        assert await compact_lock.acquire() is not None
+
+    async def test_lost_lock_cancels_run(self, compact_lock):
+        """갱신에 실패하면 실행을 취소하고 CompactLockLostError 발생"""
+        compact_lock.ttl_seconds = 0.03
+        lease = await compact_lock.acquire()
+        lease.acquire = AsyncMock(return_value=False)
+        finished = False
+
+        with pytest.raises(CompactLockLostError):
+            async with compact_lock.hold(lease):
+                await asyncio.sleep(1)
+                finished = True
+
+        assert finished is False
+        assert asyncio.current_task().cancelling() == 0
+
+    async def test_renewal_errors_retried_until_expiry(self, compact_lock):
+        """일시적 갱신 오류는 만료 전까지 재시도하고 실행을 계속함"""
+        compact_lock.ttl_seconds = 0.3
+        lease = await compact_lock.acquire()
+        lease.acquire = AsyncMock(side_effect=[ConnectionError("throttled"), ConnectionError("throttled")] + [True] * 5)
+
+        async with compact_lock.hold(lease):
+            await asyncio.sleep(0.28)
+
+        assert lease.acquire.await_count >= 3
+
+    async def test_renewal_errors_until_expiry_cancel_run(self, compact_lock):
+        """만료될 때까지 갱신하지 못하면 실행 취소"""
+        compact_lock.ttl_seconds = 0.03
+        lease = await compact_lock.acquire()
+        lease.acquire = AsyncMock(side_effect=ConnectionError("throttled"))
+
+        with pytest.raises(CompactLockLostError):
+            async with compact_lock.hold(lease):
+                await asyncio.sleep(1)
+
+    async def test_follow_up_coalesced(self, compact_lock):
+        """여러 트리거는 후속 실행 하나로 합쳐짐"""
+        assert await compact_lock.take_follow_up() is False
+
+        await compact_lock.request_follow_up()
+        await compact_lock.request_follow_up()
+
+        assert await compact_lock.take_follow_up() is True
+        assert await compact_lock.take_follow_up() is False
@@ -0,0 +1,59 @@
+"""이벤트 루프 멈춤 감지 테스트"""
+
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+
+from src.services.loop_monitor import LoopMonitor
+
+
+def _blocking_call(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _lag_count() -> float:
+    return REGISTRY.get_sample_value("kb_event_loop_lag_seconds_count") or 0
+
+
+class TestLoopMonitor:
+    """LoopMonitor 테스트"""
+
+    async def test_records_lag(self):
+        """interval마다 lag를 히스토그램에 기록"""
+        monitor = LoopMonitor(interval_seconds=0.01, stall_threshold_seconds=0.5)
+        before = _lag_count()
+
+        await monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        assert _lag_count() - before >= 3
+        assert monitor.stalls() == []
+
+    async def test_records_stack_of_blocking_call(self):
+        """루프를 막는 동기 호출은 멈춘 동안의 스택과 전체 지연을 기록"""
+        monitor = LoopMonitor(interval_seconds=0.01, stall_threshold_seconds=0.05)
+        stalls_before = REGISTRY.get_sample_value("kb_event_loop_stalls_total") or 0
+
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        _blocking_call(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        stalls = monitor.stalls()
+        assert len(stalls) == 1
+        assert "_blocking_call" in stalls[0]["stack"]
+        assert stalls[0]["blocked_seconds"] >= 0.05
+        assert stalls[0]["lag_seconds"] >= 0.25
+        assert REGISTRY.get_sample_value("kb_event_loop_stalls_total") == stalls_before + 1
+
+    async def test_stop_is_idempotent(self):
+        """시작하지 않았거나 이미 중지된 모니터의 stop은 무시"""
+        monitor = LoopMonitor()
+
+        await monitor.stop()
+        await monitor.start()
+        await monitor.stop()
+        await monitor.stop()
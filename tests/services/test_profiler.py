@@ -0,0 +1,89 @@
+"""요청/compact 프로파일링 테스트"""
+
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.profiler import Profiler
+
+
+def _busy_work() -> int:
+    return sum(i * i for i in range(10000))
+
+
+class TestProfiler:
+    """Profiler 테스트"""
+
+    def test_requested_requires_enabled(self):
+        """비활성이면 요청 값과 관계없이 프로파일하지 않음"""
+        assert not Profiler(enabled=False).requested("1")
+        assert Profiler(enabled=True).requested("true")
+        assert not Profiler(enabled=True).requested("0")
+        assert not Profiler(enabled=True).requested(None)
+
+    def test_requested_with_token(self):
+        """토큰이 설정되면 일치하는 값만 허용"""
+        profiler = Profiler(enabled=True, token="secret")
+
+        assert profiler.requested("secret")
+        assert not profiler.requested("1")
+
+    async def test_saves_profile_locally(self, tmp_path):
+        """실행을 프로파일링하여 로컬 디렉토리에 저장"""
+        profiler = Profiler(enabled=True, directory=str(tmp_path))
+
+        async with profiler.profile("GET-/api/v1/sync") as run:
+            _busy_work()
+
+        path = Path(run.location)
+        assert path.parent == tmp_path
+        assert "GET-_api_v1_sync" in path.name
+        assert path.name.endswith(".speedscope.json")
+        assert "_busy_work" in {frame["name"] for frame in json.loads(path.read_text())["shared"]["frames"]}
+
+    async def test_saves_profile_to_s3(self):
+        """s3 출력이면 prefix 아래에 업로드하고 S3 URL 반환"""
+        s3_service = MagicMock()
+        s3_service.upload_file = AsyncMock(
+            return_value={"success": True, "url": "s3://bucket/profiles/p.speedscope.json"}
+        )
+        profiler = Profiler(enabled=True, output="s3", s3_service=s3_service, s3_prefix="profiles")
+
+        async with profiler.profile("compact-run") as run:
+            _busy_work()
+
+        assert run.location == "s3://bucket/profiles/p.speedscope.json"
+        assert s3_service.upload_file.call_args.kwargs["directory"] == "profiles"
+
+    async def test_disabled_does_not_profile(self, tmp_path):
+        """비활성이면 저장하지 않음"""
+        profiler = Profiler(enabled=False, directory=str(tmp_path))
+
+        async with profiler.profile("compact-run") as run:
+            _busy_work()
+
+        assert run.location is None
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_one_profile_at_a_time(self, tmp_path):
+        """이미 프로파일 중이면 다른 실행은 프로파일 없이 처리"""
+        profiler = Profiler(enabled=True, directory=str(tmp_path))
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def first():
+            async with profiler.profile("first") as run:
+                started.set()
+                await release.wait()
+            return run
+
+        task = asyncio.create_task(first())
+        await started.wait()
+        async with profiler.profile("second") as second:
+            pass
+        release.set()
+        first_run = await task
+
+        assert second.location is None
+        assert first_run.location is not None
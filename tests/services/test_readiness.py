@@ -0,0 +1,89 @@
+"""readiness / 의존성 확인 테스트"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.readiness import Readiness, dependency_probes
+
+
+async def _noop():
+    pass
+
+
+class TestReadiness:
+    """Readiness 테스트"""
+
+    async def test_serves_cached_probe_results(self):
+        """시작 후 의존성을 확인하고, status는 probe를 다시 호출하지 않고 캐시된 결과 반환"""
+        s3 = AsyncMock()
+        readiness = Readiness(probes={"s3": s3}, interval_seconds=60)
+
+        assert readiness.status() == {"status": "starting"}
+        await readiness.start(_noop)
+        assert await readiness.wait()
+        first = readiness.status()
+        second = readiness.status()
+        await readiness.stop()
+
+        assert s3.await_count == 1
+        assert first == second
+        assert first["status"] == "ready"
+        assert first["dependencies"]["s3"]["ok"] is True
+        assert first["dependencies"]["s3"]["latency_ms"] >= 0
+
+    async def test_failed_and_slow_dependencies(self):
+        """실패하거나 제한 시간을 넘긴 의존성이 있으면 unavailable과 의존성별 오류 반환"""
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        readiness = Readiness(
+            probes={"s3": AsyncMock(), "kafka": slow, "bedrock": AsyncMock(side_effect=ConnectionError("refused"))},
+            timeout_seconds=0.05,
+        )
+
+        await readiness.start(_noop)
+        assert not await readiness.wait()
+        status = readiness.status()
+        await readiness.stop()
+
+        assert status["status"] == "unavailable"
+        dependencies = status["dependencies"]
+        assert dependencies["s3"]["ok"] is True
+        assert dependencies["kafka"]["error"] == "timed out after 0.05s"
+        assert dependencies["bedrock"] == {**dependencies["bedrock"], "ok": False, "error": "refused"}
+
+    async def test_recovers_on_next_interval(self):
+        """다음 확인에서 의존성이 복구되면 ready로 전환"""
+        calls = 0
+
+        async def probe():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ConnectionError("down")
+
+        readiness = Readiness(probes={"s3": probe}, interval_seconds=0.01)
+
+        await readiness.start(_noop)
+        assert not await readiness.wait()
+        await asyncio.sleep(0.05)
+        await readiness.stop()
+
+        assert readiness.status()["status"] == "ready"
+
+    async def test_dependency_probes(self):
+        """설정된 의존성만 probe를 만들고 S3/Bedrock 확인은 스레드에서 실행"""
+        s3_service = MagicMock()
+        bedrock_kb_service = MagicMock()
+        agent_service = MagicMock()
+        agent_service.check_cli = AsyncMock()
+
+        probes = dependency_probes(s3_service, bedrock_kb_service, agent_service, names=["s3", "bedrock", "agent"])
+        for probe in probes.values():
+            await probe()
+
+        assert list(probes) == ["s3", "bedrock", "agent"]
+        s3_service.check_access.assert_called_once_with()
+        bedrock_kb_service.check_access.assert_called_once_with()
+        agent_service.check_cli.assert_awaited_once()
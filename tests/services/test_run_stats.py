@@ -0,0 +1,54 @@
+"""RunStats 테스트"""
+
+from unittest.mock import AsyncMock
+
+from src.services.run_stats import RunStats
+
+
+class TestRunStats:
+    """단계별 집계 및 progress 콜백 테스트"""
+
+    async def test_stage_reports_progress(self):
+        """단계가 끝나면 소요 시간을 기록하고 콜백 호출"""
+        on_progress = AsyncMock()
+        run_stats = RunStats(on_progress=on_progress, run_id="run-1")
+
+        async with run_stats.stage("load") as stats:
+            stats.documents_loaded = 5
+
+        run_id, stage, reported = on_progress.call_args.args
+        assert (run_id, stage) == ("run-1", "load")
+        assert reported.documents_loaded == 5
+        assert "load" in reported.stage_seconds
+
+    async def test_reported_stats_are_snapshots(self):
+        """콜백에 넘긴 통계는 이후 변경에 영향받지 않음"""
+        on_progress = AsyncMock()
+        run_stats = RunStats(on_progress=on_progress)
+
+        async with run_stats.stage("load") as stats:
+            stats.documents_loaded = 1
+        run_stats.stats.documents_loaded = 2
+
+        assert on_progress.call_args.args[2].documents_loaded == 1
+
+    async def test_stage_recorded_on_error(self):
+        """단계 중 예외가 나도 소요 시간은 기록"""
+        run_stats = RunStats()
+
+        try:
+            async with run_stats.stage("merge"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        assert "merge" in run_stats.stats.stage_seconds
+
+    async def test_callback_failure_ignored(self):
+        """콜백 실패는 실행을 중단하지 않음"""
+        run_stats = RunStats(on_progress=AsyncMock(side_effect=RuntimeError("broker down")))
+
+        async with run_stats.stage("load"):
+            pass
+
+        assert "load" in run_stats.stats.stage_seconds
@@ -6,6 +6,23 @@ import pytest
 from botocore.exceptions import ClientError
 
 
+class TestS3ServiceClient:
+    """boto3 클라이언트 생성 테스트"""
+
+    def test_client_created_on_first_use(self):
+        """생성자에서는 클라이언트를 만들지 않고 첫 사용 시 한 번만 생성"""
+        from src.external_service.s3 import S3Service
+
+        with patch("boto3.client") as mock_client:
+            service = S3Service(bucket="test-bucket", aws_access_key_id="", aws_secret_access_key="")
+            mock_client.assert_not_called()
+
+            assert service.client is service.client
+            mock_client.assert_called_once_with(
+                "s3", region_name="ap-northeast-2", aws_access_key_id=None, aws_secret_access_key=None
+            )
+
+
 class TestS3ServiceListDocuments:
     """list_documents 메서드 테스트"""
 
@@ -63,7 +80,7 @@ class TestS3ServiceListDocuments:
             assert result == []
 
     def test_list_documents_error(self):
-        """조회 실패 시 빈 리스트 반환"""
+        """조회 실패는 빈 목록이 아니라 ClientError로 전달"""
         from src.external_service.s3 import S3Service
 
         with patch("boto3.client") as mock_client:
@@ -77,9 +94,9 @@ class TestS3ServiceListDocuments:
             )
 
             service = S3Service(bucket="test-bucket")
-            result = service.list_documents("kb")
 
-            assert result == []
+            with pytest.raises(ClientError):
+                service.list_documents("kb")
 
 
 class TestS3ServiceGetDocument:
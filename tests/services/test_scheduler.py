@@ -0,0 +1,213 @@
+"""CompactScheduler 및 S3Lease 테스트"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from src.services.lease import S3Lease
+from src.services.scheduler import CompactScheduler
+
+TIERS = [(10, 1000, 3600), (100, 100_000, 0)]
+
+
+@pytest.fixture
+def mock_lease():
+    lease = MagicMock()
+    lease.acquire = AsyncMock(return_value=True)
+    lease.release = AsyncMock()
+    lease.held = True
+    return lease
+
+
+@pytest.fixture
+def scheduler(mock_lease):
+    return CompactScheduler(lease=mock_lease, tiers=TIERS, max_interval_seconds=86400)
+
+
+class TestTriggerReason:
+    """실행 조건 판단"""
+
+    def test_no_pending_documents(self, scheduler):
+        """새 문서가 없으면 실행하지 않음"""
+        assert scheduler.trigger_reason(now=scheduler.last_run + 10**6) is None
+
+    def test_small_backlog_waits_for_tier_interval(self, scheduler):
+        """작은 누적량은 tier 대기 시간이 지나야 실행"""
+        for _ in range(10):
+            scheduler.record_upload(10)
+
+        assert scheduler.trigger_reason(now=scheduler.last_run + 60) is None
+        assert scheduler.trigger_reason(now=scheduler.last_run + 3601) is not None
+
+    def test_tier_interval_boundary(self, scheduler):
+        """tier 대기 시간과 정확히 같으면 실행"""
+        scheduler.last_run = 1000.0
+        for _ in range(10):
+            scheduler.record_upload(10)
+
+        assert scheduler.trigger_reason(now=4599.0) is None
+        assert scheduler.trigger_reason(now=4600.0) is not None
+
+    def test_large_backlog_triggers_immediately(self, scheduler):
+        """큰 누적량은 대기 없이 실행"""
+        scheduler.record_upload(200_000)
+
+        assert scheduler.trigger_reason(now=scheduler.last_run) is not None
+
+    def test_max_interval(self, scheduler):
+        """임계치 미만이어도 최대 간격이 지나면 실행"""
+        scheduler.record_upload(1)
+
+        assert scheduler.trigger_reason(now=scheduler.last_run + 3600) is None
+        assert scheduler.trigger_reason(now=scheduler.last_run + 86400).startswith("max_interval")
+
+    def test_record_run_resets(self, scheduler):
+        """compact 실행 시 누적량 초기화"""
+        scheduler.record_upload(200_000)
+        scheduler.record_run()
+
+        assert scheduler.pending_documents == 0
+        assert scheduler.pending_bytes == 0
+        assert scheduler.trigger_reason() is None
+
+
+class TestTick:
+    """tick 동작"""
+
+    async def test_leader_publishes_scheduled_event(self, scheduler):
+        """leader는 조건 충족 시 scheduled 이벤트 발행"""
+        scheduler.record_upload(200_000)
+
+        with patch("src.services.scheduler.broker") as mock_broker:
+            mock_broker.publish = AsyncMock()
+            assert await scheduler.tick() is True
+
+        event = mock_broker.publish.call_args[0][0]
+        assert event.trigger == "scheduled"
+        assert scheduler.pending_documents == 0
+
+    async def test_follower_does_not_publish(self, scheduler, mock_lease):
+        """lease를 얻지 못한 replica는 발행하지 않음"""
+        mock_lease.acquire.return_value = False
+        scheduler.record_upload(200_000)
+
+        with patch("src.services.scheduler.broker") as mock_broker:
+            mock_broker.publish = AsyncMock()
+            assert await scheduler.tick() is False
+
+        mock_broker.publish.assert_not_called()
+        assert scheduler.pending_documents == 1
+
+    async def test_leader_saves_state_to_lease(self, scheduler, mock_lease):
+        """leader는 누적량과 마지막 실행 시각을 lease 객체에 저장"""
+        scheduler.record_upload(10)
+
+        await scheduler.tick()
+
+        assert mock_lease.data == {"pending_documents": 1, "pending_bytes": 10, "last_run": scheduler.last_run}
+
+    async def test_new_leader_restores_state(self, scheduler, mock_lease):
+        """새 leader는 이전 leader가 저장한 누적량/마지막 실행 시각을 이어받음"""
+        mock_lease.held = False
+        mock_lease.stored_data = {"pending_documents": 150, "pending_bytes": 5000, "last_run": 0}
+        scheduler.record_upload(10)
+
+        with patch("src.services.scheduler.broker") as mock_broker:
+            mock_broker.publish = AsyncMock()
+            assert await scheduler.tick() is True
+
+        mock_broker.publish.assert_awaited_once()
+        assert scheduler.pending_documents == 0
+        assert mock_lease.data["pending_documents"] == 0
+
+
+class TestTrackCompact:
+    """compact 이벤트에 따른 누적량 초기화"""
+
+    @pytest.mark.parametrize(
+        ("event_kwargs", "reset"),
+        [({}, True), ({"dry_run": True}, False), ({"plan_id": "p1"}, False)],
+    )
+    async def test_resets_only_on_full_runs(self, scheduler, event_kwargs, reset):
+        """dry run과 plan 적용은 새 문서를 처리하지 않으므로 누적량을 유지"""
+        from src.events.v1.scheduler import track_compact
+        from src.schema.v1.compact_event import CompactEvent
+
+        scheduler.record_upload(10)
+        with patch("src.events.v1.scheduler.Container") as mock_container:
+            mock_container.compact_scheduler.return_value = scheduler
+            await track_compact(CompactEvent(trigger="api", **event_kwargs))
+
+        assert scheduler.pending_documents == (0 if reset else 1)
+
+
+class TestS3Lease:
+    """S3 조건부 쓰기 lease"""
+
+    @pytest.fixture
+    def s3_service(self):
+        from src.external_service.s3 import S3Service
+
+        with mock_aws():
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="test-bucket")
+            yield S3Service(bucket="test-bucket", region="us-east-1")
+
+    async def test_single_holder(self, s3_service):
+        """동시에 한 소유자만 획득"""
+        lease_a = S3Lease(s3_service, "state/test.lease", owner="a", ttl_seconds=60)
+        lease_b = S3Lease(s3_service, "state/test.lease", owner="b", ttl_seconds=60)
+
+        assert await lease_a.acquire() is True
+        assert await lease_b.acquire() is False
+        # 보유자는 갱신 가능
+        assert await lease_a.acquire() is True
+        assert lease_a.held and not lease_b.held
+
+    async def test_release_allows_takeover(self, s3_service):
+        """반환 후 다른 소유자가 획득"""
+        lease_a = S3Lease(s3_service, "state/test.lease", owner="a", ttl_seconds=60)
+        lease_b = S3Lease(s3_service, "state/test.lease", owner="b", ttl_seconds=60)
+
+        await lease_a.acquire()
+        await lease_a.release()
+
+        assert await lease_b.acquire() is True
+
+    async def test_expired_lease_taken_over(self, s3_service):
+        """만료된 lease는 다른 소유자가 획득"""
+        s3_service.client.put_object(
+            Bucket="test-bucket",
+            Key="state/test.lease",
+            Body=json.dumps({"owner": "dead", "expires_at": 0}).encode(),
+        )
+        lease = S3Lease(s3_service, "state/test.lease", owner="a", ttl_seconds=60)
+
+        assert await lease.acquire() is True
+
+    async def test_data_handed_over(self, s3_service):
+        """보유자가 저장한 data는 다음 보유자가 stored_data로 읽음"""
+        lease_a = S3Lease(s3_service, "state/test.lease", owner="a", ttl_seconds=60)
+        lease_b = S3Lease(s3_service, "state/test.lease", owner="b", ttl_seconds=60)
+
+        lease_a.data = {"pending_documents": 3}
+        await lease_a.acquire()
+        await lease_a.release()
+
+        assert await lease_b.acquire() is True
+        assert lease_b.stored_data == {"pending_documents": 3}
+
+    async def test_errors_raised(self, s3_service):
+        """S3 오류는 다른 보유자가 있는 것과 구분하여 그대로 발생"""
+        lease = S3Lease(s3_service, "state/test.lease", owner="a", ttl_seconds=60)
+        assert await lease.acquire() is True
+        error = ClientError({"Error": {"Code": "SlowDown"}, "ResponseMetadata": {"HTTPStatusCode": 503}}, "GetObject")
+
+        with patch.object(s3_service, "get_document_with_etag", side_effect=error):
+            with pytest.raises(ClientError):
+                await lease.acquire()
+
+        assert lease.held
@@ -0,0 +1,197 @@
+"""SyncTracker 테스트"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.sync_tracker import SyncTracker
+
+
+@pytest.fixture
+def bedrock():
+    """상태 조회 시 IN_PROGRESS -> COMPLETE로 바뀌는 Bedrock KB 서비스"""
+    mock = MagicMock()
+    mock.start_sync = AsyncMock(return_value={"success": True, "ingestion_job_id": "job-1", "status": "STARTING"})
+    mock.get_sync_status = AsyncMock(
+        side_effect=[
+            {"success": True, "ingestion_job_id": "job-1", "status": "IN_PROGRESS", "statistics": {}},
+            {
+                "success": True,
+                "ingestion_job_id": "job-1",
+                "status": "COMPLETE",
+                "statistics": {"numberOfNewDocumentsIndexed": 2},
+            },
+        ]
+    )
+    mock.list_active_sync_jobs = AsyncMock(return_value={"success": True, "jobs": []})
+    mock.ingest_documents = AsyncMock(return_value={"success": True, "documents": []})
+    mock.delete_documents = AsyncMock(return_value={"success": True, "documents": []})
+    return mock
+
+
+@pytest.fixture
+async def tracker(bedrock):
+    tracker = SyncTracker(bedrock, poll_interval_seconds=0.01, poll_max_interval_seconds=0.02)
+    yield tracker
+    await tracker.stop()
+
+
+class TestSyncTracker:
+    """동기화 작업 추적 테스트"""
+
+    async def test_start_tracks_job_until_complete(self, tracker, bedrock):
+        """시작한 작업을 polling하여 완료 상태 캐시"""
+        result = await tracker.start_sync()
+
+        job = await tracker.wait(result["ingestion_job_id"], timeout=1)
+
+        assert job["status"] == "COMPLETE"
+        assert job["statistics"] == {"numberOfNewDocumentsIndexed": 2}
+        assert job["finished_at"] is not None
+        assert bedrock.get_sync_status.await_count == 2
+
+        # 완료 후 조회는 캐시 사용
+        await tracker.get("job-1")
+        assert bedrock.get_sync_status.await_count == 2
+
+    async def test_sync_during_job_coalesced(self, tracker, bedrock):
+        """진행 중 요청은 Bedrock을 호출하지 않고 완료 후 한 번만 다시 동기화"""
+        await tracker.start_sync()
+        bedrock.start_sync.return_value = {"success": True, "ingestion_job_id": "job-2", "status": "COMPLETE"}
+
+        first = await tracker.start_sync()
+        second = await tracker.start_sync()
+
+        assert first["follow_up"] is True
+        assert second["ingestion_job_id"] == "job-1"
+        assert bedrock.start_sync.await_count == 1
+
+        await tracker.wait("job-1", timeout=1)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert bedrock.start_sync.await_count == 2
+        assert [job["ingestion_job_id"] for job in tracker.jobs()] == ["job-2", "job-1"]
+
+    async def test_conflict_tracks_existing_job(self, tracker, bedrock):
+        """다른 곳에서 시작한 작업과 충돌하면 그 작업을 추적하고 후속 동기화 예약"""
+        bedrock.start_sync.return_value = {
+            "success": False,
+            "error": "ongoing ingestion job",
+            "error_code": "ConflictException",
+        }
+        bedrock.list_active_sync_jobs.return_value = {
+            "success": True,
+            "jobs": [{"ingestion_job_id": "job-1", "status": "IN_PROGRESS"}],
+        }
+
+        result = await tracker.start_sync()
+
+        assert result["success"] is True
+        assert result["ingestion_job_id"] == "job-1"
+        assert result["follow_up"] is True
+
+    async def test_start_failure_returned(self, tracker, bedrock):
+        """충돌이 아닌 실패는 그대로 반환"""
+        bedrock.start_sync.return_value = {"success": False, "error": "denied", "error_code": "AccessDeniedException"}
+
+        result = await tracker.start_sync()
+
+        assert result["success"] is False
+        assert tracker.jobs() == []
+
+    async def test_unknown_job(self, tracker, bedrock):
+        """Bedrock에 없는 작업은 None"""
+        bedrock.get_sync_status = AsyncMock(return_value={"success": False, "error": "not found"})
+
+        assert await tracker.get("missing") is None
+
+    async def test_poll_errors_mark_job_failed(self, bedrock):
+        """상태 조회가 연속으로 실패하면 polling을 멈추고 FAILED로 처리"""
+        bedrock.get_sync_status = AsyncMock(return_value={"success": False, "error": "AccessDenied"})
+        tracker = SyncTracker(bedrock, poll_interval_seconds=0.001, poll_max_interval_seconds=0.001, poll_max_errors=3)
+
+        await tracker.start_sync()
+        job = await tracker.wait("job-1", timeout=1)
+
+        assert job["status"] == "FAILED"
+        assert "AccessDenied" in job["failure_reasons"][0]
+        assert bedrock.get_sync_status.await_count == 3
+        await tracker.stop()
+
+    async def test_wait_for_evicted_job(self, bedrock):
+        """기다리는 동안 작업이 끝나고 캐시에서 정리되면 KeyError 대신 None"""
+        tracker = SyncTracker(bedrock, poll_interval_seconds=60, max_jobs=1)
+        await tracker.start_sync()
+        waiter = asyncio.create_task(tracker.wait("job-1", timeout=1))
+        await asyncio.sleep(0)
+
+        # job-1 완료 직후 다른 작업이 추적되어 job-1이 정리됨
+        tracker._update("job-1", {"status": "COMPLETE"})
+        bedrock.get_sync_status = AsyncMock(
+            return_value={"success": True, "ingestion_job_id": "job-2", "status": "COMPLETE", "statistics": {}}
+        )
+        await tracker.get("job-2")
+
+        assert await waiter is None
+        await tracker.stop()
+
+
+class TestSyncTrackerDocuments:
+    """문서 단위 동기화 테스트"""
+
+    @pytest.fixture
+    async def document_tracker(self, bedrock):
+        tracker = SyncTracker(bedrock, poll_interval_seconds=0.01, document_sync_threshold=2)
+        yield tracker
+        await tracker.stop()
+
+    async def test_small_change_synced_per_document(self, document_tracker, bedrock):
+        """변경이 threshold 이하면 문서만 ingest/delete"""
+        result = await document_tracker.sync_documents(["kb/new.md"], ["kb/old.md"])
+
+        assert result["mode"] == "documents"
+        bedrock.ingest_documents.assert_awaited_once_with(["kb/new.md"])
+        bedrock.delete_documents.assert_awaited_once_with(["kb/old.md"])
+        bedrock.start_sync.assert_not_called()
+
+    async def test_large_change_falls_back_to_full_sync(self, document_tracker, bedrock):
+        """변경이 threshold를 넘으면 전체 동기화"""
+        result = await document_tracker.sync_documents(["kb/a.md", "kb/b.md"], ["kb/c.md"])
+
+        assert result["mode"] == "full"
+        assert result["ingestion_job_id"] == "job-1"
+        bedrock.ingest_documents.assert_not_called()
+
+    async def test_document_failure_falls_back_to_full_sync(self, document_tracker, bedrock):
+        """문서 단위 반영이 실패하면 전체 동기화"""
+        bedrock.ingest_documents.return_value = {"success": False, "error": "unsupported", "documents": []}
+
+        result = await document_tracker.sync_documents(["kb/a.md"], [])
+
+        assert result["mode"] == "full"
+        bedrock.start_sync.assert_awaited_once()
+
+    async def test_batches_above_request_limit(self):
+        """threshold 이하 변경은 요청당 최대 문서 수로 나누어 보내고 전체 동기화로 넘어가지 않음"""
+        from src.external_service.bedrock import MAX_DOCUMENTS_PER_REQUEST, BedrockKBService
+
+        service = BedrockKBService(knowledge_base_id="kb", data_source_id="ds", bucket="test-bucket")
+        service.client = MagicMock()
+        service.client.ingest_knowledge_base_documents.return_value = {"documentDetails": []}
+        tracker = SyncTracker(service, document_sync_threshold=20)
+        keys = [f"kb/doc{i}.md" for i in range(MAX_DOCUMENTS_PER_REQUEST + 1)]
+
+        result = await tracker.sync_documents(keys, [])
+
+        assert result["mode"] == "documents"
+        calls = service.client.ingest_knowledge_base_documents.call_args_list
+        assert [len(call.kwargs["documents"]) for call in calls] == [MAX_DOCUMENTS_PER_REQUEST, 1]
+        service.client.start_ingestion_job.assert_not_called()
+
+    async def test_no_changes(self, document_tracker, bedrock):
+        """변경이 없으면 호출하지 않음"""
+        result = await document_tracker.sync_documents([], [])
+
+        assert result == {"success": True, "mode": "none"}
+        bedrock.start_sync.assert_not_called()
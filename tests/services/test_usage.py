@@ -0,0 +1,81 @@
+"""Agent 사용량 집계 테스트"""
+
+import asyncio
+
+from claude_agent_sdk import ResultMessage
+
+from src.external_service.agent import AgentService
+from src.schema.v1.usage import AgentUsage, UsageTotals
+from src.services.usage import merge_usage, record_usage, track_usage
+
+
+def _result_message(input_tokens: int, output_tokens: int, cost: float) -> ResultMessage:
+    return ResultMessage(
+        subtype="success",
+        duration_ms=1200,
+        duration_api_ms=1000,
+        is_error=False,
+        num_turns=1,
+        session_id="s",
+        total_cost_usd=cost,
+        usage={"input_tokens": input_tokens, "output_tokens": output_tokens, "cache_read_input_tokens": 10},
+    )
+
+
+class TestTrackUsage:
+    """contextvar 기반 집계"""
+
+    async def test_aggregates_across_tasks(self):
+        """블록 안에서 만든 task의 호출도 같은 집계에 합산"""
+
+        async def call(operation: str):
+            record_usage(operation, UsageTotals(calls=1, input_tokens=100, cost_usd=0.5))
+
+        with track_usage() as usage:
+            await asyncio.gather(call("analyze_file"), call("analyze_file"), call("merge_documents"))
+
+        assert usage.calls == 3
+        assert usage.input_tokens == 300
+        assert usage.operations["analyze_file"].calls == 2
+        assert usage.operations["merge_documents"].cost_usd == 0.5
+
+    async def test_outside_block_ignored(self):
+        """집계 블록 밖의 호출은 무시"""
+        record_usage("analyze_file", UsageTotals(calls=1))
+
+        with track_usage() as usage:
+            pass
+
+        assert usage.calls == 0
+
+    async def test_merge_remote_usage(self):
+        """worker에서 받은 사용량 합산"""
+        remote = AgentUsage()
+        remote.record("merge_documents", UsageTotals(calls=2, output_tokens=50))
+
+        with track_usage() as usage:
+            merge_usage(remote)
+
+        assert usage.output_tokens == 50
+        assert usage.operations["merge_documents"].calls == 2
+
+
+class TestAgentUsageCapture:
+    """ResultMessage 사용량 기록"""
+
+    async def test_query_text_records_result_message(self):
+        service = AgentService()
+
+        async def query(prompt, **kwargs):
+            yield _result_message(input_tokens=120, output_tokens=30, cost=0.01)
+
+        service.query = query
+
+        with track_usage() as usage:
+            await service.query_text("p", operation="find_similar_documents")
+
+        totals = usage.operations["find_similar_documents"]
+        assert (totals.calls, totals.input_tokens, totals.output_tokens) == (1, 120, 30)
+        assert totals.cache_read_input_tokens == 10
+        assert totals.duration_ms == 1200
+        assert totals.cost_usd == 0.01
@@ -1,5 +1,8 @@
 """메인 앱 테스트 (헬스체크 등)"""
 
+import asyncio
+from unittest.mock import AsyncMock, patch
+
 from httpx import AsyncClient
 
 
@@ -10,3 +13,81 @@ async def test_health_check(client_no_mock: AsyncClient):
     data = response.json()
     assert data["status"] == "healthy"
     assert "version" in data
+
+
+async def test_metrics(client_no_mock: AsyncClient):
+    """GET /metrics - Prometheus 형식 메트릭"""
+    response = await client_no_mock.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "kb_agent_call_seconds" in response.text
+
+
+async def test_profile_request(client_no_mock: AsyncClient, tmp_path):
+    """X-Profile 헤더가 있으면 요청을 프로파일링하고 저장 위치를 헤더로 반환"""
+    from src.main import app
+    from src.services.profiler import Profiler
+
+    app.container.profiler.override(Profiler(enabled=True, directory=str(tmp_path)))
+    try:
+        plain = await client_no_mock.get("/health")
+        profiled = await client_no_mock.get("/health", headers={"X-Profile": "1"})
+    finally:
+        app.container.profiler.reset_override()
+
+    assert "X-Profile-Location" not in plain.headers
+    assert profiled.status_code == 200
+    assert profiled.headers["X-Profile-Location"].startswith(str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+async def test_ready_after_background_startup(client_no_mock: AsyncClient):
+    """시작 작업은 lifespan을 막지 않고, 끝난 뒤에만 /ready가 200"""
+    from src.main import app
+    from src.services.readiness import Readiness
+
+    release = asyncio.Event()
+
+    async def slow_ensure_topics(topics):
+        await release.wait()
+
+    app.container.readiness.override(Readiness())
+    try:
+        with patch("src.main.ensure_topics", side_effect=slow_ensure_topics), patch("src.main.settings") as settings:
+            settings.kafka_ensure_topics = True
+            settings.compact_schedule_enabled = False
+            settings.loop_monitor_enabled = False
+            async with app.router.lifespan_context(app):
+                starting = await client_no_mock.get("/ready")
+                health = await client_no_mock.get("/health")
+                release.set()
+                await app.container.readiness().wait()
+                ready = await client_no_mock.get("/ready")
+    finally:
+        app.container.readiness.reset_override()
+
+    assert starting.status_code == 503
+    assert starting.json()["status"] == "starting"
+    assert health.status_code == 200
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+
+
+async def test_failed_startup_fails_liveness(client_no_mock: AsyncClient):
+    """시작 작업이 실패하면 /ready와 /health 모두 503"""
+    from src.main import app
+    from src.services.readiness import Readiness
+
+    readiness = Readiness()
+    app.container.readiness.override(readiness)
+    try:
+        await readiness.start(AsyncMock(side_effect=ConnectionError("kafka unavailable")))
+        assert not await readiness.wait()
+        ready = await client_no_mock.get("/ready")
+        health = await client_no_mock.get("/health")
+    finally:
+        app.container.readiness.reset_override()
+
+    assert ready.status_code == 503
+    assert ready.json() == {"status": "failed", "error": "kafka unavailable"}
+    assert health.status_code == 503